@@ -1,56 +1,282 @@
 """测试配置文件
 
 存储测试相关的配置信息，如测试 URL、测试账号等。
+
+配置在第一次访问时才读取 ``.env`` 和环境变量并完成校验，之后缓存复用，
+导入本模块不产生任何 I/O。并行运行时可为单个 worker 覆盖配置：
+``<变量名>__<WORKER>``，例如 ``PROTAGO_BASE_URL__GW1`` 只对 pytest-xdist 的 gw1 生效。
+
+Usage:
+    settings = get_settings()
+    settings.default_timeout
+
+    TestConfig.DEFAULT_TIMEOUT      # 兼容原有的类属性访问方式
 """
+import copy
 import os
-from typing import Dict, Optional
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+# 精简启动参数：关闭 GPU、扩展和后台节流，减少启动和渲染开销
+LEAN_BROWSER_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-dev-shm-usage",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+# 启动配置：launch 传给 chromium.launch，context 传给 new_context/new_page，
+# keep_open 为流程结束后保持浏览器打开以便观察的秒数
+LAUNCH_PROFILES = {
+    "headed-debug": {
+        "launch": {"headless": False},
+        "context": {"viewport": {"width": 1440, "height": 900}},
+        "keep_open": 30,
+    },
+    "headless-fast": {
+        "launch": {"headless": True, "args": LEAN_BROWSER_ARGS},
+        "context": {"viewport": {"width": 1280, "height": 720}},
+        "keep_open": 0,
+    },
+    "headless-shell": {
+        "launch": {
+            "headless": True,
+            "channel": "chromium-headless-shell",
+            "args": LEAN_BROWSER_ARGS,
+        },
+        "context": {"viewport": {"width": 1280, "height": 720}},
+        "keep_open": 0,
+    },
+}
+
+# 浏览器后端：fake（内存页面模拟）、mcp（Browser MCP 服务器）或 playwright（直接驱动浏览器）
+BROWSER_BACKENDS = ("fake", "mcp", "playwright")
+
 
-# 加载环境变量
-load_dotenv()
+class Settings(BaseModel):
+    """类型化的测试配置
 
+    字段的 ``alias`` 为对应的环境变量名称。
+    """
+
+    model_config = ConfigDict(frozen=True, populate_by_name=True)
 
-class TestConfig:
-    """测试配置类"""
-    
     # Protago 测试环境 URL
-    PROTAGO_BASE_URL = os.getenv("PROTAGO_BASE_URL", "https://xyz-beta.protago-dev.com")
-    
-    # 测试账号配置（从环境变量读取，如果没有则使用默认值）
-    TEST_EMAIL = os.getenv("PROTAGO_TEST_EMAIL", "test@example.com")
-    TEST_PASSWORD = os.getenv("PROTAGO_TEST_PASSWORD", "test_password")
-    
+    protago_base_url: str = Field("https://xyz-beta.protago-dev.com", alias="PROTAGO_BASE_URL")
+
+    # 测试账号配置
+    test_email: str = Field("test@example.com", alias="PROTAGO_TEST_EMAIL")
+    test_password: str = Field("test_password", alias="PROTAGO_TEST_PASSWORD")
+
+    # 账号池：并行登录测试时每个测试租用独立账号（格式见 src/credentials.py）
+    test_accounts: str = Field("", alias="PROTAGO_TEST_ACCOUNTS")
+    test_accounts_file: str = Field("", alias="PROTAGO_TEST_ACCOUNTS_FILE")
+
+    # 账号租约锁文件和登录状态缓存目录
+    auth_state_dir: str = Field(".auth", alias="AUTH_STATE_DIR")
+
     # 管理员账号（如果需要）
-    ADMIN_EMAIL = os.getenv("PROTAGO_ADMIN_EMAIL", "admin@example.com")
-    ADMIN_PASSWORD = os.getenv("PROTAGO_ADMIN_PASSWORD", "admin_password")
-    
+    admin_email: str = Field("admin@example.com", alias="PROTAGO_ADMIN_EMAIL")
+    admin_password: str = Field("admin_password", alias="PROTAGO_ADMIN_PASSWORD")
+
     # 超时配置（毫秒）
-    DEFAULT_TIMEOUT = int(os.getenv("DEFAULT_TIMEOUT", "10000"))
-    NAVIGATION_TIMEOUT = int(os.getenv("NAVIGATION_TIMEOUT", "15000"))
-    
+    default_timeout: int = Field(10000, alias="DEFAULT_TIMEOUT", gt=0, le=600000)
+    navigation_timeout: int = Field(15000, alias="NAVIGATION_TIMEOUT", gt=0, le=600000)
+
     # 截图配置
-    SCREENSHOT_DIR = os.getenv("SCREENSHOT_DIR", "screenshots")
-    
+    screenshot_dir: str = Field("screenshots", alias="SCREENSHOT_DIR")
+
+    # 产物存储目录（截图和结果按运行、测试、步骤索引，见 src/artifacts.py）
+    artifact_dir: str = Field("artifacts", alias="ARTIFACT_DIR")
+
+    # 把流程步骤、工具调用和测试结果记录为事件，写入 <ARTIFACT_DIR>/events/（见 src/events.py）
+    record_events: bool = Field(False, alias="RECORD_EVENTS")
+
+    # 被测前端的部署版本，写入运行记录，用于按部署比较指标趋势
+    deploy_version: str = Field("", alias="DEPLOY_VERSION")
+
+    # 登录流程用 CDP 屏幕录制代替每一步的整页截图（仅 Chromium）
+    record_screencast: bool = Field(False, alias="RECORD_SCREENCAST")
+
+    # 冒烟快速通道的总时间预算（秒），包括页面加载
+    smoke_budget: float = Field(10.0, alias="SMOKE_BUDGET", gt=0)
+
+    # 浏览器启动配置：headed-debug、headless-fast 或 headless-shell
+    browser_profile: str = Field("headless-fast", alias="BROWSER_PROFILE")
+
+    # BrowserMCPClient 使用的浏览器后端（见 src/backends/）
+    browser_backend: str = Field("fake", alias="BROWSER_BACKEND")
+
+    # fake 后端使用的 HTML 夹具目录（见 src/fake_dom.py）
+    fake_pages_dir: str = Field("tests/fixtures/pages", alias="FAKE_PAGES_DIR")
+
+    # mcp 后端启动 MCP 服务器的命令
+    mcp_server_command: str = Field("npx @browsermcp/mcp@latest", alias="MCP_SERVER_COMMAND")
+
+    @field_validator("protago_base_url")
+    @classmethod
+    def _check_url(cls, value: str) -> str:
+        parsed = urlparse(value)
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            raise ValueError(f"不是有效的 http(s) URL: {value!r}")
+        return value.rstrip("/")
+
+    @field_validator("browser_profile")
+    @classmethod
+    def _check_profile(cls, value: str) -> str:
+        if value not in LAUNCH_PROFILES:
+            raise ValueError(f"未知的浏览器启动配置: {value}，可选值: {', '.join(LAUNCH_PROFILES)}")
+        return value
+
+    @field_validator("browser_backend")
+    @classmethod
+    def _check_backend(cls, value: str) -> str:
+        if value not in BROWSER_BACKENDS:
+            raise ValueError(f"未知的浏览器后端: {value}，可选值: {', '.join(BROWSER_BACKENDS)}")
+        return value
+
+
+def worker_id(env: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """当前 pytest-xdist worker 的名称（如 ``gw1``），非并行运行时为 None"""
+    env = os.environ if env is None else env
+    return env.get("PYTEST_XDIST_WORKER") or None
+
+
+def load_settings(
+    env: Optional[Mapping[str, str]] = None,
+    worker: Optional[str] = None,
+) -> Settings:
+    """读取并校验配置（不使用缓存）
+
+    Args:
+        env: 环境变量映射，为 None 时先加载 ``.env`` 再使用 ``os.environ``
+        worker: worker 名称，为 None 时从 ``PYTEST_XDIST_WORKER`` 读取
+
+    Raises:
+        ValueError: 配置校验失败
+    """
+    if env is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        env = os.environ
+    worker = worker or worker_id(env)
+    values: Dict[str, Any] = {}
+    for field in Settings.model_fields.values():
+        name = field.alias
+        if worker and f"{name}__{worker.upper()}" in env:
+            values[name] = env[f"{name}__{worker.upper()}"]
+        elif name in env:
+            values[name] = env[name]
+    try:
+        return Settings(**values)
+    except ValidationError as e:
+        raise ValueError(f"测试配置无效:\n{e}") from e
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """第一次调用时加载配置，之后返回缓存的同一对象"""
+    return load_settings()
+
+
+def reset_settings() -> None:
+    """清除缓存的配置，下次访问时重新加载（用于测试或切换环境变量后）"""
+    get_settings.cache_clear()
+
+
+# TestConfig 类属性名称到 Settings 字段的映射
+_LEGACY_NAMES = {
+    "PROTAGO_BASE_URL": "protago_base_url",
+    "TEST_EMAIL": "test_email",
+    "TEST_PASSWORD": "test_password",
+    "TEST_ACCOUNTS": "test_accounts",
+    "TEST_ACCOUNTS_FILE": "test_accounts_file",
+    "AUTH_STATE_DIR": "auth_state_dir",
+    "ADMIN_EMAIL": "admin_email",
+    "ADMIN_PASSWORD": "admin_password",
+    "DEFAULT_TIMEOUT": "default_timeout",
+    "NAVIGATION_TIMEOUT": "navigation_timeout",
+    "SCREENSHOT_DIR": "screenshot_dir",
+    "ARTIFACT_DIR": "artifact_dir",
+    "RECORD_EVENTS": "record_events",
+    "DEPLOY_VERSION": "deploy_version",
+    "RECORD_SCREENCAST": "record_screencast",
+    "SMOKE_BUDGET": "smoke_budget",
+    "BROWSER_PROFILE": "browser_profile",
+    "BROWSER_BACKEND": "browser_backend",
+    "FAKE_PAGES_DIR": "fake_pages_dir",
+    "MCP_SERVER_COMMAND": "mcp_server_command",
+}
+
+
+class _LazyConfig(type):
+    """把 TestConfig 的大写类属性转发到延迟加载的 Settings"""
+
+    def __getattr__(cls, name: str) -> Any:
+        if name in _LEGACY_NAMES:
+            return getattr(get_settings(), _LEGACY_NAMES[name])
+        raise AttributeError(name)
+
+
+class TestConfig(metaclass=_LazyConfig):
+    """测试配置类
+
+    保留原有的访问方式，属性值来自 ``get_settings()``。
+    """
+
+    # 避免被 pytest 当作测试类收集
+    __test__ = False
+
+    LAUNCH_PROFILES = LAUNCH_PROFILES
+
     @classmethod
     def get_test_credentials(cls) -> Dict[str, str]:
         """获取测试账号凭证
-        
+
         Returns:
             包含 email 和 password 的字典
         """
+        settings = get_settings()
         return {
-            "email": cls.TEST_EMAIL,
-            "password": cls.TEST_PASSWORD
+            "email": settings.test_email,
+            "password": settings.test_password
         }
-    
+
+    @classmethod
+    def get_browser_profile(cls, name: Optional[str] = None) -> Dict[str, Any]:
+        """获取浏览器启动配置
+
+        Args:
+            name: 配置名称，为 None 时使用 BROWSER_PROFILE
+
+        Returns:
+            包含 launch、context 和 keep_open 的字典；返回深拷贝，调用方修改启动参数或视口
+            不影响 LAUNCH_PROFILES 和 LEAN_BROWSER_ARGS
+        """
+        name = name or get_settings().browser_profile
+        if name not in LAUNCH_PROFILES:
+            raise ValueError(
+                f"未知的浏览器启动配置: {name}，可选值: {', '.join(LAUNCH_PROFILES)}"
+            )
+        return copy.deepcopy(LAUNCH_PROFILES[name])
+
     @classmethod
     def get_admin_credentials(cls) -> Dict[str, str]:
         """获取管理员账号凭证
-        
+
         Returns:
             包含 email 和 password 的字典
         """
+        settings = get_settings()
         return {
-            "email": cls.ADMIN_EMAIL,
-            "password": cls.ADMIN_PASSWORD
+            "email": settings.admin_email,
+            "password": settings.admin_password
         }
@@ -0,0 +1,130 @@
+"""可访问性快照与元素引用缓存
+
+Browser MCP 工具基于可访问性快照工作：每个元素带有 role、name 和 ref。
+本模块负责解析快照、按 (role, name) 建立索引，并按页面版本缓存快照，
+使后续的 click/fill/get_text 可以通过角色和名称解析元素，而不必每次重新查询页面。
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+# 匹配 MCP 快照中的一行，例如：- button "Log In" [ref=e12]
+_SNAPSHOT_LINE = re.compile(
+    r'^\s*-\s*(?P<role>[\w-]+)(?:\s+"(?P<name>(?:[^"\\]|\\.)*)")?(?P<rest>.*?)\[ref=(?P<ref>[^\]]+)\]'
+)
+
+
+@dataclass(frozen=True)
+class AccessibilityNode:
+    """快照中的一个元素
+
+    Attributes:
+        role: ARIA 角色，例如 button、link、textbox
+        name: 可访问名称
+        ref: 元素引用，交给后端定位元素（MCP 的 ref 或 CSS 选择器）
+    """
+
+    role: str
+    name: str
+    ref: str
+
+
+@dataclass
+class AccessibilitySnapshot:
+    """页面可访问性快照"""
+
+    nodes: List[AccessibilityNode] = field(default_factory=list)
+    _index: Dict[Tuple[str, str], List[AccessibilityNode]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        for node in self.nodes:
+            key = (node.role.lower(), node.name.strip().lower())
+            self._index.setdefault(key, []).append(node)
+
+    @classmethod
+    def parse(cls, text: str) -> "AccessibilitySnapshot":
+        """解析 MCP browser_snapshot 返回的 YAML 风格文本
+
+        Args:
+            text: 快照文本
+
+        Returns:
+            快照对象，无法识别的行会被忽略
+        """
+        nodes = []
+        for line in text.splitlines():
+            match = _SNAPSHOT_LINE.match(line)
+            if match:
+                name = (match.group("name") or "").replace('\\"', '"')
+                nodes.append(AccessibilityNode(match.group("role"), name, match.group("ref")))
+        return cls(nodes)
+
+    def find(self, role: str, name: Optional[str] = None) -> Optional[AccessibilityNode]:
+        """按角色和名称查找元素
+
+        先按 (role, name) 精确匹配（忽略大小写），找不到时再按名称包含匹配。
+
+        Args:
+            role: ARIA 角色
+            name: 可访问名称，为 None 时返回该角色的第一个元素
+
+        Returns:
+            匹配的元素，找不到则返回 None
+        """
+        role = role.lower()
+        if name is not None:
+            exact = self._index.get((role, name.strip().lower()))
+            if exact:
+                return exact[0]
+        needle = (name or "").strip().lower()
+        for node in self.nodes:
+            if node.role.lower() == role and needle in node.name.lower():
+                return node
+        return None
+
+
+class SnapshotCache:
+    """按页面版本缓存可访问性快照
+
+    版本键通常由当前 URL 和 DOM 变更计数组成，只有键变化时才重新获取快照。
+    """
+
+    def __init__(self):
+        self._key: Optional[Hashable] = None
+        self._snapshot: Optional[AccessibilitySnapshot] = None
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[AccessibilitySnapshot]],
+    ) -> AccessibilitySnapshot:
+        """获取快照，版本键未变化时直接返回缓存
+
+        Args:
+            key: 页面版本键
+            loader: 缓存失效时调用的快照加载函数
+
+        Returns:
+            可访问性快照
+        """
+        if self._snapshot is not None and key == self._key:
+            self.hits += 1
+            return self._snapshot
+        self.misses += 1
+        self._snapshot = await loader()
+        self._key = key
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """丢弃缓存的快照"""
+        self._key = None
+        self._snapshot = None
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存命中统计"""
+        return {"hits": self.hits, "misses": self.misses}
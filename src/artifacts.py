@@ -0,0 +1,366 @@
+"""测试产物存储
+
+各流程原本把截图和结果写到 ``screenshots/`` 下的固定文件名，并行或重复运行时互相覆盖。
+产物存储按 运行 ID / 测试 / 步骤 索引每个产物：
+
+    artifacts/
+        manifest.sqlite     # runs、artifacts、results 三张表
+        blobs/ab/abcdef....png
+
+- 产物按 SHA-256 内容寻址保存，内容相同的截图只存一份
+- 清单使用 SQLite（WAL 模式），多个 pytest-xdist worker 可以同时写入
+- 同一次 pytest 运行的所有 worker 共享 ``ARTIFACT_RUN_ID``，由主进程在启动时生成
+
+Usage:
+    store = get_artifact_store()
+    artifacts = store.for_test("tests/test_share_link_full.py::test_share_link_full")
+    artifacts.put("step1_loaded", png_bytes)
+
+    # 最近一次失败运行的第 3 步
+    python -m src.artifacts show share_full_step3_submitted --failed
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+# 同一次运行的所有进程共享的运行 ID
+RUN_ID_ENV = "ARTIFACT_RUN_ID"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    test TEXT NOT NULL,
+    step TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_lookup ON artifacts (test, step, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    test TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (run_id, test)
+);
+"""
+
+
+def new_run_id() -> str:
+    """按时间排序的运行 ID，例如 ``20250101-120000-1a2b3c``"""
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """清单中的一个产物"""
+
+    id: int
+    run_id: str
+    test: str
+    step: str
+    kind: str
+    sha256: str
+    ext: str
+    size: int
+    created: float
+
+
+@dataclass(frozen=True)
+class RunInfo:
+    """一次运行
+
+    Attributes:
+        status: passed 或 failed，运行未结束时为 None
+    """
+
+    run_id: str
+    started: float
+    finished: Optional[float]
+    status: Optional[str]
+
+
+class ArtifactStore:
+    """按运行、测试和步骤索引的产物存储
+
+    Args:
+        root: 存储根目录
+        run_id: 当前运行 ID，为 None 时使用 ``ARTIFACT_RUN_ID`` 或新生成
+    """
+
+    def __init__(self, root: str = "artifacts", run_id: Optional[str] = None):
+        self.root = Path(root)
+        self.run_id = run_id or os.environ.get(RUN_ID_ENV) or new_run_id()
+        self._db: Optional[sqlite3.Connection] = None
+        self._run_registered = False
+
+    @classmethod
+    def from_config(cls, **kwargs: Any) -> "ArtifactStore":
+        """使用 ``ARTIFACT_DIR`` 配置创建存储"""
+        from config import get_settings
+
+        kwargs.setdefault("root", get_settings().artifact_dir)
+        return cls(**kwargs)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.sqlite"
+
+    @property
+    def run_dir(self) -> Path:
+        """当前运行中边执行边追加的文件（如浸泡测试的逐迭代记录）所在的目录，不自动创建"""
+        return self.root / "runs" / self.run_id
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        # 第一次使用时才创建目录和数据库
+        if self._db is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.manifest_path, timeout=30, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _register_run(self) -> None:
+        if not self._run_registered:
+            self.db.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started) VALUES (?, ?)", (self.run_id, time.time())
+            )
+            self._run_registered = True
+
+    def blob_path(self, sha256: str, ext: str) -> Path:
+        return self.root / "blobs" / sha256[:2] / f"{sha256}{ext}"
+
+    def path(self, artifact: Artifact) -> Path:
+        """产物内容的文件路径"""
+        return self.blob_path(artifact.sha256, artifact.ext)
+
+    def _write_blob(self, data: bytes, ext: str) -> str:
+        sha256 = hashlib.sha256(data).hexdigest()
+        target = self.blob_path(sha256, ext)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再原子替换，并发写入相同内容时不会读到半个文件
+            fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        return sha256
+
+    def put(self, test: str, step: str, data: bytes, kind: str = "screenshot", ext: str = ".png") -> Artifact:
+        """保存一个产物
+
+        Args:
+            test: 测试 ID
+            step: 步骤名称
+            data: 产物内容
+            kind: 产物类型，如 screenshot、json、log
+            ext: 文件扩展名
+
+        Returns:
+            清单中的产物记录
+        """
+        self._register_run()
+        sha256 = self._write_blob(data, ext)
+        created = time.time()
+        cursor = self.db.execute(
+            "INSERT INTO artifacts (run_id, test, step, kind, sha256, ext, size, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.run_id, test, step, kind, sha256, ext, len(data), created),
+        )
+        return Artifact(cursor.lastrowid, self.run_id, test, step, kind, sha256, ext, len(data), created)
+
+    def put_json(self, test: str, step: str, value: Any) -> Artifact:
+        """以 JSON 保存结构化结果"""
+        data = json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+        return self.put(test, step, data, kind="json", ext=".json")
+
+    def for_test(self, test: str) -> "TestArtifacts":
+        """返回绑定到单个测试的产物写入器"""
+        return TestArtifacts(self, test)
+
+    def record_result(self, test: str, outcome: str, duration: float = 0.0) -> None:
+        """记录测试结果，同一运行中重复记录时以最后一次为准"""
+        self._register_run()
+        self.db.execute(
+            "INSERT OR REPLACE INTO results (run_id, test, outcome, duration) VALUES (?, ?, ?, ?)",
+            (self.run_id, test, outcome, duration),
+        )
+
+    def has_run(self) -> bool:
+        """当前运行是否已登记（本进程或其他 worker 写入过产物或结果），清单不存在时不创建"""
+        if self._run_registered:
+            return True
+        if not self.manifest_path.exists():
+            return False
+        return self.db.execute("SELECT 1 FROM runs WHERE run_id = ?", (self.run_id,)).fetchone() is not None
+
+    def finish(self, status: Optional[str] = None) -> None:
+        """结束当前运行
+
+        Args:
+            status: 运行状态，为 None 时根据已记录的测试结果判断
+        """
+        if status is None:
+            failed = self.db.execute(
+                "SELECT 1 FROM results WHERE run_id = ? AND outcome = 'failed' LIMIT 1", (self.run_id,)
+            ).fetchone()
+            status = "failed" if failed else "passed"
+        self.db.execute(
+            "UPDATE runs SET finished = ?, status = ? WHERE run_id = ?", (time.time(), status, self.run_id)
+        )
+
+    def runs(self, status: Optional[str] = None, test: Optional[str] = None, limit: int = 20) -> List[RunInfo]:
+        """按开始时间倒序列出运行
+
+        Args:
+            status: 只返回该状态的运行
+            test: 只返回该测试失败（status 为 failed 时）或运行过的运行
+        """
+        sql = "SELECT run_id, started, finished, status FROM runs WHERE 1 = 1"
+        params: List[Any] = []
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        if test:
+            sql += " AND run_id IN (SELECT run_id FROM results WHERE test = ?"
+            params.append(test)
+            if status == "failed":
+                sql += " AND outcome = 'failed'"
+            sql += ")"
+        sql += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+        return [RunInfo(*row) for row in self.db.execute(sql, params)]
+
+    def artifacts(
+        self,
+        run_id: Optional[str] = None,
+        test: Optional[str] = None,
+        step: Optional[str] = None,
+        kind: Optional[str] = None,
+    ) -> List[Artifact]:
+        """按条件查询产物，按写入顺序返回"""
+        sql = "SELECT id, run_id, test, step, kind, sha256, ext, size, created FROM artifacts WHERE 1 = 1"
+        params: List[Any] = []
+        for column, value in (("run_id", run_id), ("test", test), ("step", step), ("kind", kind)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        sql += " ORDER BY id"
+        return [Artifact(*row) for row in self.db.execute(sql, params)]
+
+    def find_step(self, step: str, test: Optional[str] = None, status: Optional[str] = None) -> Optional[Artifact]:
+        """最近一次运行中某个步骤的产物
+
+        Args:
+            step: 步骤名称
+            test: 测试 ID，为 None 时不限
+            status: 只在该状态的运行中查找，例如 ``failed``
+
+        Returns:
+            最新的匹配产物，没有时为 None
+        """
+        sql = (
+            "SELECT a.id, a.run_id, a.test, a.step, a.kind, a.sha256, a.ext, a.size, a.created "
+            "FROM artifacts a JOIN runs r ON a.run_id = r.run_id WHERE a.step = ?"
+        )
+        params: List[Any] = [step]
+        if test is not None:
+            sql += " AND a.test = ?"
+            params.append(test)
+        if status is not None:
+            sql += " AND r.status = ?"
+            params.append(status)
+        sql += " ORDER BY r.started DESC, a.id DESC LIMIT 1"
+        row = self.db.execute(sql, params).fetchone()
+        return Artifact(*row) if row else None
+
+
+class TestArtifacts:
+    """绑定到单个测试的产物写入器"""
+
+    __test__ = False
+
+    def __init__(self, store: ArtifactStore, test: str):
+        self.store = store
+        self.test = test
+
+    def put(self, step: str, data: bytes, kind: str = "screenshot", ext: str = ".png") -> Artifact:
+        return self.store.put(self.test, step, data, kind, ext)
+
+    def put_json(self, step: str, value: Any) -> Artifact:
+        return self.store.put_json(self.test, step, value)
+
+    def path(self, artifact: Artifact) -> Path:
+        return self.store.path(artifact)
+
+
+@lru_cache(maxsize=1)
+def get_artifact_store() -> ArtifactStore:
+    """当前进程共享的产物存储"""
+    return ArtifactStore.from_config()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="查询测试产物")
+    parser.add_argument("--root", default=None, help="存储根目录，默认使用 ARTIFACT_DIR")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    show = commands.add_parser("show", help="输出最近一次运行中某个步骤的产物路径")
+    show.add_argument("step")
+    show.add_argument("--test", help="测试 ID")
+    show.add_argument("--failed", action="store_true", help="只在失败的运行中查找")
+
+    runs = commands.add_parser("runs", help="列出最近的运行")
+    runs.add_argument("--failed", action="store_true", help="只列出失败的运行")
+    runs.add_argument("--limit", type=int, default=20)
+
+    listing = commands.add_parser("list", help="列出一次运行的全部产物")
+    listing.add_argument("run_id")
+    listing.add_argument("--test", help="测试 ID")
+
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    store = ArtifactStore(args.root, run_id="-") if args.root else ArtifactStore.from_config(run_id="-")
+
+    if args.command == "show":
+        artifact = store.find_step(args.step, args.test, "failed" if args.failed else None)
+        if artifact is None:
+            print(f"没有找到步骤 {args.step} 的产物", file=sys.stderr)
+            return 1
+        print(store.path(artifact))
+    elif args.command == "runs":
+        for run in store.runs("failed" if args.failed else None, limit=args.limit):
+            print(f"{run.run_id}\t{run.status or 'running'}")
+    else:
+        for artifact in store.artifacts(args.run_id, args.test):
+            print(f"{artifact.test}\t{artifact.step}\t{artifact.size}\t{store.path(artifact)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
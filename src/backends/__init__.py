@@ -0,0 +1,46 @@
+"""浏览器后端
+
+``BrowserMCPClient`` 的页面操作由可替换的后端执行，同一个测试可以在开发时用内存模拟在毫秒级运行，
+在 CI 中用真实浏览器运行，不需要维护两套代码：
+
+- ``fake``：``src/fake_dom.py`` 的内存页面模拟，加载本地 HTML 夹具，不启动浏览器
+- ``mcp``：通过 MCP 协议调用 Browser MCP 服务器（需要 ``mcp`` 包）
+- ``playwright``：Playwright 直接驱动浏览器（需要 ``playwright`` 包）
+
+每次运行通过 ``BROWSER_BACKEND`` 或 ``pytest --backend`` 选择。
+
+Usage:
+    async with BrowserMCPClient(backend=create_backend("playwright")) as browser:
+        await browser.navigate(url)
+"""
+from typing import Dict, Optional, Type
+
+from src.backends.base import Backend
+from src.backends.fake import FakeBackend
+from src.backends.mcp import MCPBackend
+from src.backends.playwright import PlaywrightBackend
+
+BACKENDS: Dict[str, Type[Backend]] = {
+    "fake": FakeBackend,
+    "mcp": MCPBackend,
+    "playwright": PlaywrightBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> Backend:
+    """按名称创建后端
+
+    Args:
+        name: 后端名称，为 None 时使用 ``BROWSER_BACKEND``
+
+    Raises:
+        ValueError: 未知的后端名称
+    """
+    if name is None:
+        from config import get_settings
+
+        name = get_settings().browser_backend
+    if name not in BACKENDS:
+        raise ValueError(f"未知的浏览器后端: {name}，可选值: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
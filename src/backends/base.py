@@ -0,0 +1,83 @@
+"""浏览器后端接口"""
+from typing import Any, Optional, Tuple
+
+from src.accessibility import AccessibilitySnapshot
+from src.cdp import CDPChannel
+
+
+def evaluation_expression(script: str) -> str:
+    """把 ``evaluate`` 的脚本转换为表达式，函数字符串（如 ``"() => ..."``）转换为对它的调用
+
+    CDP ``Runtime.evaluate`` 和 MCP ``browser_evaluate`` 只求值表达式或调用函数，
+    转换后同一段脚本在所有后端上的结果与 Playwright ``page.evaluate`` 一致。
+    """
+    script = script.strip().rstrip(";")
+    return f"(() => {{ const value = ({script}); return typeof value === 'function' ? value() : value; }})()"
+
+
+class Backend:
+    """``BrowserMCPClient`` 背后执行页面操作的浏览器后端
+
+    客户端负责截止时间、重试、熔断、监听器和事件日志，后端只负责在页面上执行一个操作。
+    选择器的含义由后端决定：fake 和 playwright 支持 CSS 与 ``text=``，mcp 使用快照 ref 和 ``text=``。
+
+    失败约定：
+        - 等待超时抛出 ``ToolTimeoutError``
+        - 页面中没有匹配的元素抛出 ``LookupError``；点击、填写和读取的 ``timeout`` 是定位元素的时间（毫秒），
+          在此期间找不到可操作的元素同样抛出 ``LookupError``
+        - 后端不支持的操作抛出 ``NotImplementedError``
+        - 与服务器或浏览器的连接断开抛出 ``ConnectionError``（只有这类失败计入客户端的熔断器）
+
+    Attributes:
+        name: 后端名称，即 ``BROWSER_BACKEND`` 的取值
+        version: 后端已知的页面变更计数，导航和交互后递增，客户端据此判断快照缓存是否失效
+        cdp: 后端提供的 CDP 直连通道，不支持时为 None
+    """
+
+    name = ""
+    version = 0
+    cdp: Optional[CDPChannel] = None
+
+    async def start(self) -> None:
+        """连接服务器或启动浏览器，由客户端的 ``__aenter__`` 调用"""
+
+    async def close(self) -> None:
+        """释放后端持有的资源，由客户端的 ``__aexit__`` 调用"""
+
+    async def navigate(self, url: str) -> Tuple[str, str]:
+        """导航到 URL，返回 (导航后的 URL, 标题)"""
+        raise NotImplementedError
+
+    async def click(self, selector: str, timeout: int) -> None:
+        raise NotImplementedError
+
+    async def fill(self, selector: str, text: str, timeout: int) -> None:
+        raise NotImplementedError
+
+    async def text(self, selector: str, timeout: int) -> str:
+        """元素的可见文本"""
+        raise NotImplementedError
+
+    async def attribute(self, selector: str, name: str, timeout: int) -> Optional[str]:
+        raise NotImplementedError
+
+    async def wait_for(self, selector: str, timeout: int, visible: bool) -> None:
+        raise NotImplementedError
+
+    async def wait_for_navigation(self, timeout: int) -> None:
+        raise NotImplementedError
+
+    async def screenshot(self, path: Optional[str]) -> bytes:
+        """截图，提供 ``path`` 时同时写入文件"""
+        raise NotImplementedError
+
+    async def evaluate(self, script: str) -> Any:
+        """按 Playwright ``page.evaluate`` 的约定执行脚本：表达式直接求值，函数字符串被调用，
+        返回 Promise 时等待其结果"""
+        raise NotImplementedError
+
+    async def url_and_title(self) -> Tuple[str, str]:
+        raise NotImplementedError
+
+    async def snapshot(self) -> AccessibilitySnapshot:
+        raise NotImplementedError
@@ -0,0 +1,61 @@
+"""内存页面模拟后端"""
+from typing import Any, Optional, Tuple
+
+from src.accessibility import AccessibilitySnapshot
+from src.backends.base import Backend
+from src.fake_dom import USER_AGENT, FakePage, FakeSite, get_fake_site
+
+
+class FakeBackend(Backend):
+    """在 ``src/fake_dom.py`` 的内存页面上执行操作，不启动浏览器
+
+    Args:
+        site: 提供页面的站点，默认为 ``FAKE_PAGES_DIR`` 中的 HTML 夹具
+    """
+
+    name = "fake"
+
+    def __init__(self, site: Optional[FakeSite] = None):
+        self.page = FakePage(site or get_fake_site())
+
+    @property
+    def version(self) -> int:
+        return self.page.version
+
+    async def navigate(self, url: str) -> Tuple[str, str]:
+        self.page.goto(url)
+        return self.page.url, self.page.title
+
+    async def click(self, selector: str, timeout: int) -> None:
+        self.page.click(selector)
+
+    async def fill(self, selector: str, text: str, timeout: int) -> None:
+        self.page.fill(selector, text)
+
+    async def text(self, selector: str, timeout: int) -> str:
+        return self.page.text(selector)
+
+    async def attribute(self, selector: str, name: str, timeout: int) -> Optional[str]:
+        return self.page.attribute(selector, name)
+
+    async def wait_for(self, selector: str, timeout: int, visible: bool) -> None:
+        # 虚拟时间，等待不会真正休眠
+        self.page.wait_for(selector, timeout, visible)
+
+    async def wait_for_navigation(self, timeout: int) -> None:
+        # 推进虚拟时间，执行延迟的表单提交等定时动作，直到发生导航
+        self.page.wait_for_navigation(timeout)
+
+    async def screenshot(self, path: Optional[str]) -> bytes:
+        # 没有渲染结果
+        return b""
+
+    async def evaluate(self, script: str) -> Any:
+        # 不执行脚本，返回页面信息
+        return {"url": self.page.url, "title": self.page.title, "userAgent": USER_AGENT}
+
+    async def url_and_title(self) -> Tuple[str, str]:
+        return self.page.url, self.page.title
+
+    async def snapshot(self) -> AccessibilitySnapshot:
+        return self.page.snapshot()
@@ -0,0 +1,220 @@
+"""Browser MCP 服务器后端"""
+import asyncio
+import base64
+import json
+import re
+import shlex
+import time
+from contextlib import AsyncExitStack
+from typing import Any, List, Optional, Tuple
+
+from src.accessibility import AccessibilityNode, AccessibilitySnapshot
+from src.backends.base import Backend, evaluation_expression
+from src.errors import BrowserMCPError, ToolTimeoutError
+
+# 工具返回的快照文本中的页面信息，例如：- Page URL: https://example.com/
+_PAGE_URL = re.compile(r"^\s*-\s*Page URL:\s*(\S+)", re.MULTILINE)
+_PAGE_TITLE = re.compile(r"^\s*-\s*Page Title:[ \t]*(.*)$", re.MULTILINE)
+
+# 快照 ref，例如 e12 或 s1e12，也可以写成 ref=e12
+_REF = re.compile(r"^(?:ref=)?([a-z]?\d*e\d+)$")
+
+# browser_evaluate 以 Markdown 分节返回结果时的结果节，例如：### Result\n"text"\n\n### Ran Playwright code
+_RESULT_SECTION = re.compile(r"^### Result\n(.*?)(?:\n\n###|\Z)", re.MULTILINE | re.DOTALL)
+
+# MCP SDK 的 stdio 流断开时抛出的 anyio 异常，转换为 ConnectionError 计入熔断器
+_TRANSPORT_ERRORS = ("ClosedResourceError", "BrokenResourceError", "EndOfStream")
+
+
+class MCPBackend(Backend):
+    """通过 MCP 协议调用 Browser MCP 服务器的工具
+
+    Browser MCP 基于可访问性快照定位元素，不支持 CSS 选择器：选择器可以是快照 ref（``e12``、``ref=e12``）
+    或 ``text=``（按快照中的可访问名称匹配）；也可以在客户端按 role/name 定位。
+
+    Args:
+        command: 启动 MCP 服务器的命令，为 None 时使用 ``MCP_SERVER_COMMAND``
+        session: 已连接的 MCP 会话（需要 ``call_tool(name, arguments)``），提供时不启动服务器
+        poll_interval: 等待元素或导航时重新获取快照的间隔（秒）
+    """
+
+    name = "mcp"
+
+    def __init__(self, command: Optional[str] = None, session: Any = None, poll_interval: float = 0.25):
+        self.command = command
+        self.session = session
+        self.poll_interval = poll_interval
+        self._stack: Optional[AsyncExitStack] = None
+        self._url = ""
+        self._title = ""
+        self._snapshot: Optional[AccessibilitySnapshot] = None
+        # 最近一次快照对应的页面版本
+        self._snapshot_version = -1
+        # 最近一次改变页面的操作之前的 URL
+        self._url_before_action = ""
+
+    async def start(self) -> None:
+        if self.session is not None:
+            return
+        # 只有选择了该后端才导入 MCP SDK
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
+        from config import get_settings
+
+        command = shlex.split(self.command or get_settings().mcp_server_command)
+        self._stack = AsyncExitStack()
+        read, write = await self._stack.enter_async_context(
+            stdio_client(StdioServerParameters(command=command[0], args=command[1:]))
+        )
+        self.session = await self._stack.enter_async_context(ClientSession(read, write))
+        await self.session.initialize()
+
+    async def close(self) -> None:
+        if self._stack is not None:
+            await self._stack.aclose()
+            self._stack = None
+            self.session = None
+
+    async def _call_tool(self, name: str, arguments: Optional[dict] = None, changes_page: bool = False) -> Any:
+        if changes_page:
+            self._url_before_action = self._url
+        try:
+            result = await self.session.call_tool(name, arguments or {})
+        except Exception as e:
+            if type(e).__name__ in _TRANSPORT_ERRORS:
+                raise ConnectionError(f"{name} 失败: MCP 服务器连接已断开") from e
+            raise
+        if changes_page:
+            self.version += 1
+        if getattr(result, "isError", False):
+            raise BrowserMCPError(f"{name} 失败: {_text(result)}")
+        self._absorb(_text(result))
+        return result
+
+    def _absorb(self, text: str) -> None:
+        """从工具返回的文本中记录页面 URL、标题和快照"""
+        url = _PAGE_URL.search(text)
+        if url:
+            self._url = url.group(1)
+        title = _PAGE_TITLE.search(text)
+        if title:
+            self._title = title.group(1).strip()
+        if "[ref=" in text:
+            self._snapshot = AccessibilitySnapshot.parse(text)
+            self._snapshot_version = self.version
+
+    async def _find(self, selector: str) -> AccessibilityNode:
+        """在当前快照中定位选择器对应的元素
+
+        Raises:
+            ValueError: 不是 ref 或 ``text=`` 选择器
+            LookupError: 快照中没有匹配的元素
+        """
+        snapshot = await self.snapshot()
+        ref = _REF.match(selector)
+        if ref:
+            node = next((n for n in snapshot.nodes if n.ref == ref.group(1)), None)
+        elif selector.startswith("text="):
+            needle = selector[5:].strip()
+            if needle[:1] in ("'", '"') and needle[-1:] == needle[:1]:
+                node = next((n for n in snapshot.nodes if n.name == needle[1:-1]), None)
+            else:
+                node = next((n for n in snapshot.nodes if needle.lower() in n.name.lower()), None)
+        else:
+            raise ValueError(f"MCP 后端通过快照定位元素，不支持 CSS 选择器: {selector}（请使用 role/name、ref 或 text=）")
+        if node is None:
+            raise LookupError(f"快照中找不到元素: {selector}")
+        return node
+
+    async def navigate(self, url: str) -> Tuple[str, str]:
+        await self._call_tool("browser_navigate", {"url": url}, changes_page=True)
+        return await self.url_and_title()
+
+    async def click(self, selector: str, timeout: int) -> None:
+        node = await self._find(selector)
+        await self._call_tool("browser_click", {"element": node.name or node.role, "ref": node.ref}, changes_page=True)
+
+    async def fill(self, selector: str, text: str, timeout: int) -> None:
+        node = await self._find(selector)
+        await self._call_tool(
+            "browser_type",
+            {"element": node.name or node.role, "ref": node.ref, "text": text, "submit": False},
+            changes_page=True,
+        )
+
+    async def text(self, selector: str, timeout: int) -> str:
+        # 快照只包含可访问名称，元素文本在页面中按 ref 读取
+        node = await self._find(selector)
+        value = await self._evaluate(
+            {"element": node.name or node.role, "ref": node.ref, "function": "(element) => element.innerText"}
+        )
+        return "" if value is None else str(value)
+
+    async def attribute(self, selector: str, name: str, timeout: int) -> Optional[str]:
+        raise NotImplementedError("Browser MCP 不提供读取元素属性的工具")
+
+    async def wait_for(self, selector: str, timeout: int, visible: bool) -> None:
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            try:
+                await self._find(selector)
+                return
+            except LookupError:
+                if time.monotonic() >= deadline:
+                    raise ToolTimeoutError(f"等待元素超时（{timeout}ms）: {selector}")
+            await asyncio.sleep(self.poll_interval)
+            self.version += 1
+
+    async def wait_for_navigation(self, timeout: int) -> None:
+        # 没有等待导航的工具：轮询快照直到 URL 相对上一次操作之前发生变化或超时；
+        # 点击等操作返回时导航可能已经完成
+        start_url = self._url_before_action
+        if self._url != start_url:
+            return
+        deadline = time.monotonic() + timeout / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            self.version += 1
+            await self.snapshot()
+            if self._url != start_url:
+                return
+        raise ToolTimeoutError(f"等待导航超时（{timeout}ms）: {start_url}")
+
+    async def screenshot(self, path: Optional[str]) -> bytes:
+        result = await self._call_tool("browser_screenshot")
+        data = b"".join(base64.b64decode(c.data) for c in result.content if getattr(c, "type", "") == "image")
+        if path:
+            with open(path, "wb") as f:
+                f.write(data)
+        return data
+
+    async def evaluate(self, script: str) -> Any:
+        return await self._evaluate({"function": f"() => {evaluation_expression(script)}"})
+
+    async def _evaluate(self, arguments: dict) -> Any:
+        """调用 browser_evaluate，结果为 JSON 时解析"""
+        result = _text(await self._call_tool("browser_evaluate", arguments))
+        section = _RESULT_SECTION.search(result)
+        if section:
+            result = section.group(1).strip()
+        try:
+            return json.loads(result)
+        except ValueError:
+            return result
+
+    async def url_and_title(self) -> Tuple[str, str]:
+        if not self._url:
+            await self.snapshot()
+        return self._url, self._title
+
+    async def snapshot(self) -> AccessibilitySnapshot:
+        if self._snapshot is None or self._snapshot_version != self.version:
+            await self._call_tool("browser_snapshot")
+        return self._snapshot or AccessibilitySnapshot()
+
+
+def _text(result: Any) -> str:
+    """工具结果中的全部文本内容"""
+    parts: List[str] = [c.text for c in getattr(result, "content", []) if getattr(c, "type", "") == "text"]
+    return "\n".join(parts)
@@ -0,0 +1,111 @@
+"""Playwright 直接驱动浏览器的后端"""
+from typing import Any, Awaitable, Optional, Tuple, TypeVar
+
+from src.accessibility import AccessibilitySnapshot
+from src.backends.base import Backend
+from src.cdp import CDPChannel
+from src.errors import ToolTimeoutError
+from src.fake_dom import accessibility_snapshot, parse_html
+
+T = TypeVar("T")
+
+
+class PlaywrightBackend(Backend):
+    """通过 Playwright 直接驱动浏览器
+
+    CSS 和 ``text=`` 选择器原样交给 Playwright；Chromium 上同时提供 CDP 通道，
+    客户端的 URL/标题读取、截图和脚本执行直接走 CDP。
+
+    Args:
+        profile: 浏览器启动配置名称，为 None 时使用 ``BROWSER_PROFILE``
+        page: 已有的 Playwright 页面；提供时不启动浏览器，``close()`` 也不关闭页面，
+            便于直接使用 Playwright 的流程复用客户端的操作
+    """
+
+    name = "playwright"
+
+    def __init__(self, profile: Optional[str] = None, page: Any = None):
+        self.profile = profile
+        self.page = page
+        self._owns_page = page is None
+        self._playwright: Any = None
+        self._browser: Any = None
+
+    async def start(self) -> None:
+        if self.page is None:
+            # 只有选择了该后端才导入 Playwright
+            from playwright.async_api import async_playwright
+
+            from config import TestConfig
+
+            profile = TestConfig.get_browser_profile(self.profile)
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(**profile["launch"])
+            self.page = await self._browser.new_page(**profile["context"])
+        self.cdp = await CDPChannel.attach(self.page)
+
+    async def close(self) -> None:
+        if self._owns_page:
+            if self._browser is not None:
+                await self._browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+            self.page = self._browser = self._playwright = None
+
+    async def _run(
+        self, operation: Awaitable[T], changes_page: bool = False, selector: Optional[str] = None
+    ) -> T:
+        # Playwright 的超时异常转换为 ToolTimeoutError，页面或浏览器已关闭转换为 ConnectionError，
+        # 与其他后端一致；提供 selector 时操作是对元素的定位，超时说明页面中没有可操作的元素，
+        # 转换为 LookupError，既不重试也不计入熔断器
+        try:
+            return await operation
+        except Exception as e:
+            if type(e).__name__ == "TimeoutError":
+                message = str(e).splitlines()[0]
+                if selector is not None:
+                    raise LookupError(f"页面中找不到可操作的元素: {selector}（{message}）") from e
+                raise ToolTimeoutError(message) from e
+            if type(e).__name__ == "TargetClosedError":
+                raise ConnectionError(str(e).splitlines()[0]) from e
+            raise
+        finally:
+            if changes_page:
+                self.version += 1
+
+    async def navigate(self, url: str) -> Tuple[str, str]:
+        await self._run(self.page.goto(url, wait_until="domcontentloaded"), changes_page=True)
+        return self.page.url, await self.page.title()
+
+    async def click(self, selector: str, timeout: int) -> None:
+        await self._run(self.page.click(selector, timeout=timeout), changes_page=True, selector=selector)
+
+    async def fill(self, selector: str, text: str, timeout: int) -> None:
+        await self._run(self.page.fill(selector, text, timeout=timeout), changes_page=True, selector=selector)
+
+    async def text(self, selector: str, timeout: int) -> str:
+        return await self._run(self.page.inner_text(selector, timeout=timeout), selector=selector)
+
+    async def attribute(self, selector: str, name: str, timeout: int) -> Optional[str]:
+        return await self._run(self.page.get_attribute(selector, name, timeout=timeout), selector=selector)
+
+    async def wait_for(self, selector: str, timeout: int, visible: bool) -> None:
+        state = "visible" if visible else "attached"
+        await self._run(self.page.wait_for_selector(selector, timeout=timeout, state=state), changes_page=True)
+
+    async def wait_for_navigation(self, timeout: int) -> None:
+        await self._run(self.page.wait_for_load_state("load", timeout=timeout), changes_page=True)
+
+    async def screenshot(self, path: Optional[str]) -> bytes:
+        return await self._run(self.page.screenshot(path=path))
+
+    async def evaluate(self, script: str) -> Any:
+        return await self._run(self.page.evaluate(script))
+
+    async def url_and_title(self) -> Tuple[str, str]:
+        return self.page.url, await self.page.title()
+
+    async def snapshot(self) -> AccessibilitySnapshot:
+        # 用与模拟后端相同的规则从页面 HTML 生成快照，ref 是 Playwright 可以直接使用的 CSS 选择器；
+        # 只能识别 hidden 属性和内联样式隐藏的元素
+        return accessibility_snapshot(parse_html(await self.page.content()))
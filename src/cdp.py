@@ -0,0 +1,184 @@
+"""Chrome DevTools Protocol 直连通道
+
+读取 URL/标题、截图、键盘输入等高频操作经过 Playwright 或 MCP 抽象层时每次都有额外开销。
+``CDPChannel`` 为每个页面复用一个 CDP 会话，把这些操作直接发送为 CDP 命令：
+
+- ``Runtime.evaluate``（returnByValue）一次往返同时读取 URL 和标题
+- ``Page.captureScreenshot`` 支持 clip、jpeg/webp 格式和质量参数
+- ``Input.dispatchKeyEvent`` / ``Input.insertText`` 批量发送，不逐个等待
+
+CDP 只在 Chromium 上可用；``CDPChannel.attach`` 在其他浏览器上返回 None，调用方回退到 Playwright。
+"""
+import asyncio
+import base64
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.errors import CDPError
+
+
+# 常用按键的 CDP 参数：key, code, windowsVirtualKeyCode, text
+_KEYS: Dict[str, Tuple[str, str, int, str]] = {
+    "Enter": ("Enter", "Enter", 13, "\r"),
+    "Tab": ("Tab", "Tab", 9, ""),
+    "Backspace": ("Backspace", "Backspace", 8, ""),
+    "Delete": ("Delete", "Delete", 46, ""),
+    "Escape": ("Escape", "Escape", 27, ""),
+    "ArrowUp": ("ArrowUp", "ArrowUp", 38, ""),
+    "ArrowDown": ("ArrowDown", "ArrowDown", 40, ""),
+    "ArrowLeft": ("ArrowLeft", "ArrowLeft", 37, ""),
+    "ArrowRight": ("ArrowRight", "ArrowRight", 39, ""),
+    "Home": ("Home", "Home", 36, ""),
+    "End": ("End", "End", 35, ""),
+}
+
+# 每个页面复用同一个通道
+_channels: "weakref.WeakKeyDictionary[Any, CDPChannel]" = weakref.WeakKeyDictionary()
+
+
+class CDPChannel:
+    """页面的 CDP 直连通道
+
+    Usage:
+        cdp = await CDPChannel.attach(page)
+        if cdp:
+            url, title = await cdp.url_and_title()
+            await cdp.screenshot("step1.jpg", format="jpeg", quality=70)
+            await cdp.press("Enter")
+
+    Args:
+        session: Playwright CDPSession，或任何提供 ``send(method, params)`` 的对象
+    """
+
+    def __init__(self, session: Any):
+        self.session = session
+        self.calls = 0
+
+    @classmethod
+    async def attach(cls, page: Any) -> Optional["CDPChannel"]:
+        """获取页面的 CDP 通道，同一页面多次调用返回同一个通道
+
+        Args:
+            page: Playwright 页面
+
+        Returns:
+            CDP 通道；浏览器不支持 CDP 时返回 None
+        """
+        channel = _channels.get(page)
+        if channel is not None:
+            return channel
+        try:
+            session = await page.context.new_cdp_session(page)
+        except Exception:
+            return None
+        channel = _channels[page] = cls(session)
+        return channel
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """发送一条 CDP 命令"""
+        self.calls += 1
+        try:
+            return await self.session.send(method, params or {})
+        except Exception as e:
+            raise CDPError(f"{method} 失败: {e}") from e
+
+    async def send_batch(self, commands: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """连续发送多条命令，不等待前一条返回
+
+        同一会话上的命令按发送顺序执行，因此批量发送只节省往返等待，不改变执行顺序。
+        """
+        return list(await asyncio.gather(*(self.send(method, params) for method, params in commands)))
+
+    async def evaluate(self, expression: str, await_promise: bool = False) -> Any:
+        """执行表达式并按值返回结果
+
+        Raises:
+            CDPError: 表达式抛出异常
+        """
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise,
+        })
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            message = details.get("exception", {}).get("description") or details.get("text", "")
+            raise CDPError(f"页面脚本异常: {message}")
+        return result.get("result", {}).get("value")
+
+    async def url_and_title(self) -> Tuple[str, str]:
+        """一次往返读取当前 URL 和标题"""
+        url, title = await self.evaluate("[location.href, document.title]")
+        return url, title
+
+    async def screenshot(
+        self,
+        path: Optional[str] = None,
+        format: str = "png",
+        quality: Optional[int] = None,
+        clip: Optional[Dict[str, float]] = None,
+        full_page: bool = False,
+    ) -> bytes:
+        """截图
+
+        Args:
+            path: 保存路径，为 None 时只返回图片数据
+            format: png、jpeg 或 webp
+            quality: jpeg/webp 质量（0-100）
+            clip: 截图区域 ``{x, y, width, height}``（CSS 像素）
+            full_page: 截取整个页面而不只是视口
+
+        Returns:
+            图片数据
+        """
+        params: Dict[str, Any] = {"format": format}
+        if quality is not None and format != "png":
+            params["quality"] = quality
+        if full_page and clip is None:
+            metrics = await self.send("Page.getLayoutMetrics")
+            size = metrics.get("cssContentSize") or metrics["contentSize"]
+            clip = {"x": 0, "y": 0, "width": size["width"], "height": size["height"]}
+            params["captureBeyondViewport"] = True
+        if clip is not None:
+            params["clip"] = {"scale": 1, **clip}
+        result = await self.send("Page.captureScreenshot", params)
+        data = base64.b64decode(result["data"])
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_bytes(data)
+        return data
+
+    async def insert_text(self, text: str) -> None:
+        """在焦点元素中插入文本（一条命令，不逐字符发送按键）"""
+        await self.send("Input.insertText", {"text": text})
+
+    async def press(self, *keys: str) -> None:
+        """批量按下并释放按键
+
+        Args:
+            keys: 按键名称（如 Enter、Tab、ArrowDown）或单个字符
+        """
+        commands = []
+        for key in keys:
+            if key in _KEYS:
+                name, code, vk, text = _KEYS[key]
+            elif len(key) == 1:
+                name, code, vk, text = key, "", ord(key.upper()), key
+            else:
+                raise ValueError(f"未知的按键: {key}")
+            down = {"type": "keyDown", "key": name, "code": code, "windowsVirtualKeyCode": vk}
+            if text:
+                down["text"] = text
+            commands.append(("Input.dispatchKeyEvent", down))
+            commands.append(("Input.dispatchKeyEvent", {
+                "type": "keyUp", "key": name, "code": code, "windowsVirtualKeyCode": vk,
+            }))
+        await self.send_batch(commands)
+
+    async def detach(self) -> None:
+        """断开 CDP 会话"""
+        for page, channel in list(_channels.items()):
+            if channel is self:
+                del _channels[page]
+        await self.session.detach()
@@ -0,0 +1,191 @@
+"""流式回复完成检测
+
+组合多个回复结束信号，在回复实际完成时立即结束等待，
+而不是在 "Working on it" 消失后固定轮询文本长度：
+
+- ``network``: 提交后发起的对话请求（fetch/xhr/eventsource）全部结束
+- ``buttons``: 最后一条消息处出现复制、反馈等只在回复结束后显示的按钮
+- ``stable``: 最后一条消息文本的哈希在 ``stable_window`` 内保持不变
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.conversation import DEFAULT_MESSAGE_CONTAINERS
+from src.page_scripts import page_scripts
+
+
+# 回复结束后才出现的操作按钮
+DEFAULT_DONE_BUTTONS = ", ".join([
+    "button[aria-label*='copy' i]",
+    "button[title*='copy' i]",
+    "button[aria-label*='good response' i]",
+    "button[aria-label*='bad response' i]",
+    "button[aria-label*='feedback' i]",
+    "[data-testid*='copy' i]",
+    "[data-testid*='feedback' i]",
+])
+
+
+def default_request_filter(request: Any) -> bool:
+    """默认只追踪 POST 方式的 fetch/xhr/eventsource 请求"""
+    return request.resource_type in ("fetch", "xhr", "eventsource") and request.method == "POST"
+
+
+@dataclass
+class CompletionResult:
+    """完成检测结果
+
+    Attributes:
+        complete: 是否判定回复已完成（False 表示超时）
+        signals: 判定时成立的信号
+        elapsed: 等待时间（秒）
+        length: 最后一条消息的文本长度
+    """
+
+    complete: bool
+    signals: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    length: int = 0
+
+
+class CompletionDetector:
+    """流式回复完成检测器
+
+    Usage:
+        detector = CompletionDetector(page)
+        detector.start()                 # 提交问题前开始监听网络请求
+        await input_locator.press("Enter")
+        result = await detector.wait(timeout=120000)
+
+    Args:
+        page: Playwright 页面
+        stable_window: 文本保持不变多久视为稳定（毫秒）
+        interval: 轮询间隔（毫秒）
+        min_signals: 至少多少个信号同时成立才判定完成
+        quiet_window: 没有其他信号时，文本稳定多久也判定完成（毫秒）
+        containers: 消息容器的 CSS 选择器
+        done_buttons: 回复结束后出现的按钮的 CSS 选择器
+        request_filter: 判断请求是否属于对话流的函数
+        registry: 页面脚本注册表
+        clock: 时钟函数，返回秒
+    """
+
+    def __init__(
+        self,
+        page: Any,
+        stable_window: int = 2000,
+        interval: int = 250,
+        min_signals: int = 2,
+        quiet_window: int = 10000,
+        containers: str = DEFAULT_MESSAGE_CONTAINERS,
+        done_buttons: str = DEFAULT_DONE_BUTTONS,
+        request_filter: Callable[[Any], bool] = default_request_filter,
+        registry: Any = page_scripts,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.page = page
+        self.stable_window = stable_window
+        self.interval = interval
+        self.min_signals = min_signals
+        self.quiet_window = quiet_window
+        self.containers = containers
+        self.done_buttons = done_buttons
+        self.request_filter = request_filter
+        self.registry = registry
+        self.clock = clock
+        self._pending: set = set()
+        self._seen = 0
+        self._hash: Optional[str] = None
+        self._hash_since = 0.0
+        self._listening = False
+
+    @property
+    def network_done(self) -> bool:
+        """是否已有对话请求且全部结束"""
+        return self._seen > 0 and not self._pending
+
+    def start(self) -> None:
+        """开始监听页面网络请求，应在提交问题前调用"""
+        if self._listening:
+            return
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_finished)
+        self.page.on("requestfailed", self._on_finished)
+        self._listening = True
+
+    def stop(self) -> None:
+        """停止监听网络请求"""
+        if not self._listening:
+            return
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_finished)
+        self.page.remove_listener("requestfailed", self._on_finished)
+        self._listening = False
+
+    def _on_request(self, request: Any) -> None:
+        if self.request_filter(request):
+            self._pending.add(request)
+            self._seen += 1
+
+    def _on_finished(self, request: Any) -> None:
+        self._pending.discard(request)
+
+    def update(self, probe: Dict[str, Any], now: float) -> Optional[List[str]]:
+        """根据一次页面探测结果更新状态
+
+        Args:
+            probe: 页面脚本返回的 ``{hash, length, buttons}``
+            now: 当前时间（秒）
+
+        Returns:
+            判定完成时返回成立的信号列表，否则返回 None
+        """
+        if probe["hash"] != self._hash:
+            self._hash = probe["hash"]
+            self._hash_since = now
+        stable_for = (now - self._hash_since) * 1000 if self._hash else 0
+
+        signals = []
+        if self.network_done:
+            signals.append("network")
+        if probe.get("buttons"):
+            signals.append("buttons")
+        if stable_for >= self.stable_window:
+            signals.append("stable")
+
+        if len(signals) >= self.min_signals:
+            return signals
+        if stable_for >= self.quiet_window:
+            return signals
+        return None
+
+    async def probe(self) -> Dict[str, Any]:
+        """探测最后一条消息的文本哈希和按钮状态"""
+        return await self.registry.call(self.page, "completionProbe", {
+            "containers": self.containers,
+            "buttons": self.done_buttons,
+        })
+
+    async def wait(self, timeout: int = 30000) -> CompletionResult:
+        """等待回复完成
+
+        Args:
+            timeout: 超时时间（毫秒）
+
+        Returns:
+            完成检测结果，超时时 ``complete`` 为 False
+        """
+        self.start()
+        start = self.clock()
+        deadline = start + timeout / 1000
+        while True:
+            probe = await self.probe()
+            now = self.clock()
+            signals = self.update(probe, now)
+            if signals is not None:
+                return CompletionResult(True, signals, now - start, probe.get("length", 0))
+            if now >= deadline:
+                return CompletionResult(False, [], now - start, probe.get("length", 0))
+            await asyncio.sleep(self.interval / 1000)
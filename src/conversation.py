@@ -0,0 +1,135 @@
+"""结构化对话提取
+
+直接定位聊天记录中的消息容器，按文档顺序返回 ``{role, text, timestamp}`` 记录，
+替代 "收集所有长文本元素 + 读取布局排序 + 子串去重" 的提取方式。
+页面内维护增量索引，流式输出期间重复提取只传回发生变化的消息。
+"""
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from src.page_scripts import page_scripts
+
+
+# 默认的消息容器选择器，可按被测应用的 DOM 结构覆盖
+DEFAULT_MESSAGE_CONTAINERS = ", ".join([
+    "[data-message-author-role]",
+    "[data-role]",
+    "[role='article']",
+    "[class*='message' i]:not([class*='messages' i])",
+])
+
+
+@dataclass
+class ConversationMessage:
+    """一条对话消息
+
+    Attributes:
+        role: 消息角色，user、assistant 或 unknown
+        text: 消息文本（不含按钮和时间戳元素中的文本）
+        timestamp: 消息时间戳，找不到时为 None
+    """
+
+    role: str
+    text: str
+    timestamp: Optional[str] = None
+
+
+class ConversationExtractor:
+    """聊天记录提取器
+
+    Usage:
+        conversation = ConversationExtractor(page)
+        await conversation.extract()          # 提交问题前建立索引
+        ...
+        messages = await conversation.extract()
+        reply = conversation.reply_to(QUESTION)
+
+    Args:
+        page: Playwright 页面
+        containers: 消息容器的 CSS 选择器
+        registry: 页面脚本注册表
+    """
+
+    def __init__(
+        self,
+        page: Any,
+        containers: str = DEFAULT_MESSAGE_CONTAINERS,
+        registry: Any = page_scripts,
+    ):
+        self.page = page
+        self.containers = containers
+        self.registry = registry
+        self.messages: List[ConversationMessage] = []
+        self._epoch = -1
+        self._seq = 0
+
+    async def extract(self) -> List[ConversationMessage]:
+        """提取当前的消息列表
+
+        第一次调用或消息容器结构变化时返回全量记录，之后只合并变化的消息。
+
+        Returns:
+            按文档顺序排列的消息列表
+        """
+        payload = await self.registry.call(self.page, "extractMessages", {
+            "containers": self.containers,
+            "since": self._seq,
+            "epoch": self._epoch,
+        })
+        self.apply(payload)
+        return self.messages
+
+    def apply(self, payload: dict) -> None:
+        """合并页面脚本返回的增量记录"""
+        if payload["epoch"] != self._epoch:
+            self.messages = []
+            self._epoch = payload["epoch"]
+        count = payload["count"]
+        del self.messages[count:]
+        while len(self.messages) < count:
+            self.messages.append(ConversationMessage("unknown", ""))
+        for record in payload["changed"]:
+            self.messages[record["index"]] = ConversationMessage(
+                role=record["role"],
+                text=record["text"],
+                timestamp=record.get("timestamp"),
+            )
+        self._seq = payload["seq"]
+
+    def last(self, role: str = "assistant") -> Optional[ConversationMessage]:
+        """返回指定角色的最后一条消息"""
+        for message in reversed(self.messages):
+            if message.role == role:
+                return message
+        return None
+
+    def find_question(self, question: str) -> Optional[ConversationMessage]:
+        """返回包含问题文本的最后一条消息"""
+        for message in reversed(self.messages):
+            if question in message.text:
+                return message
+        return None
+
+    def reply_to(self, question: str) -> Optional[str]:
+        """返回问题之后、下一条用户消息之前的全部非用户消息文本
+
+        Args:
+            question: 用户问题文本
+
+        Returns:
+            合并后的回复文本，找不到问题或回复时返回 None
+        """
+        start = None
+        for i in range(len(self.messages) - 1, -1, -1):
+            if question in self.messages[i].text:
+                start = i
+                break
+        if start is None:
+            return None
+        replies = []
+        for message in self.messages[start + 1:]:
+            if message.role == "user":
+                break
+            if message.text:
+                replies.append(message.text)
+        return "\n\n".join(replies) or None
@@ -0,0 +1,270 @@
+"""测试账号池
+
+并行运行登录测试时，多个会话共用同一个账号会互相踢下线。
+账号池从环境变量或文件加载多个账号，测试在运行期间租用一个账号：
+
+- 租约通过锁定 ``<lock_dir>/<账号>.lock`` 实现，跨进程（pytest-xdist worker）安全，
+  进程异常退出时操作系统自动释放锁。POSIX 上使用 ``fcntl.flock``，Windows 上没有 ``fcntl``，
+  改用 ``msvcrt.locking`` 锁定文件首字节
+- 每个账号有独立的 storage state 缓存文件，登录一次后同一账号的后续测试可直接复用会话
+
+账号格式：
+    PROTAGO_TEST_ACCOUNTS="a@example.com:pass1,b@example.com:pass2"
+    PROTAGO_TEST_ACCOUNTS_FILE=accounts.json   # [{"email": ..., "password": ...}, ...]
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _try_lock(fd: int) -> bool:
+    """以非阻塞方式独占锁定文件，已被其他进程锁定时返回 False"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    """释放 ``_try_lock`` 获得的锁"""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@dataclass(frozen=True)
+class Credential:
+    """一个测试账号"""
+
+    email: str
+    password: str
+
+    @property
+    def slug(self) -> str:
+        """用于锁文件和 storage state 文件名的账号标识"""
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", self.email)
+
+    def as_dict(self):
+        """返回与 ``TestConfig.get_test_credentials()`` 相同结构的字典"""
+        return {"email": self.email, "password": self.password}
+
+
+def parse_credentials(value: str) -> List[Credential]:
+    """解析 ``email:password`` 逗号分隔列表或 JSON 数组
+
+    Args:
+        value: 环境变量或文件内容
+
+    Returns:
+        账号列表
+    """
+    value = value.strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        return [Credential(item["email"], item["password"]) for item in json.loads(value)]
+    credentials = []
+    for item in value.split(","):
+        email, sep, password = item.strip().partition(":")
+        if not sep:
+            raise ValueError(f"账号格式应为 email:password，实际: {item.strip()!r}")
+        credentials.append(Credential(email, password))
+    return credentials
+
+
+class Lease:
+    """一次账号租约
+
+    Attributes:
+        credential: 租用的账号
+        storage_state_path: 该账号的 storage state 缓存路径
+    """
+
+    def __init__(self, credential: Credential, storage_state_path: Path, fd: int):
+        self.credential = credential
+        self.storage_state_path = storage_state_path
+        self._fd: Optional[int] = fd
+
+    @property
+    def email(self) -> str:
+        return self.credential.email
+
+    @property
+    def password(self) -> str:
+        return self.credential.password
+
+    @property
+    def storage_state(self) -> Optional[str]:
+        """已缓存的 storage state 路径，可直接传给 ``new_context(storage_state=...)``；没有缓存时为 None"""
+        return str(self.storage_state_path) if self.storage_state_path.exists() else None
+
+    async def save_storage_state(self, context: Any) -> str:
+        """登录成功后保存浏览器上下文的 storage state
+
+        Args:
+            context: Playwright BrowserContext
+
+        Returns:
+            保存的文件路径
+        """
+        self.storage_state_path.parent.mkdir(parents=True, exist_ok=True)
+        await context.storage_state(path=str(self.storage_state_path))
+        return str(self.storage_state_path)
+
+    def invalidate_storage_state(self) -> None:
+        """删除缓存的 storage state，例如会话已过期"""
+        self.storage_state_path.unlink(missing_ok=True)
+
+    @property
+    def active(self) -> bool:
+        return self._fd is not None
+
+    def release(self) -> None:
+        """释放租约"""
+        if self._fd is None:
+            return
+        _unlock(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+
+class CredentialPool:
+    """跨进程安全的测试账号池
+
+    Usage:
+        pool = CredentialPool.from_config()
+        async with pool.lease() as lease:
+            context = await browser.new_context(storage_state=lease.storage_state)
+            ...
+            await lease.save_storage_state(context)
+
+    Args:
+        credentials: 账号列表
+        lock_dir: 锁文件目录，所有进程必须使用同一目录
+        state_dir: storage state 缓存目录
+        poll_interval: 没有空闲账号时的重试间隔（秒）
+    """
+
+    def __init__(
+        self,
+        credentials: List[Credential],
+        lock_dir: str = ".auth/locks",
+        state_dir: str = ".auth/state",
+        poll_interval: float = 0.2,
+    ):
+        if not credentials:
+            raise ValueError("账号池为空")
+        self.credentials = list(credentials)
+        self.lock_dir = Path(lock_dir)
+        self.state_dir = Path(state_dir)
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_config(cls, fallback: Optional[Credential] = None, **kwargs: Any) -> "CredentialPool":
+        """从项目配置创建账号池
+
+        依次使用 ``PROTAGO_TEST_ACCOUNTS``、``PROTAGO_TEST_ACCOUNTS_FILE``，
+        都未设置时退回到 ``PROTAGO_TEST_EMAIL`` / ``PROTAGO_TEST_PASSWORD`` 单个账号。
+
+        Args:
+            fallback: 以上都未设置时使用的账号，为 None 时使用 ``PROTAGO_TEST_EMAIL`` 的默认值
+        """
+        from config import get_settings
+
+        settings = get_settings()
+        credentials = parse_credentials(settings.test_accounts)
+        if not credentials and settings.test_accounts_file:
+            credentials = parse_credentials(Path(settings.test_accounts_file).read_text(encoding="utf-8"))
+        if not credentials and fallback is not None and "test_email" not in settings.model_fields_set:
+            credentials = [fallback]
+        if not credentials:
+            credentials = [Credential(settings.test_email, settings.test_password)]
+        kwargs.setdefault("lock_dir", os.path.join(settings.auth_state_dir, "locks"))
+        kwargs.setdefault("state_dir", os.path.join(settings.auth_state_dir, "state"))
+        return cls(credentials, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def try_acquire(self) -> Optional[Lease]:
+        """尝试租用一个空闲账号，没有空闲账号时立即返回 None"""
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        # 从不同位置开始尝试，减少多个进程同时争抢第一个账号
+        offset = os.getpid() % len(self.credentials)
+        for i in range(len(self.credentials)):
+            credential = self.credentials[(offset + i) % len(self.credentials)]
+            fd = os.open(self.lock_dir / f"{credential.slug}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            if not _try_lock(fd):
+                os.close(fd)
+                continue
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, f"{os.getpid()}\n".encode())
+            return Lease(credential, self.state_dir / f"{credential.slug}.json", fd)
+        return None
+
+    def acquire(self, timeout: float = 60.0) -> Lease:
+        """租用一个账号，阻塞直到有空闲账号
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Raises:
+            TimeoutError: 超时仍没有空闲账号
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            lease = self.try_acquire()
+            if lease is not None:
+                return lease
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{timeout} 秒内没有空闲的测试账号（共 {len(self)} 个）")
+            time.sleep(self.poll_interval)
+
+    async def acquire_async(self, timeout: float = 60.0) -> Lease:
+        """``acquire`` 的异步版本，等待期间不阻塞事件循环"""
+        deadline = time.monotonic() + timeout
+        while True:
+            lease = self.try_acquire()
+            if lease is not None:
+                return lease
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{timeout} 秒内没有空闲的测试账号（共 {len(self)} 个）")
+            await asyncio.sleep(self.poll_interval)
+
+    @asynccontextmanager
+    async def lease(self, timeout: float = 60.0) -> AsyncIterator[Lease]:
+        """在 ``async with`` 期间租用一个账号"""
+        lease = await self.acquire_async(timeout)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    @contextmanager
+    def lease_sync(self, timeout: float = 60.0) -> Iterator[Lease]:
+        """在 ``with`` 期间租用一个账号"""
+        lease = self.acquire(timeout)
+        try:
+            yield lease
+        finally:
+            lease.release()
@@ -0,0 +1,264 @@
+"""DOM 增量变更追踪
+
+在页面内通过 MutationObserver 记录自上一个检查点以来新增、删除以及文本发生变化的节点，
+只把差异（而不是整页 innerText）传回 Python 端，
+使等待和断言的开销与变化量成正比，而不是与页面大小成正比。
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+# 页面内的差异采集脚本：首次调用时安装 MutationObserver，之后每次调用返回并清空累计的差异。
+# 页面发生整页导航后 document 会被替换，此时返回 fresh=True 并重新开始追踪。
+DOM_DIFF_SCRIPT = """
+(opts) => {
+    const describe = (el, text) => {
+        let path = el.tagName.toLowerCase();
+        if (el.id) {
+            path += '#' + el.id;
+        } else if (typeof el.className === 'string' && el.className.trim()) {
+            path += '.' + el.className.trim().split(/\\s+/).slice(0, 2).join('.');
+        }
+        return {tag: el.tagName, path: path, text: (text || '').slice(0, opts.maxText)};
+    };
+
+    let state = window.__bmcpDomDiff;
+    const fresh = !state || state.doc !== document;
+    if (fresh) {
+        state = window.__bmcpDomDiff = {doc: document, truncated: false};
+        state.reset = () => {
+            state.added = new Set();
+            state.removed = [];
+            state.changed = new Map();
+            state.truncated = false;
+        };
+        state.reset();
+        const touch = (el, oldText) => {
+            if (!el) return;
+            if (!state.changed.has(el)) state.changed.set(el, []);
+            if (oldText) state.changed.get(el).push(oldText);
+        };
+        state.observer = new MutationObserver((records) => {
+            for (const r of records) {
+                if (r.type === 'characterData') {
+                    touch(r.target.parentElement, r.oldValue);
+                    continue;
+                }
+                for (const n of r.addedNodes) {
+                    if (n.nodeType === Node.ELEMENT_NODE) state.added.add(n);
+                    else if (n.nodeType === Node.TEXT_NODE) touch(r.target, null);
+                }
+                for (const n of r.removedNodes) {
+                    // 检查点之后新增又被删除的节点对调用方不可见，直接忽略
+                    if (state.added.delete(n)) continue;
+                    if (n.nodeType === Node.TEXT_NODE) {
+                        touch(r.target, n.textContent);
+                    } else if (n.nodeType === Node.ELEMENT_NODE) {
+                        if (state.removed.length < opts.maxNodes) {
+                            state.removed.push(describe(n, (n.textContent || '').trim()));
+                        } else {
+                            state.truncated = true;
+                        }
+                    }
+                }
+            }
+        });
+        state.observer.observe(document.documentElement || document, {
+            childList: true,
+            subtree: true,
+            characterData: true,
+            characterDataOldValue: true
+        });
+    }
+
+    const result = {fresh: fresh, added: [], removed: [], textChanged: [], matched: 0, truncated: false};
+    if (!fresh && opts.action === 'take') {
+        // 只报告最外层的新增节点，其子孙节点的文本已包含在内
+        const insideAdded = (n) => {
+            for (let p = n.parentNode; p; p = p.parentNode) {
+                if (state.added.has(p)) return true;
+            }
+            return false;
+        };
+        for (const n of state.added) {
+            if (!n.isConnected || insideAdded(n)) continue;
+            if (opts.match) {
+                if (n.matches(opts.match)) result.matched++;
+                result.matched += n.querySelectorAll(opts.match).length;
+            }
+            if (result.added.length < opts.maxNodes) {
+                result.added.push(describe(n, (n.textContent || '').trim()));
+            } else {
+                result.truncated = true;
+            }
+        }
+        for (const [el, oldParts] of state.changed) {
+            if (!el.isConnected || state.added.has(el) || insideAdded(el)) continue;
+            if (result.textChanged.length >= opts.maxNodes) {
+                result.truncated = true;
+                break;
+            }
+            const entry = describe(el, (el.textContent || '').trim());
+            entry.oldText = oldParts.join('').slice(0, opts.maxText);
+            result.textChanged.push(entry);
+        }
+        result.removed = state.removed;
+        result.truncated = result.truncated || state.truncated;
+    }
+    state.reset();
+    return result;
+}
+"""
+
+
+@dataclass
+class DomNodeChange:
+    """单个节点的变更记录"""
+
+    tag: str
+    path: str
+    text: str
+    old_text: str = ""
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "DomNodeChange":
+        return cls(
+            tag=payload.get("tag", ""),
+            path=payload.get("path", ""),
+            text=payload.get("text", ""),
+            old_text=payload.get("oldText", ""),
+        )
+
+
+@dataclass
+class DomDiff:
+    """两个检查点之间的 DOM 差异"""
+
+    added: List[DomNodeChange] = field(default_factory=list)
+    removed: List[DomNodeChange] = field(default_factory=list)
+    text_changed: List[DomNodeChange] = field(default_factory=list)
+    matched: int = 0
+    truncated: bool = False
+    fresh: bool = False
+
+    @classmethod
+    def from_payload(cls, payload: Optional[Dict[str, Any]]) -> "DomDiff":
+        """从页面脚本返回的字典构建差异对象"""
+        payload = payload or {}
+        return cls(
+            added=[DomNodeChange.from_payload(p) for p in payload.get("added", [])],
+            removed=[DomNodeChange.from_payload(p) for p in payload.get("removed", [])],
+            text_changed=[DomNodeChange.from_payload(p) for p in payload.get("textChanged", [])],
+            matched=payload.get("matched", 0),
+            truncated=payload.get("truncated", False),
+            fresh=payload.get("fresh", False),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        """是否没有任何变化"""
+        return not (self.added or self.removed or self.text_changed)
+
+    @property
+    def new_text(self) -> str:
+        """新增节点及文本变化节点的当前文本"""
+        return "\n".join(c.text for c in self.added + self.text_changed if c.text)
+
+    @property
+    def added_chars(self) -> int:
+        """新增节点的文本字符数，可用于估算页面文本增长量"""
+        return sum(len(c.text) for c in self.added)
+
+    def appeared(self, text: str) -> bool:
+        """指定文本是否出现在新增或变化后的内容中"""
+        return any(text in c.text for c in self.added + self.text_changed)
+
+    def disappeared(self, text: str) -> bool:
+        """指定文本是否随节点删除或文本替换而消失"""
+        if any(text in c.text for c in self.removed):
+            return True
+        return any(text in c.old_text and text not in c.text for c in self.text_changed)
+
+
+class DomDiffTracker:
+    """页面 DOM 变更追踪器
+
+    Usage:
+        tracker = DomDiffTracker(page)
+        await tracker.checkpoint()
+        await page.click("button#send")
+        diff = await tracker.diff()
+        if diff.appeared("Working on it"):
+            ...
+
+    Args:
+        page: Playwright Page，或任何提供 ``evaluate(expression, arg)`` 的对象
+        match: 可选的 CSS 选择器，统计新增节点中匹配该选择器的元素数量
+        max_nodes: 每类变更最多返回的节点数量
+        max_text: 每个节点最多返回的文本长度
+        registry: 可选的页面脚本注册表（src.page_scripts），提供时采集脚本只安装一次，
+            之后按名称调用，不再每次轮询都发送完整脚本
+    """
+
+    def __init__(
+        self,
+        page: Any,
+        match: Optional[str] = None,
+        max_nodes: int = 200,
+        max_text: int = 2000,
+        registry: Optional[Any] = None,
+    ):
+        self.page = page
+        self.match = match
+        self.max_nodes = max_nodes
+        self.max_text = max_text
+        self.registry = registry
+
+    async def _run(self, action: str) -> Dict[str, Any]:
+        opts = {
+            "action": action,
+            "match": self.match,
+            "maxNodes": self.max_nodes,
+            "maxText": self.max_text,
+        }
+        if self.registry is not None:
+            return await self.registry.call(self.page, "domDiff", opts)
+        return await self.page.evaluate(DOM_DIFF_SCRIPT, opts)
+
+    async def checkpoint(self) -> None:
+        """设置检查点，丢弃此前累计的变化"""
+        await self._run("checkpoint")
+
+    async def diff(self) -> DomDiff:
+        """返回自上一个检查点以来的变化，并把当前状态设为新的检查点
+
+        如果页面在此期间发生了整页导航，返回的差异 ``fresh`` 为 True 且内容为空。
+        """
+        return DomDiff.from_payload(await self._run("take"))
+
+    async def wait_for_text(
+        self,
+        text: str,
+        timeout: int = 10000,
+        interval: int = 500,
+    ) -> Optional[DomDiff]:
+        """等待指定文本出现在新增内容中
+
+        Args:
+            text: 期望出现的文本
+            timeout: 超时时间（毫秒）
+            interval: 轮询间隔（毫秒）
+
+        Returns:
+            包含该文本的差异，超时则返回 None
+        """
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            diff = await self.diff()
+            if diff.appeared(text):
+                return diff
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(interval / 1000)
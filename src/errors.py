@@ -0,0 +1,17 @@
+"""Browser MCP 客户端异常定义"""
+
+
+class BrowserMCPError(Exception):
+    """Browser MCP 调用失败的基类"""
+
+
+class ToolTimeoutError(BrowserMCPError):
+    """工具调用超过截止时间"""
+
+
+class CircuitOpenError(BrowserMCPError):
+    """熔断器处于打开状态，调用被直接拒绝"""
+
+
+class CDPError(BrowserMCPError):
+    """CDP 命令执行失败或页面脚本抛出异常"""
@@ -0,0 +1,286 @@
+"""结构化事件日志
+
+流程步骤和 ``BrowserMCPClient`` 工具调用以 JSON Lines 记录为事件，取代只能人工阅读的 print 输出，
+测试报告由 ``src/report.py`` 从事件汇总生成。
+
+- ``emit()`` 只把事件放入队列，由后台线程批量写入文件，不阻塞事件循环
+- 每个进程写自己的文件 ``<dir>/<run_id>/<worker>.jsonl``，多个 worker 不会交错写入同一行
+- 每个事件都带有运行 ID、测试、时间戳；步骤事件还有状态、耗时和产物引用
+
+事件示例：
+    {"ts": 1700000000.12, "run_id": "...", "type": "step", "test": "...", "step": "submit",
+     "status": "passed", "duration": 2.31, "artifacts": [{"id": 3, "sha256": "...", "path": "..."}]}
+    {"ts": ..., "type": "tool_call", "tool": "click", "status": "failed", "duration": 0.02,
+     "selector": "#login", "error": "ToolTimeoutError: ..."}
+
+Usage:
+    log = get_event_log()
+    with log.step("submit", test=TEST_ID) as step:
+        ...
+        step.attach(artifacts.put("submitted", png))
+"""
+import json
+import os
+import queue
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 工具调用事件中记录的参数，不记录输入的文本（可能是密码）
+_RECORDED_ARGUMENTS = ("url", "selector", "role", "name")
+
+# 队列中的结束标记
+_STOP = object()
+
+
+class EventLog:
+    """带缓冲的 JSON Lines 事件日志
+
+    Args:
+        path: 日志文件路径，父目录不存在时自动创建；为 None 时不记录事件
+        run_id: 写入每个事件的运行 ID
+        flush_interval: 后台线程最长多久写一次文件（秒）
+        max_queue: 队列上限，写入跟不上时丢弃新事件而不是阻塞调用方
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        run_id: Optional[str] = None,
+        flush_interval: float = 0.5,
+        max_queue: int = 10000,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.run_id = run_id
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_writer(self) -> None:
+        # 第一次写入事件时才创建文件和后台线程
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._writer = threading.Thread(target=self._write_loop, name="event-log-writer", daemon=True)
+                    self._writer.start()
+
+    def emit(self, type: str, **fields: Any) -> Dict[str, Any]:
+        """记录一个事件
+
+        Args:
+            type: 事件类型，如 step、tool_call、run
+            fields: 事件字段，必须可以序列化为 JSON
+
+        Returns:
+            写入的事件
+        """
+        event = {"ts": round(time.time(), 3), "run_id": self.run_id, "type": type, **fields}
+        if self.path is None:
+            return event
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+        return event
+
+    def _write_loop(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch: List[Any] = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                # 收集一批事件后一次写入，减少系统调用
+                while batch[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                stop = batch[-1] is _STOP
+                lines = [json.dumps(event, ensure_ascii=False, default=str) for event in batch if event is not _STOP]
+                if lines:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                if stop:
+                    return
+
+    def close(self) -> None:
+        """写完队列中的全部事件后关闭"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+
+    def step(self, name: str, test: Optional[str] = None, **fields: Any) -> "StepEvent":
+        """记录一个流程步骤，可用作 ``with`` 或 ``async with``"""
+        return StepEvent(self, name, test, fields)
+
+    def sequence(self, test: Optional[str] = None) -> "StepSequence":
+        """按顺序记录线性流程的步骤，无需为每一步缩进一个 ``with`` 块"""
+        return StepSequence(self, test)
+
+    def on_tool_call(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        duration: float,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """``BrowserMCPClient(event_log=...)`` 在每次工具调用结束后调用"""
+        fields = {key: arguments[key] for key in _RECORDED_ARGUMENTS if arguments.get(key) is not None}
+        if error is not None:
+            fields["error"] = f"{type(error).__name__}: {error}"
+        self.emit(
+            "tool_call",
+            tool=name,
+            status="failed" if error is not None else "passed",
+            duration=round(duration, 4),
+            **fields,
+        )
+
+
+class StepEvent:
+    """一个步骤的计时和状态
+
+    正常结束时状态为 passed，抛出异常时为 failed 并记录异常；
+    也可以在步骤内调用 ``warn()`` 把状态标记为 warning。
+    """
+
+    def __init__(self, log: EventLog, name: str, test: Optional[str], fields: Dict[str, Any]):
+        self.log = log
+        self.name = name
+        self.test = test
+        self.fields = dict(fields)
+        self.status = "passed"
+        self.artifacts: List[Dict[str, Any]] = []
+        self._start = 0.0
+
+    def attach(self, artifact: Any, path: Optional[Path] = None) -> Any:
+        """引用一个产物（``src.artifacts.Artifact``），返回原产物以便链式使用"""
+        reference = {"id": artifact.id, "step": artifact.step, "sha256": artifact.sha256}
+        if path is not None:
+            reference["path"] = str(path)
+        self.artifacts.append(reference)
+        return artifact
+
+    def attach_recording(self, marker: Any, path: Path) -> Any:
+        """引用屏幕录制中的步骤标记（``src.screencast.StepMarker``），返回原标记
+
+        Args:
+            marker: 步骤标记
+            path: 录制目录，读取方式见 ``src.screencast.ScreencastArchive``
+        """
+        self.artifacts.append({"recording": str(path), "marker": marker.name, "t": marker.t, "frame": marker.frame})
+        return marker
+
+    def warn(self, message: str) -> None:
+        """步骤完成但结果不完全符合预期"""
+        self.status = "warning"
+        self.fields.setdefault("warnings", []).append(message)
+
+    def __enter__(self) -> "StepEvent":
+        self._start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> None:
+        fields = dict(self.fields)
+        if exc is not None:
+            self.status = "failed"
+            fields["error"] = f"{exc_type.__name__}: {exc}"
+        if self.artifacts:
+            fields["artifacts"] = self.artifacts
+        self.log.emit(
+            "step",
+            test=self.test,
+            step=self.name,
+            status=self.status,
+            duration=round(time.monotonic() - self._start, 4),
+            **fields,
+        )
+
+    async def __aenter__(self) -> "StepEvent":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+class StepSequence:
+    """线性流程的步骤序列
+
+    开始下一步时上一步以 passed 结束；``fail()`` 以 failed 结束当前步骤。
+
+    Usage:
+        steps = log.sequence(TEST_ID)
+        steps.start("load")
+        ...
+        steps.start("submit")      # load 结束
+        ...
+        steps.close()              # submit 结束
+    """
+
+    def __init__(self, log: EventLog, test: Optional[str]):
+        self.log = log
+        self.test = test
+        self.current: Optional[StepEvent] = None
+
+    def start(self, name: str, **fields: Any) -> StepEvent:
+        self.close()
+        self.current = self.log.step(name, self.test, **fields).__enter__()
+        return self.current
+
+    def attach(self, artifact: Any, path: Optional[Path] = None) -> Any:
+        """把产物引用加到当前步骤，没有进行中的步骤时忽略"""
+        if self.current is not None:
+            self.current.attach(artifact, path)
+        return artifact
+
+    def attach_recording(self, marker: Any, path: Path) -> Any:
+        """把录制中的步骤标记引用加到当前步骤，没有进行中的步骤时忽略"""
+        if self.current is not None:
+            self.current.attach_recording(marker, path)
+        return marker
+
+    def warn(self, message: str) -> None:
+        if self.current is not None:
+            self.current.warn(message)
+
+    def fail(self, error: BaseException) -> None:
+        """以失败结束当前步骤"""
+        if self.current is not None:
+            step, self.current = self.current, None
+            step.__exit__(type(error), error, None)
+
+    def close(self) -> None:
+        """结束当前步骤"""
+        if self.current is not None:
+            step, self.current = self.current, None
+            step.__exit__(None, None, None)
+
+
+@lru_cache(maxsize=1)
+def get_event_log() -> EventLog:
+    """当前进程的事件日志，写入 ``<ARTIFACT_DIR>/events/<run_id>/<worker>.jsonl``
+
+    只有设置 ``RECORD_EVENTS``（或 ``pytest --record-events``）时才写入文件，
+    否则返回不记录事件的日志，普通的测试运行不会在产物目录中留下文件。
+    第一个事件是带有部署版本（``DEPLOY_VERSION``）的 run 事件。
+    """
+    from config import get_settings, worker_id
+    from src.artifacts import get_artifact_store
+
+    store = get_artifact_store()
+    if not get_settings().record_events:
+        return EventLog(None, run_id=store.run_id)
+    name = worker_id() or f"pid{os.getpid()}"
+    log = EventLog(str(store.root / "events" / store.run_id / f"{name}.jsonl"), run_id=store.run_id)
+    log.emit("run", deploy=get_settings().deploy_version or None, worker=name)
+    return log
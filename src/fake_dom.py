@@ -0,0 +1,965 @@
+"""内存中的页面模拟
+
+``BrowserMCPClient`` 的模拟实现原来按选择器字符串猜测结果（选择器包含 "login" 就跳转到仪表盘），
+任何选择器都能"找到"，测试无法发现选择器写错或流程不对。本模块把本地 HTML 夹具解析为轻量 DOM，
+在内存中模拟页面，不需要启动 Chromium，每次操作只有几十微秒：
+
+- ``parse_html()``：基于 ``html.parser`` 的 DOM 解析
+- ``compile_selector()``：CSS 选择器引擎，支持类型、``#id``、``.class``、属性（含 ``i`` 标记）、
+  后代/子/兄弟组合器、选择器列表，以及 ``:not()``、``:has()``、``:nth-child()``、``:invalid``、
+  ``:visible``、``:has-text()``、``:contains()`` 等伪类和 Playwright 的 ``text=`` 选择器
+- ``FakeSite``：按 URL 提供 HTML 夹具，目录结构为 ``<root>/<host>/<path>.html`` 或 ``<path>/index.html``
+- ``FakePage``：一个标签页，点击、填写、等待都作用于 DOM；定时器使用虚拟时间，等待从不真正休眠
+
+夹具通过属性声明简单的事件处理：
+
+- ``<a href>``：点击后导航，只有锚点变化时保留当前文档
+- ``data-show`` / ``data-hide``：点击后显示或隐藏匹配的元素
+- ``data-delay``：以上动作或表单提交延迟若干毫秒（虚拟时间）后生效
+- ``<form action>``：提交按钮触发表单校验（``required``、``type=email``），
+  不通过时标记 ``aria-invalid`` 并在表单内的 ``[role=alert]`` 中显示提示，通过后导航到 ``action``
+- ``<form data-login>``：提交时按 ``FakeSite.accounts`` 校验邮箱和密码，失败时显示错误提示
+
+Usage:
+    page = FakePage(FakeSite.from_directory("tests/fixtures/pages"))
+    page.goto("https://example.com")
+    page.click("button#search-submit")
+    page.wait_for("div#search-results", timeout=5000)   # 推进虚拟时间
+    assert page.text("div#search-results") == "Search Results"
+"""
+import copy
+import heapq
+import itertools
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+
+from src.accessibility import AccessibilityNode, AccessibilitySnapshot
+from src.errors import ToolTimeoutError
+
+
+# 没有结束标签的元素
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+# 遇到同名开始标签时隐式结束的元素
+_AUTO_CLOSE = frozenset({"p", "li", "option", "tr", "td", "th", "dt", "dd"})
+
+# 从不渲染的元素
+_NOT_RENDERED = frozenset({"head", "script", "style", "template", "title", "meta", "link", "noscript"})
+
+# 标签的隐式 ARIA 角色
+_IMPLICIT_ROLES = {
+    "button": "button",
+    "textarea": "textbox",
+    "select": "combobox",
+    "img": "img",
+    "nav": "navigation",
+    "main": "main",
+    "header": "banner",
+    "footer": "contentinfo",
+    "form": "form",
+    "ul": "list",
+    "ol": "list",
+    "li": "listitem",
+    "table": "table",
+    "h1": "heading",
+    "h2": "heading",
+    "h3": "heading",
+    "h4": "heading",
+    "h5": "heading",
+    "h6": "heading",
+}
+
+# input 的 type 到 ARIA 角色
+_INPUT_ROLES = {
+    "checkbox": "checkbox",
+    "radio": "radio",
+    "submit": "button",
+    "button": "button",
+    "reset": "button",
+    "range": "slider",
+    "number": "spinbutton",
+}
+
+# 与浏览器原生校验一致的宽松邮箱格式
+_EMAIL = re.compile(r"^[^\s@]+@[^\s@]+$")
+
+NOT_FOUND_HTML = "<html><head><title>404 Not Found</title></head><body><h1>404 Not Found</h1></body></html>"
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) FakeDOM"
+
+
+class SelectorError(ValueError):
+    """选择器语法错误或使用了不支持的语法"""
+
+
+class Element:
+    """DOM 元素
+
+    Attributes:
+        tag: 小写标签名
+        attrs: 属性
+        children: 子元素和文本
+        parent: 父元素
+        value: 表单控件的当前值（与 ``value`` 属性分开，``fill`` 只改变它）
+    """
+
+    __slots__ = ("tag", "attrs", "children", "parent", "value")
+
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None, parent: Optional["Element"] = None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: List[Union["Element", str]] = []
+        self.parent = parent
+        self.value = self.attrs.get("value", "")
+
+    def __repr__(self) -> str:
+        return f"<{self.tag}{''.join(f' {k}={v!r}' for k, v in self.attrs.items())}>"
+
+    @property
+    def id(self) -> str:
+        return self.attrs.get("id", "")
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(name, default)
+
+    @property
+    def element_children(self) -> List["Element"]:
+        return [child for child in self.children if isinstance(child, Element)]
+
+    def iter(self) -> Iterator["Element"]:
+        """按文档顺序遍历自身和全部后代元素"""
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.element_children))
+
+    def ancestors(self) -> Iterator["Element"]:
+        parent = self.parent
+        while parent is not None:
+            yield parent
+            parent = parent.parent
+
+    @property
+    def text_content(self) -> str:
+        """全部后代文本，对应 DOM 的 ``textContent``"""
+        return "".join(child if isinstance(child, str) else child.text_content for child in self.children)
+
+    @property
+    def inner_text(self) -> str:
+        """可见文本，空白合并为单个空格，对应 DOM 的 ``innerText``"""
+        if not self.visible:
+            return ""
+        return " ".join(self._visible_text().split())
+
+    def _visible_text(self) -> str:
+        parts = []
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif not child._hidden_self():
+                parts.append(" " + child._visible_text() + " ")
+        return "".join(parts)
+
+    @property
+    def own_text(self) -> str:
+        """直接子文本节点的文本，空白合并"""
+        return " ".join("".join(c for c in self.children if isinstance(c, str)).split())
+
+    def _hidden_self(self) -> bool:
+        if self.tag in _NOT_RENDERED or "hidden" in self.attrs:
+            return True
+        if self.tag == "input" and self.attrs.get("type", "").lower() == "hidden":
+            return True
+        style = self.attrs.get("style", "").replace(" ", "").lower()
+        return "display:none" in style or "visibility:hidden" in style
+
+    @property
+    def visible(self) -> bool:
+        """自身和祖先都没有被隐藏"""
+        if self._hidden_self():
+            return False
+        return not any(ancestor._hidden_self() for ancestor in self.ancestors())
+
+    @property
+    def invalid(self) -> bool:
+        """是否不满足原生表单校验（``required``、``type=email``）"""
+        if self.tag not in ("input", "textarea", "select") or "disabled" in self.attrs:
+            return False
+        if "required" in self.attrs and not self.value:
+            return True
+        return self.attrs.get("type", "").lower() == "email" and bool(self.value) and not _EMAIL.match(self.value)
+
+    def set_text(self, text: str) -> None:
+        """替换全部子节点为一段文本"""
+        for child in self.element_children:
+            child.parent = None
+        self.children = [text]
+
+    def clone(self) -> "Element":
+        """深拷贝，夹具解析一次后每次导航复制一份"""
+        return copy.deepcopy(self)
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> "Element":
+        element = Element.__new__(Element)
+        element.tag = self.tag
+        element.attrs = dict(self.attrs)
+        element.value = self.value
+        element.parent = None
+        element.children = []
+        for child in self.children:
+            if isinstance(child, Element):
+                child = child.__deepcopy__(memo)
+                child.parent = element
+            element.children.append(child)
+        return element
+
+
+class Document(Element):
+    """文档根节点"""
+
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("#document")
+
+    @property
+    def title(self) -> str:
+        for element in self.iter():
+            if element.tag == "title":
+                return " ".join(element.text_content.split())
+        return ""
+
+    @property
+    def visible(self) -> bool:
+        return True
+
+    def _hidden_self(self) -> bool:
+        return False
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> "Document":
+        document = Document()
+        for child in self.children:
+            if isinstance(child, Element):
+                child = child.__deepcopy__(memo)
+                child.parent = document
+            document.children.append(child)
+        return document
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.document = Document()
+        self.stack: List[Element] = [self.document]
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in _AUTO_CLOSE and self.stack[-1].tag == tag:
+            self.stack.pop()
+        parent = self.stack[-1]
+        element = Element(tag, {name: value or "" for name, value in attrs}, parent)
+        if tag == "textarea":
+            element.value = ""
+        parent.children.append(element)
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag: str) -> None:
+        # 忽略没有对应开始标签的结束标签，未闭合的子元素随之结束
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        parent = self.stack[-1]
+        parent.children.append(data)
+        if parent.tag == "textarea":
+            parent.value += data
+
+
+def parse_html(html: str) -> Document:
+    """把 HTML 解析为 DOM"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+# ---------------------------------------------------------------------------
+# 选择器引擎
+# ---------------------------------------------------------------------------
+
+Predicate = Callable[[Element], bool]
+
+_IDENT = re.compile(r"-?[A-Za-z_\u00a0-\uffff][\w\u00a0-\uffff-]*")
+_ID = re.compile(r"[\w\u00a0-\uffff-]+")
+_ATTRIBUTE = re.compile(
+    r"""\[\s*(?P<name>[^\s~|^$*=\]]+)\s*"""
+    r"""(?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>(?:[^"\\]|\\.)*)"|'(?P<sq>(?:[^'\\]|\\.)*)'|(?P<bare>[^\s\]]+))"""
+    r"""\s*(?P<flag>[iIsS])?\s*)?\]"""
+)
+_NTH = re.compile(r"^\s*(?:(?P<a>[+-]?\d*)n\s*(?:(?P<sign>[+-])\s*(?P<b>\d+))?|(?P<only>[+-]?\d+))\s*$")
+
+
+def _attribute_predicate(name: str, op: Optional[str], value: str, ignore_case: bool) -> Predicate:
+    name = name.lower()
+    if op is None:
+        return lambda element: name in element.attrs
+    if ignore_case:
+        value = value.lower()
+
+    def predicate(element: Element) -> bool:
+        actual = element.attrs.get(name)
+        if actual is None:
+            return False
+        if ignore_case:
+            actual = actual.lower()
+        if op == "=":
+            return actual == value
+        if op == "~=":
+            return value in actual.split()
+        if op == "|=":
+            return actual == value or actual.startswith(value + "-")
+        if op == "^=":
+            return bool(value) and actual.startswith(value)
+        if op == "$=":
+            return bool(value) and actual.endswith(value)
+        return bool(value) and value in actual
+    return predicate
+
+
+def _nth_predicate(argument: str, from_end: bool = False) -> Predicate:
+    argument = argument.strip().lower()
+    if argument == "odd":
+        a, b = 2, 1
+    elif argument == "even":
+        a, b = 2, 0
+    else:
+        match = _NTH.match(argument)
+        if not match:
+            raise SelectorError(f"无效的 nth-child 参数: {argument!r}")
+        if match.group("only") is not None:
+            a, b = 0, int(match.group("only"))
+        else:
+            a = match.group("a")
+            a = 1 if a in ("", "+") else -1 if a == "-" else int(a)
+            b = int(match.group("b") or 0) * (-1 if match.group("sign") == "-" else 1)
+
+    def predicate(element: Element) -> bool:
+        if element.parent is None:
+            return False
+        siblings = element.parent.element_children
+        position = (len(siblings) - siblings.index(element)) if from_end else siblings.index(element) + 1
+        if a == 0:
+            return position == b
+        return (position - b) % a == 0 and (position - b) // a >= 0
+    return predicate
+
+
+def _unquote(text: str) -> str:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    return text
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class _SelectorParser:
+    """递归下降解析 CSS 选择器列表"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message: str) -> SelectorError:
+        return SelectorError(f"{message}: {self.text!r}（位置 {self.pos}）")
+
+    def skip_space(self) -> bool:
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+        return self.pos > start
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def parse_list(self, closing: str = "") -> List[List[Tuple[str, Predicate]]]:
+        selectors = [self.parse_complex(closing)]
+        while self.peek() == ",":
+            self.pos += 1
+            selectors.append(self.parse_complex(closing))
+        return selectors
+
+    def parse_complex(self, closing: str) -> List[Tuple[str, Predicate]]:
+        """返回 [(组合器, 复合选择器), ...]，第一项的组合器为空"""
+        self.skip_space()
+        parts = [("", self.parse_compound())]
+        while True:
+            had_space = self.skip_space()
+            char = self.peek()
+            if char in ("", ",") or char == closing:
+                return parts
+            if char in ">+~":
+                self.pos += 1
+                self.skip_space()
+                parts.append((char, self.parse_compound()))
+            elif had_space:
+                parts.append((" ", self.parse_compound()))
+            else:
+                raise self.error("无法解析的选择器")
+
+    def parse_compound(self) -> Predicate:
+        predicates: List[Predicate] = []
+        universal = self.peek() == "*"
+        if universal:
+            self.pos += 1
+        else:
+            match = _IDENT.match(self.text, self.pos)
+            if match:
+                tag = match.group(0).lower()
+                predicates.append(lambda element: element.tag == tag)
+                self.pos = match.end()
+        while True:
+            char = self.peek()
+            if char == "#":
+                match = _ID.match(self.text, self.pos + 1)
+                if not match:
+                    raise self.error("# 后缺少 id")
+                element_id = match.group(0)
+                predicates.append(lambda element: element.attrs.get("id") == element_id)
+                self.pos = match.end()
+            elif char == ".":
+                match = _IDENT.match(self.text, self.pos + 1)
+                if not match:
+                    raise self.error(". 后缺少类名")
+                class_name = match.group(0)
+                predicates.append(lambda element: class_name in element.classes)
+                self.pos = match.end()
+            elif char == "[":
+                match = _ATTRIBUTE.match(self.text, self.pos)
+                if not match:
+                    raise self.error("无效的属性选择器")
+                value = next((v for v in match.group("dq", "sq", "bare") if v is not None), "")
+                flag = (match.group("flag") or "").lower()
+                predicates.append(_attribute_predicate(match.group("name"), match.group("op"), value, flag == "i"))
+                self.pos = match.end()
+            elif char == ":":
+                predicates.append(self.parse_pseudo())
+            else:
+                break
+        if not predicates:
+            if not universal:
+                raise self.error("缺少选择器")
+            return lambda element: True
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda element: all(predicate(element) for predicate in predicates)
+
+    def parse_argument(self) -> str:
+        """读取括号内的参数原文，处理嵌套括号和引号"""
+        if self.peek() != "(":
+            raise self.error("伪类缺少参数")
+        depth, quote, start = 0, "", self.pos + 1
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if quote:
+                if char == "\\":
+                    self.pos += 1
+                elif char == quote:
+                    quote = ""
+            elif char in "'\"":
+                quote = char
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if depth == 0:
+                    self.pos += 1
+                    return self.text[start:self.pos - 1]
+            self.pos += 1
+        raise self.error("括号未闭合")
+
+    def parse_pseudo(self) -> Predicate:
+        self.pos += 1
+        match = _IDENT.match(self.text, self.pos)
+        if not match:
+            raise self.error(": 后缺少伪类名称")
+        name = match.group(0).lower()
+        self.pos = match.end()
+        if name in ("not", "is", "where", "has"):
+            inner = _compile_list(self.parse_argument())
+            if name == "not":
+                return lambda element: not inner(element)
+            if name == "has":
+                return lambda element: any(inner(d) for d in itertools.islice(element.iter(), 1, None))
+            return inner
+        if name in ("has-text", "contains"):
+            needle = _normalize(_unquote(self.parse_argument()))
+            if name == "contains":
+                return lambda element: needle in _normalize(element.text_content)
+            needle = needle.lower()
+            return lambda element: needle in _normalize(element.text_content).lower()
+        if name in ("nth-child", "nth-last-child"):
+            return _nth_predicate(self.parse_argument(), from_end=name == "nth-last-child")
+        simple = _SIMPLE_PSEUDOS.get(name)
+        if simple is None:
+            raise self.error(f"不支持的伪类 :{name}")
+        return simple
+
+
+_SIMPLE_PSEUDOS: Dict[str, Predicate] = {
+    "first-child": lambda e: e.parent is not None and e.parent.element_children[0] is e,
+    "last-child": lambda e: e.parent is not None and e.parent.element_children[-1] is e,
+    "only-child": lambda e: e.parent is not None and len(e.parent.element_children) == 1,
+    "empty": lambda e: not e.children,
+    "visible": lambda e: e.visible,
+    "hidden": lambda e: not e.visible,
+    "invalid": lambda e: e.invalid,
+    "valid": lambda e: e.tag in ("input", "textarea", "select") and not e.invalid,
+    "required": lambda e: "required" in e.attrs,
+    "disabled": lambda e: "disabled" in e.attrs,
+    "enabled": lambda e: e.tag in ("input", "textarea", "select", "button") and "disabled" not in e.attrs,
+    "checked": lambda e: "checked" in e.attrs,
+}
+
+
+def _match_complex(parts: List[Tuple[str, Predicate]], index: int, element: Element) -> bool:
+    combinator, predicate = parts[index]
+    if not predicate(element):
+        return False
+    if index == 0:
+        return True
+    if combinator == " ":
+        return any(_match_complex(parts, index - 1, a) for a in element.ancestors() if not isinstance(a, Document))
+    if combinator == ">":
+        parent = element.parent
+        return parent is not None and not isinstance(parent, Document) and _match_complex(parts, index - 1, parent)
+    if element.parent is None:
+        return False
+    siblings = element.parent.element_children
+    previous = siblings[:siblings.index(element)]
+    if combinator == "+":
+        return bool(previous) and _match_complex(parts, index - 1, previous[-1])
+    return any(_match_complex(parts, index - 1, sibling) for sibling in previous)
+
+
+def _compile_list(text: str) -> Predicate:
+    parser = _SelectorParser(text)
+    selectors = parser.parse_list()
+    if parser.pos != len(text):
+        raise parser.error("无法解析的选择器")
+    return lambda element: any(_match_complex(parts, len(parts) - 1, element) for parts in selectors)
+
+
+class Selector:
+    """编译后的选择器
+
+    Args:
+        text: CSS 选择器，或 ``text=`` 开头的文本选择器
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        if text.startswith("text="):
+            self._text = _unquote(text[5:])
+            self._exact = text[5:].strip()[:1] in ("'", '"')
+            self._predicate: Optional[Predicate] = None
+        else:
+            self._text = None
+            self._predicate = _compile_list(text[4:] if text.startswith("css=") else text)
+
+    def matches(self, element: Element) -> bool:
+        if self._predicate is not None:
+            return self._predicate(element)
+        if element.tag in _NOT_RENDERED:
+            return False
+        return self._text_matches(element) and not any(self._text_matches(c) for c in element.element_children)
+
+    def _text_matches(self, element: Element) -> bool:
+        # 与 Playwright 一致：带引号时整体精确匹配，否则忽略大小写按包含匹配
+        text = _normalize(element.text_content)
+        if self._exact:
+            return text == _normalize(self._text)
+        return _normalize(self._text).lower() in text.lower()
+
+    def select(self, root: Element) -> List[Element]:
+        """按文档顺序返回匹配的全部后代元素"""
+        return [element for element in itertools.islice(root.iter(), 1, None) if self.matches(element)]
+
+    def select_one(self, root: Element) -> Optional[Element]:
+        return next((e for e in itertools.islice(root.iter(), 1, None) if self.matches(e)), None)
+
+
+@lru_cache(maxsize=1024)
+def compile_selector(text: str) -> Selector:
+    """编译并缓存选择器
+
+    Raises:
+        SelectorError: 选择器无效
+    """
+    return Selector(text.strip())
+
+
+def css_path(element: Element) -> str:
+    """元素的唯一 CSS 选择器，有 id 时为 ``tag#id``，否则从最近的带 id 祖先按 ``:nth-child`` 定位"""
+    if element.id and re.fullmatch(r"[A-Za-z][\w-]*", element.id):
+        return f"{element.tag}#{element.id}"
+    parent = element.parent
+    if parent is None or isinstance(parent, Document):
+        return element.tag
+    position = parent.element_children.index(element) + 1
+    return f"{css_path(parent)} > {element.tag}:nth-child({position})"
+
+
+# ---------------------------------------------------------------------------
+# 可访问性
+# ---------------------------------------------------------------------------
+
+def aria_role(element: Element) -> str:
+    """元素的显式或隐式 ARIA 角色，没有语义时为 generic"""
+    if element.get("role"):
+        return element.attrs["role"].split()[0]
+    if element.tag == "a":
+        return "link" if "href" in element.attrs else "generic"
+    if element.tag == "input":
+        return _INPUT_ROLES.get(element.get("type", "text").lower(), "textbox")
+    return _IMPLICIT_ROLES.get(element.tag, "generic")
+
+
+def accessible_name(element: Element, document: Optional[Element] = None) -> str:
+    """按 aria-label、aria-labelledby、label、placeholder、alt、文本的顺序计算可访问名称"""
+    if element.get("aria-label"):
+        return element.attrs["aria-label"].strip()
+    root = document or next((a for a in element.ancestors() if a.parent is None), element)
+    if element.get("aria-labelledby"):
+        ids = element.attrs["aria-labelledby"].split()
+        labels = [e.inner_text for e in root.iter() if e.id in ids]
+        if labels:
+            return " ".join(labels)
+    if element.tag in ("input", "textarea", "select"):
+        if element.get("type", "").lower() in ("submit", "button", "reset"):
+            return element.value
+        if element.id:
+            label = next((e for e in root.iter() if e.tag == "label" and e.get("for") == element.id), None)
+            if label is not None:
+                return label.inner_text
+        label = next((a for a in element.ancestors() if a.tag == "label"), None)
+        if label is not None:
+            return label.inner_text
+        return element.get("placeholder") or element.get("title") or ""
+    if element.tag == "img":
+        return element.get("alt", "")
+    if aria_role(element) == "generic":
+        return element.own_text
+    return element.inner_text
+
+
+def accessibility_snapshot(document: Document) -> AccessibilitySnapshot:
+    """从 DOM 生成可访问性快照，ref 为元素的 CSS 选择器
+
+    只包含可见元素；没有语义角色的元素只有直接包含文本时才列出。
+    """
+    nodes = [AccessibilityNode("document", document.title, "html")]
+    for element in itertools.islice(document.iter(), 1, None):
+        if element.tag in _NOT_RENDERED or element.tag in ("html", "body") or not element.visible:
+            continue
+        role = aria_role(element)
+        if role in ("none", "presentation"):
+            continue
+        name = accessible_name(element, document)
+        if role == "generic" and not name:
+            continue
+        nodes.append(AccessibilityNode(role, name, css_path(element)))
+    return AccessibilitySnapshot(nodes)
+
+
+# ---------------------------------------------------------------------------
+# 站点和页面
+# ---------------------------------------------------------------------------
+
+def page_key(url: str) -> Tuple[str, str]:
+    """URL 对应的 (主机, 路径)，忽略协议、查询参数、锚点和结尾的斜杠"""
+    parsed = urlparse(url if "://" in url else f"//{url}")
+    return (parsed.hostname or "", parsed.path.rstrip("/") or "/")
+
+
+class FakeSite:
+    """按 URL 提供 HTML 夹具的站点
+
+    Args:
+        root: 夹具目录，``<root>/<host>/index.html`` 对应首页，
+            ``<root>/<host>/login.html`` 或 ``<root>/<host>/login/index.html`` 对应 ``/login``
+        accounts: ``data-login`` 表单接受的邮箱和密码
+    """
+
+    def __init__(self, root: Optional[str] = None, accounts: Optional[Dict[str, str]] = None):
+        self.root = Path(root) if root else None
+        self.accounts = dict(accounts or {})
+        self._pages: Dict[Tuple[str, str], str] = {}
+        self._parsed: Dict[Tuple[str, str], Optional[Document]] = {}
+
+    @classmethod
+    def from_directory(cls, root: str, accounts: Optional[Dict[str, str]] = None) -> "FakeSite":
+        return cls(root, accounts)
+
+    def add_page(self, url: str, html: str) -> None:
+        """注册一个页面，优先于目录中的夹具"""
+        key = page_key(url)
+        self._pages[key] = html
+        self._parsed.pop(key, None)
+
+    def _read(self, key: Tuple[str, str]) -> Optional[str]:
+        if key in self._pages:
+            return self._pages[key]
+        if self.root is None or not key[0]:
+            return None
+        base = self.root / key[0]
+        path = key[1].strip("/")
+        candidates = [base / "index.html"] if not path else [base / f"{path}.html", base / path / "index.html"]
+        for candidate in candidates:
+            # 拒绝 .. 等跳出夹具目录的路径
+            if candidate.is_file() and base.resolve() in candidate.resolve().parents:
+                return candidate.read_text(encoding="utf-8")
+        return None
+
+    def load(self, url: str) -> Tuple[int, Document]:
+        """加载页面
+
+        Returns:
+            (HTTP 状态码, 新的文档副本)；没有对应夹具时返回 404 页面
+        """
+        key = page_key(url)
+        if key not in self._parsed:
+            html = self._read(key)
+            self._parsed[key] = parse_html(html) if html is not None else None
+        document = self._parsed[key]
+        if document is None:
+            return 404, parse_html(NOT_FOUND_HTML)
+        return 200, document.clone()
+
+
+class FakePage:
+    """内存中的标签页
+
+    页面上的选择器操作只作用于第一个匹配的元素（按文档顺序）；``click`` 和 ``fill`` 要求元素可见。
+    时间是虚拟的：``data-delay`` 等定时动作只在 ``advance``、``wait_for`` 或 ``wait_for_navigation``
+    推进时间时执行。
+
+    Args:
+        site: 提供页面的站点
+    """
+
+    def __init__(self, site: FakeSite):
+        self.site = site
+        self.url = "about:blank"
+        self.status = 200
+        self.document = parse_html("")
+        # 当前虚拟时间（毫秒）
+        self.now = 0
+        # 导航次数和 DOM 变更计数，变更计数用于判断可访问性快照是否失效
+        self.navigations = 0
+        self.version = 0
+        self._timers: List[Tuple[int, int, Callable[[], None]]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def title(self) -> str:
+        return self.document.title
+
+    # -- 导航和定时器 --------------------------------------------------------
+
+    def goto(self, url: str) -> int:
+        """导航到 URL，返回 HTTP 状态码；只有锚点不同时不重新加载文档"""
+        url = urljoin(self.url, url) if self.url != "about:blank" else url
+        self.version += 1
+        if self.url != "about:blank" and url.split("#")[0] == self.url.split("#")[0] and "#" in url:
+            self.url = url
+            return self.status
+        self.url = url
+        self.status, self.document = self.site.load(url)
+        self.navigations += 1
+        # 旧文档上的定时器随页面卸载失效
+        self._timers.clear()
+        return self.status
+
+    def set_timeout(self, callback: Callable[[], None], delay: int) -> None:
+        """在虚拟时间 ``delay`` 毫秒后执行回调"""
+        heapq.heappush(self._timers, (self.now + max(delay, 0), next(self._sequence), callback))
+
+    def advance(self, ms: int) -> None:
+        """推进虚拟时间并执行到期的定时器"""
+        self._run_until(lambda: False, self.now + ms)
+
+    def _run_until(self, condition: Callable[[], bool], deadline: int) -> bool:
+        while not condition():
+            if not self._timers or self._timers[0][0] > deadline:
+                self.now = max(self.now, deadline)
+                return condition()
+            due, _, callback = heapq.heappop(self._timers)
+            self.now = max(self.now, due)
+            callback()
+        return True
+
+    def wait_for(self, selector: str, timeout: int = 5000, visible: bool = True) -> Element:
+        """等待元素出现（``visible`` 时还要可见）
+
+        Raises:
+            ToolTimeoutError: 虚拟时间超过 ``timeout`` 毫秒后仍未出现
+        """
+        compiled = compile_selector(selector)
+        found: List[Element] = []
+
+        def present() -> bool:
+            found[:] = [e for e in compiled.select(self.document) if e.visible or not visible]
+            return bool(found)
+
+        if not self._run_until(present, self.now + timeout):
+            raise ToolTimeoutError(f"等待元素超时（{timeout}ms）: {selector}")
+        return found[0]
+
+    def wait_for_navigation(self, timeout: int = 30000) -> bool:
+        """推进虚拟时间直到发生一次导航，超时返回 False"""
+        start = self.navigations
+        return self._run_until(lambda: self.navigations > start, self.now + timeout)
+
+    # -- 查询 ---------------------------------------------------------------
+
+    def query_all(self, selector: str) -> List[Element]:
+        return compile_selector(selector).select(self.document)
+
+    def query(self, selector: str) -> Optional[Element]:
+        return compile_selector(selector).select_one(self.document)
+
+    def locate(self, selector: str, visible: bool = False) -> Element:
+        """第一个匹配的元素
+
+        Raises:
+            LookupError: 没有匹配（或可见）的元素
+        """
+        if visible:
+            element = next((e for e in self.query_all(selector) if e.visible), None)
+        else:
+            element = self.query(selector)
+        if element is None:
+                raise LookupError(f"页面中找不到{'可见' if visible else ''}元素: {selector}")
+        return element
+
+    def text(self, selector: str) -> str:
+        return self.locate(selector).inner_text
+
+    def attribute(self, selector: str, name: str) -> Optional[str]:
+        return self.locate(selector).get(name)
+
+    def snapshot(self) -> AccessibilitySnapshot:
+        return accessibility_snapshot(self.document)
+
+    # -- 交互 ---------------------------------------------------------------
+
+    def fill(self, selector: str, text: str) -> Element:
+        element = self.locate(selector, visible=True)
+        if element.tag not in ("input", "textarea", "select") and element.get("contenteditable") is None:
+            raise LookupError(f"元素不可填写: {selector}")
+        element.value = text
+        element.attrs.pop("aria-invalid", None)
+        self.version += 1
+        return element
+
+    def click(self, selector: str) -> Element:
+        """点击元素：沿祖先链查找第一个声明了动作的元素（事件冒泡），执行后停止"""
+        element = self.locate(selector, visible=True)
+        for target in itertools.chain([element], element.ancestors()):
+            if "data-show" in target.attrs or "data-hide" in target.attrs:
+                self._later(target, lambda t=target: self._toggle(t))
+                break
+            if target.tag == "a" and target.get("href"):
+                self.goto(target.attrs["href"])
+                break
+            if (target.tag == "button" and target.get("type", "submit").lower() == "submit") \
+                    or (target.tag == "input" and target.get("type", "").lower() == "submit"):
+                form = next((a for a in target.ancestors() if a.tag == "form"), None)
+                if form is not None:
+                    self._submit(form)
+                break
+        self.version += 1
+        return element
+
+    def _later(self, element: Element, action: Callable[[], None]) -> None:
+        delay = int(element.get("data-delay") or 0)
+        if delay:
+            document = self.document
+            # 页面已经离开时不再执行
+            self.set_timeout(lambda: action() if self.document is document else None, delay)
+        else:
+            action()
+
+    def _toggle(self, element: Element) -> None:
+        for attribute, hide in (("data-show", False), ("data-hide", True)):
+            if attribute in element.attrs:
+                for target in self.query_all(element.attrs[attribute]):
+                    if hide:
+                        target.attrs["hidden"] = ""
+                    else:
+                        target.attrs.pop("hidden", None)
+        self.version += 1
+
+    def _alert(self, form: Element, message: str) -> None:
+        alert = next((e for e in form.iter() if e.get("role") == "alert"), None)
+        if alert is not None:
+            alert.set_text(message)
+            alert.attrs.pop("hidden", None)
+        self.version += 1
+
+    def _submit(self, form: Element) -> None:
+        fields = [e for e in form.iter() if e.tag in ("input", "textarea", "select")]
+        invalid = [e for e in fields if e.invalid]
+        for field in fields:
+            if field in invalid:
+                field.attrs["aria-invalid"] = "true"
+            else:
+                field.attrs.pop("aria-invalid", None)
+        if invalid:
+            self._alert(form, form.get("data-invalid-message") or "Please fill out this field.")
+            return
+        self._later(form, lambda: self._complete_submit(form))
+
+    def _complete_submit(self, form: Element) -> None:
+        if "data-login" in form.attrs:
+            email = next((f.value for f in form.iter() if f.get("type") == "email" or f.get("name") == "email"), "")
+            password = next((f.value for f in form.iter() if f.get("type") == "password"), "")
+            if email not in self.site.accounts or self.site.accounts[email] != password:
+                self._alert(form, form.get("data-error-message") or "Invalid email or password")
+                return
+        if form.get("action"):
+            self.goto(form.attrs["action"])
+
+
+@lru_cache(maxsize=1)
+def get_fake_site() -> FakeSite:
+    """模拟客户端默认使用的站点：``FAKE_PAGES_DIR`` 中的夹具，配置中的测试账号和管理员账号可以登录"""
+    from config import get_settings
+
+    settings = get_settings()
+    return FakeSite.from_directory(settings.fake_pages_dir, accounts={
+        settings.test_email: settings.test_password,
+        settings.admin_email: settings.admin_password,
+    })
@@ -0,0 +1,305 @@
+"""测试影响分析
+
+记录每个测试访问过的 URL、使用过的选择器和文本，生成影响映射文件。
+前端部署后，根据变更的路由或部署版本的 DOM 差异选出受影响的最小测试集合，
+而不是每次都重新运行全部端到端测试。
+
+记录：
+    pytest --record-impact=.impact/impact_map.json
+
+``browser`` fixture 的客户端调用自动记录；直接使用 Playwright 的流程需要调用
+``get_impact_recorder().attach_page(page)`` 记录页面导航。
+
+只有访问过页面的测试会写入映射。映射中没有记录的测试（单元测试、新增或尚未记录的测试）
+无法判断是否受影响，总是被选中。
+
+选择（没有需要运行的测试时不输出并返回 1，``&&`` 避免空参数的 pytest 运行全部测试）：
+    tests=$(python -m src.impact --route /pricing --text Usher) && pytest $tests
+    python -m src.impact --map .impact/impact_map.json --dom-diff deploy_diff.json
+"""
+import argparse
+import fnmatch
+import json
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+
+
+# 选择器中的 id 和 class 片段
+_SELECTOR_TOKEN_RE = re.compile(r"([#.])([A-Za-z0-9_-]+)")
+# text= 选择器和 :has-text() 伪类中的文本
+_SELECTOR_TEXT_RE = re.compile(r"""^text=["']?(.+?)["']?$|:has-text\(["'](.+?)["']\)""")
+
+
+@dataclass
+class TestFootprint:
+    """单个测试的页面足迹"""
+
+    __test__ = False
+
+    urls: Set[str] = field(default_factory=set)
+    selectors: Set[str] = field(default_factory=set)
+    texts: Set[str] = field(default_factory=set)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.urls or self.selectors or self.texts)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            "urls": sorted(self.urls),
+            "selectors": sorted(self.selectors),
+            "texts": sorted(self.texts),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TestFootprint":
+        return cls(set(data.get("urls", [])), set(data.get("selectors", [])), set(data.get("texts", [])))
+
+
+@dataclass
+class ChangeSet:
+    """一次部署的变更
+
+    Attributes:
+        routes: 变更的路由，支持 ``*`` 通配符，例如 ``/pricing``、``/agentSociety/*``
+        selectors: 变更的元素选择器或 DOM 路径（如 ``div.pricing``）
+        texts: 新增、删除或修改的文本
+    """
+
+    routes: Set[str] = field(default_factory=set)
+    selectors: Set[str] = field(default_factory=set)
+    texts: Set[str] = field(default_factory=set)
+
+    @classmethod
+    def from_dom_diff(cls, payload: Dict[str, Any]) -> "ChangeSet":
+        """从 DOM 差异（``DomDiff`` 页面脚本返回的结构）生成变更集合
+
+        也接受直接给出 ``routes`` / ``selectors`` / ``texts`` 列表的 JSON。
+        """
+        changes = cls(
+            set(payload.get("routes", [])),
+            set(payload.get("selectors", [])),
+            set(payload.get("texts", [])),
+        )
+        for key in ("added", "removed", "textChanged"):
+            for node in payload.get(key, []):
+                if node.get("path"):
+                    changes.selectors.add(node["path"])
+                for text_key in ("text", "oldText"):
+                    if node.get(text_key):
+                        changes.texts.add(node[text_key])
+        return changes
+
+
+def _route(url: str) -> str:
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    return path + ("#" + parsed.fragment if parsed.fragment else "")
+
+
+def _selector_texts(selector: str) -> Set[str]:
+    texts = set()
+    for match in _SELECTOR_TEXT_RE.finditer(selector):
+        texts.add(match.group(1) or match.group(2))
+    return texts
+
+
+def _selector_tokens(selector: str) -> Set[str]:
+    return {prefix + name for prefix, name in _SELECTOR_TOKEN_RE.findall(selector)}
+
+
+class ImpactRecorder:
+    """测试足迹记录器
+
+    Usage:
+        recorder = ImpactRecorder()
+        recorder.start_test("tests/test_x.py::test_y")
+        client.add_listener(recorder.on_tool_call)
+        ...
+        recorder.save(".impact/impact_map.json")
+    """
+
+    def __init__(self):
+        self.footprints: Dict[str, TestFootprint] = {}
+        self.current: Optional[str] = None
+
+    def start_test(self, test_id: str) -> None:
+        """开始记录一个测试，重新运行的测试覆盖旧的足迹"""
+        self.current = test_id
+        self.footprints[test_id] = TestFootprint()
+
+    def stop_test(self) -> None:
+        self.current = None
+
+    def _footprint(self) -> Optional[TestFootprint]:
+        return self.footprints.get(self.current) if self.current else None
+
+    def record_url(self, url: str) -> None:
+        footprint = self._footprint()
+        if footprint is not None and url:
+            footprint.urls.add(url)
+
+    def record_selector(self, selector: str) -> None:
+        footprint = self._footprint()
+        if footprint is not None and selector:
+            footprint.selectors.add(selector)
+            footprint.texts.update(_selector_texts(selector))
+
+    def record_text(self, text: str) -> None:
+        footprint = self._footprint()
+        if footprint is not None and text:
+            footprint.texts.add(text)
+
+    def on_tool_call(self, name: str, arguments: Dict[str, Any]) -> None:
+        """``BrowserMCPClient.add_listener`` 使用的监听函数"""
+        if name == "navigate":
+            self.record_url(arguments.get("url"))
+        if arguments.get("selector"):
+            self.record_selector(arguments["selector"])
+        if arguments.get("name"):
+            self.record_text(arguments["name"])
+
+    def attach_page(self, page: Any) -> None:
+        """记录 Playwright 页面主框架的每次导航
+
+        没有正在记录的测试时（未指定 ``--record-impact`` 或直接运行脚本）导航不会被记录，
+        流程可以无条件调用。
+        """
+        def on_navigated(frame: Any) -> None:
+            if frame.parent_frame is None:
+                self.record_url(frame.url)
+        page.on("framenavigated", on_navigated)
+
+    def save(self, path: str) -> None:
+        """合并写入影响映射文件，保留本次未运行的测试的旧记录"""
+        target = Path(path)
+        data = load_impact_map(path) if target.exists() else {}
+        for test_id, footprint in self.footprints.items():
+            # 没有访问任何页面的测试（单元测试）不依赖前端，不写入映射
+            if footprint.is_empty:
+                data.pop(test_id, None)
+            else:
+                data[test_id] = footprint
+        target.parent.mkdir(parents=True, exist_ok=True)
+        serialized = {test_id: fp.to_dict() for test_id, fp in sorted(data.items())}
+        target.write_text(json.dumps(serialized, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+@lru_cache(maxsize=None)
+def get_impact_recorder() -> ImpactRecorder:
+    """进程内共享的足迹记录器，由 ``pytest --record-impact`` 开始和结束每个测试的记录"""
+    return ImpactRecorder()
+
+
+def load_impact_map(path: str) -> Dict[str, TestFootprint]:
+    """读取影响映射文件"""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {test_id: TestFootprint.from_dict(fp) for test_id, fp in data.items()}
+
+
+def is_affected(footprint: TestFootprint, changes: ChangeSet) -> bool:
+    """判断一个测试是否受变更影响
+
+    测试访问过的路由匹配变更路由（支持通配符和子路径），或使用过的选择器与变更的选择器
+    相同或共享 id/class，或使用过的文本出现在变更文本中时，视为受影响。
+    """
+    routes = {_route(url) for url in footprint.urls}
+    for pattern in changes.routes:
+        pattern = pattern if pattern.startswith("/") else "/" + pattern
+        for route in routes:
+            path = route.split("#")[0]
+            if fnmatch.fnmatch(route, pattern) or fnmatch.fnmatch(path, pattern):
+                return True
+            prefix = pattern.rstrip("/")
+            if prefix and path.startswith(prefix + "/"):
+                return True
+    if footprint.selectors & changes.selectors:
+        return True
+    changed_tokens = set()
+    for selector in changes.selectors:
+        changed_tokens |= _selector_tokens(selector)
+    for selector in footprint.selectors:
+        if _selector_tokens(selector) & changed_tokens:
+            return True
+    for text in footprint.texts:
+        if any(text in changed for changed in changes.texts):
+            return True
+    return False
+
+
+def select_tests(
+    impact_map: Dict[str, TestFootprint],
+    changes: ChangeSet,
+    all_tests: Optional[Iterable[str]] = None
+) -> List[str]:
+    """选出受变更影响的测试
+
+    Args:
+        impact_map: 测试 ID 到足迹的映射
+        changes: 部署变更
+        all_tests: 当前的全部测试 ID，其中映射没有记录的测试总是被选中
+
+    Returns:
+        排序后的测试 ID 列表
+    """
+    selected = {test_id for test_id, fp in impact_map.items() if is_affected(fp, changes)}
+    if all_tests is not None:
+        selected = {t for t in selected if t in set(all_tests)} | (set(all_tests) - set(impact_map))
+    return sorted(selected)
+
+
+def collect_test_ids() -> List[str]:
+    """运行 ``pytest --collect-only`` 获取当前的全部测试 ID"""
+    output = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-o", "addopts=", "-p", "no:cacheprovider"],
+        capture_output=True,
+        text=True,
+    ).stdout
+    return [line.strip() for line in output.splitlines() if "::" in line]
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="根据前端变更选择需要重新运行的测试")
+    parser.add_argument("--map", default=".impact/impact_map.json", help="影响映射文件")
+    parser.add_argument("--route", action="append", default=[], help="变更的路由，可重复")
+    parser.add_argument("--selector", action="append", default=[], help="变更的选择器，可重复")
+    parser.add_argument("--text", action="append", default=[], help="变更的文本，可重复")
+    parser.add_argument("--dom-diff", help="部署版本的 DOM 差异 JSON 文件")
+    parser.add_argument(
+        "--tests",
+        help="全部测试 ID 列表文件（每行一个，- 表示标准输入），默认运行 pytest --collect-only 获取"
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    changes = ChangeSet(set(args.route), set(args.selector), set(args.text))
+    if args.dom_diff:
+        diff = ChangeSet.from_dom_diff(json.loads(Path(args.dom_diff).read_text(encoding="utf-8")))
+        changes.routes |= diff.routes
+        changes.selectors |= diff.selectors
+        changes.texts |= diff.texts
+
+    if args.tests == "-":
+        all_tests = [line.strip() for line in sys.stdin if line.strip()]
+    elif args.tests:
+        all_tests = [line.strip() for line in Path(args.tests).read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        all_tests = collect_test_ids()
+
+    selected = select_tests(load_impact_map(args.map), changes, all_tests)
+    if not selected:
+        # 空输出会让 `pytest $(...)` 运行全部测试，以返回值表示没有需要运行的测试
+        print("没有受影响的测试", file=sys.stderr)
+        return 1
+    for test_id in selected:
+        print(test_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
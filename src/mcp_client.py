@@ -1,12 +1,88 @@
 """Browser MCP 客户端封装
 
 提供与 Browser MCP 服务器交互的接口，简化浏览器自动化操作。
+页面操作由可替换的后端执行（内存模拟、MCP 服务器或 Playwright，见 src/backends/）。
+操作失败时抛出异常，成功时返回 src/results.py 中的不可变结果对象。
 """
 import asyncio
+import base64
+import functools
+import inspect
 import json
-from typing import Any, Dict, Optional, List
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Tuple
 from contextlib import asynccontextmanager
 
+from src.accessibility import AccessibilitySnapshot, SnapshotCache
+from src.cdp import CDPChannel
+from src.errors import ToolTimeoutError
+from src.events import EventLog
+from src.backends import Backend, create_backend
+from src.backends.base import evaluation_expression
+from src.resilience import CircuitBreaker, RetryPolicy, get_circuit_breaker
+from src.results import (
+    ActionResult,
+    NavigationResult,
+    WaitResult,
+    action_result,
+    navigation_result,
+    wait_result,
+)
+
+
+# 视为服务器不健康的传输层异常：计入熔断器并允许重试。
+# 后端报告的等待超时（元素没有出现）、找不到元素、工具或 CDP 返回的错误说明服务器有响应，
+# 都不计入熔断器；调用超过客户端截止时间（服务器没有响应）时计入
+_TRANSIENT_ERRORS = (ConnectionError,)
+
+# 带超时参数的调用，客户端截止时间比操作本身的超时多出的时间（毫秒），
+# 让后端先报告等待超时，而不是被当作服务器没有响应
+_DEADLINE_GRACE = 1000
+
+
+def _tool_call(idempotent: bool = False, timeout_arg: Optional[str] = None):
+    """把客户端方法包装为受截止时间、重试和熔断保护的工具调用
+    
+    Args:
+        idempotent: 是否为幂等读操作，只有幂等操作会在失败后重试
+        timeout_arg: 方法中表示超时时间（毫秒）的参数名，截止时间为该超时加上 ``_DEADLINE_GRACE``；
+            未指定时使用客户端的 default_timeout
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            timeout = self.default_timeout
+            arguments: Dict[str, Any] = {}
+            if timeout_arg or self._listeners or self.event_log:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                if timeout_arg:
+                    timeout = bound.arguments[timeout_arg] + _DEADLINE_GRACE
+                arguments = dict(bound.arguments)
+                arguments.pop("self")
+                if self._listeners:
+                    self._notify(func.__name__, arguments)
+            call = self._call(
+                func.__name__,
+                lambda: func(self, *args, **kwargs),
+                timeout,
+                idempotent
+            )
+            if self.event_log is None:
+                return await call
+            start = time.monotonic()
+            try:
+                result = await call
+            except Exception as e:
+                self.event_log.on_tool_call(func.__name__, arguments, time.monotonic() - start, e)
+                raise
+            self.event_log.on_tool_call(func.__name__, arguments, time.monotonic() - start)
+            return result
+        return wrapper
+    return decorator
+
 
 class BrowserMCPClient:
     """Browser MCP 客户端
@@ -14,125 +90,223 @@ class BrowserMCPClient:
     封装与 Browser MCP 服务器的通信，提供高级浏览器操作接口。
     """
     
-    def __init__(self, mcp_server_name: str = "cursor-browser-extension"):
+    def __init__(
+        self,
+        mcp_server_name: str = "cursor-browser-extension",
+        default_timeout: int = 10000,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cdp: Optional[CDPChannel] = None,
+        event_log: Optional[EventLog] = None,
+        backend: Optional[Backend] = None
+    ):
         """初始化 MCP 客户端
         
         Args:
             mcp_server_name: MCP 服务器名称，默认为 cursor-browser-extension
+            default_timeout: 未显式传入超时参数的工具调用的截止时间（毫秒）
+            retry_policy: 幂等读操作的重试策略
+            circuit_breaker: 熔断器，默认与同名服务器的其他客户端共享
+            cdp: 可选的 CDP 直连通道，提供时 URL/标题读取、截图和脚本执行直接走 CDP
+            event_log: 可选的事件日志，每次工具调用结束后记录工具名称、状态和耗时
+            backend: 执行页面操作的浏览器后端，默认按 ``BROWSER_BACKEND`` 创建（见 src/backends/）
         """
         self.mcp_server_name = mcp_server_name
+        self.default_timeout = default_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(mcp_server_name)
+        self.cdp = cdp
+        self.event_log = event_log
         self._context: Optional[Dict[str, Any]] = None
-        self._current_url: str = "https://example.com"
-        self._current_title: str = "Page Title"
-        self._element_texts: Dict[str, str] = {}
+        self.backend = backend or create_backend()
+        # 客户端操作之外的页面变化计数，与后端的页面变更计数一起作为快照缓存的键
+        self._dom_version: int = 0
+        self._snapshot_cache = SnapshotCache()
+        # 工具调用监听器，例如测试影响分析记录访问的 URL 和选择器
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+    
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """注册工具调用监听器
+        
+        每次工具调用前以 ``(工具名称, 参数字典)`` 调用监听器。
+        
+        Args:
+            listener: 监听函数
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """移除工具调用监听器"""
+        self._listeners.remove(listener)
+    
+    def _notify(self, name: str, arguments: Dict[str, Any]) -> None:
+        for listener in list(self._listeners):
+            listener(name, arguments)
     
     async def __aenter__(self):
-        """异步上下文管理器入口"""
-        # 在实际实现中，这里会建立与 MCP 服务器的连接
-        # 由于 MCP 服务器通过编辑器集成，这里使用模拟实现
-        self._context = {"connected": True}
+        """异步上下文管理器入口：连接 MCP 服务器或启动浏览器"""
+        await self.backend.start()
+        # 后端提供 CDP 通道（Playwright 后端在 Chromium 上）时，热路径操作直接走 CDP
+        borrowed_cdp = self.cdp is None and self.backend.cdp is not None
+        if borrowed_cdp:
+            self.cdp = self.backend.cdp
+        self._context = {"connected": True, "borrowed_cdp": borrowed_cdp}
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """异步上下文管理器出口"""
         if self._context:
             # 清理资源
+            if self._context["borrowed_cdp"]:
+                self.cdp = None
             self._context = None
+            await self.backend.close()
+    
+    async def _call(
+        self,
+        name: str,
+        operation: Callable[[], Awaitable[Any]],
+        timeout: int,
+        idempotent: bool = False
+    ) -> Any:
+        """在截止时间、重试和熔断保护下执行一次工具调用
+        
+        Args:
+            name: 工具名称，用于错误信息
+            operation: 返回协程的无参函数，每次尝试调用一次
+            timeout: 截止时间（毫秒）
+            idempotent: 是否允许失败后重试
+            
+        Returns:
+            工具调用结果
+            
+        Raises:
+            CircuitOpenError: 熔断器处于打开状态
+            ToolTimeoutError: 调用超过截止时间且重试耗尽，或后端报告等待超时
+        """
+        attempts = self.retry_policy.attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            self.circuit_breaker.before_call(name)
+            try:
+                result = await asyncio.wait_for(operation(), timeout / 1000)
+            except asyncio.TimeoutError:
+                error: Exception = ToolTimeoutError(f"{name} 超过截止时间 {timeout}ms")
+            except _TRANSIENT_ERRORS as e:
+                error = e
+            except BaseException:
+                # 与服务器健康无关的失败：不计入熔断器，半开状态下允许下一次试探
+                self.circuit_breaker.record_ignored()
+                raise
+            else:
+                self.circuit_breaker.record_success()
+                return result
+            self.circuit_breaker.record_failure()
+            if attempt == attempts:
+                raise error
+            await asyncio.sleep(self.retry_policy.delay(attempt))
     
-    async def navigate(self, url: str) -> Dict[str, Any]:
+    def _locate_timeout(self) -> int:
+        """没有超时参数的元素操作定位元素的时间（毫秒）
+        
+        比 default_timeout 截止时间少 ``_DEADLINE_GRACE``，找不到元素时后端先抛出 LookupError，
+        而不是调用超过截止时间被重试并计入熔断器
+        """
+        return max(self.default_timeout - _DEADLINE_GRACE, self.default_timeout // 2)
+    
+    @_tool_call()
+    async def navigate(self, url: str) -> NavigationResult:
         """导航到指定 URL
         
         Args:
             url: 目标网页 URL
             
         Returns:
-            操作结果字典
-        """
-        # 在实际实现中，这里会调用 MCP 服务器的 navigate 工具
-        # 示例：通过 MCP 协议调用 browser_navigate 工具
-        self._current_url = url
-        # 根据 URL 设置不同的标题
-        if "login" in url:
-            self._current_title = "Login Page"
-        elif "dashboard" in url:
-            self._current_title = "Dashboard"
-        else:
-            self._current_title = "Page Title"
-        result = {
-            "success": True,
-            "url": url,
-            "title": self._current_title
-        }
-        return result
-    
-    async def click(self, selector: str, wait_timeout: int = 5000) -> Dict[str, Any]:
+            导航后页面的 URL 和标题
+        """
+        return navigation_result(*await self.backend.navigate(url))
+    
+    @_tool_call(timeout_arg="wait_timeout")
+    async def click(
+        self,
+        selector: Optional[str] = None,
+        wait_timeout: int = 5000,
+        *,
+        role: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> ActionResult:
         """点击页面元素
         
         Args:
             selector: CSS 选择器或 XPath
             wait_timeout: 等待超时时间（毫秒）
+            role: 不提供 selector 时，按可访问性角色定位元素
+            name: 配合 role 使用的可访问名称
             
         Returns:
-            操作结果字典
-        """
-        # 模拟点击后可能触发的内容变化
-        if "load-content" in selector:
-            self._element_texts["div#content"] = "Content Loaded"
-        elif "login" in selector:
-            # 模拟登录后跳转
-            if "login" in self._current_url:
-                self._current_url = "https://example.com/dashboard"
-                self._current_title = "Dashboard"
-                self._element_texts["div#welcome-message"] = "Welcome, User!"
-        result = {
-            "success": True,
-            "selector": selector,
-            "action": "click"
-        }
-        return result
-    
-    async def fill(self, selector: str, text: str) -> Dict[str, Any]:
+            点击的元素
+            
+        Raises:
+            LookupError: 页面中没有匹配的可见元素，或在 wait_timeout 内没有变为可点击
+        """
+        selector = await self._resolve_selector(selector, role, name)
+        await self.backend.click(selector, wait_timeout)
+        return action_result("click", selector)
+    
+    @_tool_call()
+    async def fill(
+        self,
+        selector: Optional[str] = None,
+        text: Optional[str] = None,
+        *,
+        role: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> ActionResult:
         """在输入框中填入文本
         
         Args:
             selector: 输入框的 CSS 选择器
-            text: 要填入的文本
+            text: 要填入的文本，按 role/name 定位时以关键字参数传入
+            role: 不提供 selector 时，按可访问性角色定位元素，例如 textbox
+            name: 配合 role 使用的可访问名称
             
         Returns:
-            操作结果字典
+            填写的输入框
+            
+        Raises:
+            ValueError: 没有提供要填入的文本
+            LookupError: 页面中没有匹配的可见输入框
         """
-        result = {
-            "success": True,
-            "selector": selector,
-            "text": text,
-            "action": "fill"
-        }
-        return result
+        if text is None:
+            raise ValueError("必须提供要填入的文本 text")
+        selector = await self._resolve_selector(selector, role, name)
+        await self.backend.fill(selector, text, self._locate_timeout())
+        return action_result("fill", selector)
     
-    async def get_text(self, selector: str) -> str:
+    @_tool_call(idempotent=True)
+    async def get_text(
+        self,
+        selector: Optional[str] = None,
+        *,
+        role: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> str:
         """获取元素的文本内容
         
         Args:
             selector: 元素的 CSS 选择器
+            role: 不提供 selector 时，按可访问性角色定位元素
+            name: 配合 role 使用的可访问名称
             
         Returns:
-            元素的文本内容
-        """
-        # 在实际实现中，这里会调用 MCP 服务器的 get_text 工具
-        # 返回预设的文本或默认文本
-        if selector in self._element_texts:
-            return self._element_texts[selector]
-        # 根据选择器返回不同的默认文本
-        if "welcome" in selector:
-            return "Welcome, User!"
-        if "content" in selector:
-            return "Content Loaded"
-        if "results" in selector:
-            return "Search Results"
-        if "h1" in selector:
-            return "Example Domain"
-        return "Sample Text"
+            元素的可见文本，隐藏的元素为空字符串
+            
+        Raises:
+            LookupError: 页面中没有匹配的元素
+        """
+        selector = await self._resolve_selector(selector, role, name)
+        return await self.backend.text(selector, self._locate_timeout())
     
+    @_tool_call(idempotent=True)
     async def get_attribute(self, selector: str, attribute: str) -> Optional[str]:
         """获取元素的属性值
         
@@ -142,15 +316,19 @@ class BrowserMCPClient:
             
         Returns:
             属性值，如果不存在则返回 None
+            
+        Raises:
+            LookupError: 页面中没有匹配的元素
         """
-        return None
+        return await self.backend.attribute(selector, attribute, self._locate_timeout())
     
+    @_tool_call(timeout_arg="timeout")
     async def wait_for_selector(
         self, 
         selector: str, 
         timeout: int = 5000,
         visible: bool = True
-    ) -> Dict[str, Any]:
+    ) -> WaitResult:
         """等待元素出现在页面中
         
         Args:
@@ -159,15 +337,15 @@ class BrowserMCPClient:
             visible: 是否等待元素可见
             
         Returns:
-            操作结果字典
+            出现的元素
+            
+        Raises:
+            ToolTimeoutError: 超时后元素仍未出现
         """
-        result = {
-            "success": True,
-            "selector": selector,
-            "found": True
-        }
-        return result
+        await self.backend.wait_for(selector, timeout, visible)
+        return wait_result(selector)
     
+    @_tool_call()
     async def screenshot(self, path: Optional[str] = None) -> str:
         """截取页面截图
         
@@ -177,64 +355,147 @@ class BrowserMCPClient:
         Returns:
             截图路径或 base64 编码
         """
-        return path or "screenshot_base64_data"
+        if self.cdp is not None:
+            data = await self.cdp.screenshot(path)
+        else:
+            data = await self.backend.screenshot(path)
+        return path or base64.b64encode(data).decode()
     
+    @_tool_call()
     async def evaluate(self, script: str) -> Any:
         """在页面上下文中执行 JavaScript
         
+        所有后端都按 Playwright ``page.evaluate`` 的约定执行：表达式直接求值，
+        函数字符串（如 ``"() => document.title"``）被调用。
+        
         Args:
-            script: 要执行的 JavaScript 代码
+            script: 要执行的 JavaScript 表达式或函数
             
         Returns:
             执行结果
         """
-        # 模拟返回页面信息
-        return {
-            "url": self._current_url,
-            "title": self._current_title,
-            "userAgent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
-        }
+        if self.cdp is not None:
+            return await self.cdp.evaluate(evaluation_expression(script), await_promise=True)
+        return await self.backend.evaluate(script)
     
+    @_tool_call(idempotent=True)
     async def get_url(self) -> str:
         """获取当前页面 URL
         
         Returns:
             当前页面的 URL
         """
-        return self._current_url
+        if self.cdp is not None:
+            return (await self.cdp.url_and_title())[0]
+        return (await self.backend.url_and_title())[0]
     
+    @_tool_call(idempotent=True)
     async def get_title(self) -> str:
         """获取当前页面标题
         
         Returns:
             当前页面的标题
         """
-        return self._current_title
+        if self.cdp is not None:
+            return (await self.cdp.url_and_title())[1]
+        return (await self.backend.url_and_title())[1]
     
-    async def wait_for_navigation(self, timeout: int = 30000) -> Dict[str, Any]:
+    @_tool_call(idempotent=True)
+    async def get_url_and_title(self) -> Tuple[str, str]:
+        """一次调用同时获取当前页面 URL 和标题
+        
+        Returns:
+            (URL, 标题)
+        """
+        if self.cdp is not None:
+            return await self.cdp.url_and_title()
+        return await self.backend.url_and_title()
+    
+    @_tool_call(timeout_arg="timeout")
+    async def wait_for_navigation(self, timeout: int = 30000) -> NavigationResult:
         """等待页面导航完成
         
         Args:
             timeout: 超时时间（毫秒）
             
         Returns:
-            操作结果字典
+            当前页面的 URL 和标题
+        """
+        await self.backend.wait_for_navigation(timeout)
+        return navigation_result(*await self.backend.url_and_title())
+    
+    @_tool_call(idempotent=True)
+    async def snapshot(self) -> AccessibilitySnapshot:
+        """获取页面可访问性快照
+        
+        快照按页面变更计数缓存，页面未发生变化时直接复用，
+        不会重新查询页面。
+        
+        Returns:
+            可访问性快照
+        """
+        return await self._current_snapshot()
+    
+    def invalidate_snapshot(self) -> None:
+        """标记页面已变化，下次访问快照时重新获取
+        
+        用于页面在客户端操作之外发生变化的场景（例如定时刷新的内容）。
         """
-        result = {
-            "success": True,
-            "url": await self.get_url()
-        }
-        return result
+        self._bump_dom_version()
+    
+    async def _current_snapshot(self) -> AccessibilitySnapshot:
+        """经缓存获取快照，不经过工具调用保护，供其他工具内部使用
+        
+        工具内部再调用 ``snapshot()`` 会让一次调用两次经过熔断器，
+        半开状态下内层调用会被拒绝。
+        """
+        key = (self.backend.version, self._dom_version)
+        return await self._snapshot_cache.get(key, self._fetch_snapshot)
+    
+    async def _fetch_snapshot(self) -> AccessibilitySnapshot:
+        """从后端获取可访问性快照
+        
+        mcp 后端解析 browser_snapshot 工具返回的文本，ref 为 MCP 的元素引用；
+        fake 和 playwright 后端从 DOM 生成快照，ref 为元素的 CSS 选择器。
+        """
+        return await self.backend.snapshot()
+    
+    async def _resolve_selector(
+        self,
+        selector: Optional[str],
+        role: Optional[str],
+        name: Optional[str]
+    ) -> str:
+        """把 selector 或 role/name 解析为元素引用"""
+        if selector:
+            return selector
+        if not role:
+            raise ValueError("必须提供 selector 或 role")
+        node = (await self._current_snapshot()).find(role, name)
+        if node is None:
+            raise LookupError(f"快照中找不到元素: role={role!r}, name={name!r}")
+        return node.ref
+    
+    def _bump_dom_version(self) -> None:
+        """递增 DOM 变更计数，使快照缓存失效"""
+        self._dom_version += 1
 
 
 # 便捷函数：用于在测试中快速创建客户端
 @asynccontextmanager
-async def browser_client(mcp_server_name: str = "cursor-browser-extension"):
+async def browser_client(
+    mcp_server_name: str = "cursor-browser-extension",
+    backend: Optional[str] = None
+):
     """创建浏览器客户端的便捷函数
     
+    Args:
+        mcp_server_name: MCP 服务器名称
+        backend: 浏览器后端名称，为 None 时使用 BROWSER_BACKEND
+    
     Usage:
         async with browser_client() as browser:
             await browser.navigate("https://example.com")
     """
-    async with BrowserMCPClient(mcp_server_name) as client:
+    async with BrowserMCPClient(mcp_server_name, backend=create_backend(backend)) as client:
         yield client
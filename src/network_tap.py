@@ -0,0 +1,335 @@
+"""对话后端网络流采集
+
+在网络层订阅对话请求的 SSE / WebSocket 帧，按到达时间记录每一帧并重组回复 token，
+使响应验证和延迟统计基于后端实际返回的内容，而不是渲染后的 DOM 文本
+（不再需要手工过滤 "I am Claudia"、"Copy" 等界面文字）。
+
+- WebSocket: 直接使用 Playwright 的 ``websocket`` / ``framereceived`` 事件
+- SSE / 流式 fetch: Playwright 无法逐块读取响应体，因此通过 init script 包装页面的
+  ``fetch`` 和 ``EventSource``，把读取到的数据块经 ``expose_binding`` 回传
+
+binding 和 init script 每个页面只安装一次（重复 ``expose_binding`` 会报错），同一页面上先后启动的
+采集器共用它们；页面回传所有流式响应，由各采集器按 ``url_pattern`` 在 Python 侧过滤。
+"""
+import asyncio
+import functools
+import json
+import re
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+# 包装 fetch / EventSource 的 init script，__BINDING__ 在安装时替换
+_TAP_SCRIPT = """
+(() => {
+    if (window.__bmcpTapInstalled) return;
+    window.__bmcpTapInstalled = true;
+    const send = (kind, url, data) => {
+        try { window[__BINDING__]({kind: kind, url: url, data: data}); } catch (e) {}
+    };
+    const isStream = (type) => /event-stream|ndjson|stream/i.test(type || '');
+
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = async function (...args) {
+            const response = await originalFetch.apply(this, args);
+            const request = args[0];
+            const url = response.url || (request && request.url) || String(request);
+            if (response.body && isStream(response.headers.get('content-type'))) {
+                const reader = response.clone().body.getReader();
+                const decoder = new TextDecoder();
+                (async () => {
+                    for (;;) {
+                        const {done, value} = await reader.read();
+                        if (done) break;
+                        send('sse', url, decoder.decode(value, {stream: true}));
+                    }
+                    send('end', url, '');
+                })().catch(() => send('end', url, ''));
+            }
+            return response;
+        };
+    }
+
+    const OriginalEventSource = window.EventSource;
+    if (OriginalEventSource) {
+        const Wrapped = function (url, config) {
+            const source = new OriginalEventSource(url, config);
+            source.addEventListener('message', (e) => send('event', source.url, e.data));
+            source.addEventListener('error', () => send('end', source.url, ''));
+            return source;
+        };
+        Wrapped.prototype = OriginalEventSource.prototype;
+        window.EventSource = Wrapped;
+    }
+})();
+"""
+
+# 流结束标记
+DONE_MARKERS = ("[DONE]",)
+
+# 每个页面上已安装的 binding，值为当前接收该 binding 数据的采集器
+_page_taps: "weakref.WeakKeyDictionary[Any, Dict[str, List[NetworkTap]]]" = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class NetworkFrame:
+    """一帧网络数据
+
+    Attributes:
+        kind: sse、ws 或 end
+        url: 请求地址
+        data: 帧数据（SSE 为单个事件的 data 字段）
+        timestamp: 相对采集开始的时间（秒）
+        event: SSE 事件名称
+    """
+
+    kind: str
+    url: str
+    data: str
+    timestamp: float
+    event: Optional[str] = None
+
+
+@dataclass
+class Token:
+    """重组后的回复片段"""
+
+    text: str
+    timestamp: float
+
+
+class SSEParser:
+    """增量 SSE 解析器
+
+    数据块可能在任意位置截断，未完成的行保留到下一次 ``feed``。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._data: List[str] = []
+        self._event: Optional[str] = None
+
+    def feed(self, chunk: str) -> List[tuple]:
+        """接收一个数据块
+
+        Returns:
+            已完成的事件列表，每项为 ``(event, data)``
+        """
+        self._buffer += chunk
+        events = []
+        *lines, self._buffer = re.split(r"\r\n|\r|\n", self._buffer)
+        for line in lines:
+            if not line:
+                if self._data:
+                    events.append((self._event, "\n".join(self._data)))
+                self._data = []
+                self._event = None
+            elif line.startswith(":"):
+                continue
+            else:
+                name, _, value = line.partition(":")
+                if value.startswith(" "):
+                    value = value[1:]
+                if name == "data":
+                    self._data.append(value)
+                elif name == "event":
+                    self._event = value
+        return events
+
+
+def extract_token(data: str) -> Optional[str]:
+    """从一帧数据中提取回复文本
+
+    支持常见的 JSON 结构（``choices[0].delta.content``、``delta.text``、
+    ``content``、``text``、``token``），非 JSON 数据原样返回。
+
+    Returns:
+        回复文本，帧中不包含文本（例如心跳、元数据）时返回 None
+    """
+    if data.strip() in DONE_MARKERS:
+        return None
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return data
+    if isinstance(payload, str):
+        return payload
+    if not isinstance(payload, dict):
+        return None
+    choices = payload.get("choices")
+    if isinstance(choices, list) and choices:
+        delta = choices[0].get("delta") or choices[0].get("message") or {}
+        if isinstance(delta.get("content"), str):
+            return delta["content"]
+    delta = payload.get("delta")
+    if isinstance(delta, dict):
+        for key in ("text", "content"):
+            if isinstance(delta.get(key), str):
+                return delta[key]
+    for key in ("content", "text", "token"):
+        if isinstance(payload.get(key), str):
+            return payload[key]
+    return None
+
+
+class NetworkTap:
+    """对话网络流采集器
+
+    Usage:
+        tap = NetworkTap(page, url_pattern=r"/api/chat")
+        await tap.start()              # 在导航到对话页面之前调用
+        ...
+        await tap.wait_for_end(timeout=120000)
+        reply = tap.reply
+        tap.stop()                     # 同一页面复用时（例如浸泡测试）停止接收
+
+    Args:
+        page: Playwright 页面
+        url_pattern: 对话请求地址的正则表达式（不区分大小写）
+        token_extractor: 从帧数据提取回复文本的函数
+        binding: 页面回传数据使用的绑定名称
+        clock: 时钟函数，返回秒
+    """
+
+    def __init__(
+        self,
+        page: Any,
+        url_pattern: str = r"chat|conversation|message|stream",
+        token_extractor: Callable[[str], Optional[str]] = extract_token,
+        binding: str = "__bmcpTap",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.page = page
+        self.url_pattern = url_pattern
+        self.token_extractor = token_extractor
+        self.binding = binding
+        self.clock = clock
+        self.frames: List[NetworkFrame] = []
+        self.tokens: List[Token] = []
+        self.ended = False
+        self._regex = re.compile(url_pattern, re.IGNORECASE)
+        self._parsers: dict = {}
+        self._started_at = clock()
+        self._end_event = asyncio.Event()
+
+    async def start(self) -> None:
+        """开始接收网络流，应在页面加载对话应用之前调用
+
+        页面上第一次启动时安装 binding 和 init script，之后的采集器复用。
+        """
+        self._started_at = self.clock()
+        bindings = _page_taps.setdefault(self.page, {})
+        taps = bindings.get(self.binding)
+        if taps is None:
+            # 在 await 之前登记，并发启动的采集器不会重复安装
+            taps = bindings[self.binding] = []
+            try:
+                await self.page.expose_binding(self.binding, functools.partial(_dispatch, taps))
+                await self.page.add_init_script(script=_TAP_SCRIPT.replace("__BINDING__", json.dumps(self.binding)))
+            except Exception:
+                del bindings[self.binding]
+                raise
+        if self not in taps:
+            taps.append(self)
+            self.page.on("websocket", self._on_websocket)
+
+    def stop(self) -> None:
+        """停止接收网络流，移除页面上的监听器；已采集的帧保留"""
+        taps = _page_taps.get(self.page, {}).get(self.binding)
+        if taps is not None and self in taps:
+            taps.remove(self)
+            self.page.remove_listener("websocket", self._on_websocket)
+
+    def reset(self) -> None:
+        """清空已采集的帧，例如在提交下一个问题之前"""
+        self.frames.clear()
+        self.tokens.clear()
+        self._parsers.clear()
+        self.ended = False
+        self._end_event.clear()
+        self._started_at = self.clock()
+
+    @property
+    def reply(self) -> str:
+        """重组后的完整回复"""
+        return "".join(token.text for token in self.tokens)
+
+    @property
+    def first_token_latency(self) -> Optional[float]:
+        """从采集开始（或 reset）到第一个 token 的时间（秒）"""
+        return self.tokens[0].timestamp if self.tokens else None
+
+    @property
+    def token_intervals(self) -> List[float]:
+        """相邻 token 之间的时间间隔（秒）"""
+        return [b.timestamp - a.timestamp for a, b in zip(self.tokens, self.tokens[1:])]
+
+    async def wait_for_end(self, timeout: int = 120000) -> bool:
+        """等待流结束
+
+        Args:
+            timeout: 超时时间（毫秒）
+
+        Returns:
+            流是否在超时前结束
+        """
+        try:
+            await asyncio.wait_for(self._end_event.wait(), timeout / 1000)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _on_binding(self, source: Any, payload: dict) -> None:
+        kind, url, data = payload["kind"], payload["url"], payload["data"]
+        if not self._regex.search(url):
+            return
+        if kind == "sse":
+            parser = self._parsers.setdefault(url, SSEParser())
+            for event, value in parser.feed(data):
+                self._record("sse", url, value, event)
+        elif kind == "event":
+            self._record("sse", url, data)
+        elif kind == "end":
+            self._record("end", url, "")
+
+    def _on_websocket(self, ws: Any) -> None:
+        if not self._regex.search(ws.url):
+            return
+        ws.on("framereceived", lambda payload: self._on_ws_frame(ws.url, payload))
+        ws.on("close", lambda *_: self._on_ws_close(ws.url))
+
+    @property
+    def _active(self) -> bool:
+        return self in _page_taps.get(self.page, {}).get(self.binding, ())
+
+    def _on_ws_close(self, url: str) -> None:
+        if self._active:
+            self._record("end", url, "")
+
+    def _on_ws_frame(self, url: str, payload: Union[str, bytes]) -> None:
+        # stop() 之后已打开的 WebSocket 仍可能回调
+        if not self._active:
+            return
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8", errors="replace")
+        self._record("ws", url, payload)
+
+    def _record(self, kind: str, url: str, data: str, event: Optional[str] = None) -> None:
+        timestamp = self.clock() - self._started_at
+        self.frames.append(NetworkFrame(kind, url, data, timestamp, event))
+        if kind == "end" or data.strip() in DONE_MARKERS:
+            self.ended = True
+            self._end_event.set()
+            return
+        text = self.token_extractor(data)
+        if text:
+            self.tokens.append(Token(text, timestamp))
+
+
+def _dispatch(taps: List[NetworkTap], source: Any, payload: dict) -> None:
+    """把页面回传的数据分发给该 binding 上当前启动的采集器"""
+    for tap in list(taps):
+        tap._on_binding(source, payload)
@@ -0,0 +1,182 @@
+"""失败优先、按耗时排序的测试调度插件
+
+指定 ``--order=history`` 或 ``--shard`` 时，在本地历史文件中记录每个测试的耗时和最近一次结果，下次运行时：
+
+1. 上次失败的测试最先运行（其中耗时短的在前），构建失败时几秒内就能得到反馈
+2. 其余测试按耗时从长到短运行（最长处理时间优先，LPT）。pytest-xdist 按顺序把测试分发给
+   空闲的 worker，长测试先开始能让各 worker 同时结束，总耗时最短
+3. ``--shard K/N`` 按 LPT 把测试分配到 N 个分片，只运行第 K 个分片，用于多台 CI 机器
+
+没有历史记录的测试按已知耗时的中位数估计。按历史排序会打乱模块顺序，
+模块级和类级 fixture 可能被多次创建，因此默认保持文件顺序，也不写历史文件。
+
+Usage:
+    pytest                         # 默认保持文件顺序
+    pytest --order=history         # 按历史排序
+    pytest --shard 2/4             # 只运行 4 个分片中的第 2 个
+"""
+import heapq
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+
+# 默认历史文件
+DEFAULT_HISTORY_FILE = ".pytest_history.json"
+
+# 耗时的指数平滑系数：新耗时所占权重
+_SMOOTHING = 0.5
+
+
+def load_history(path: str) -> Dict[str, Dict[str, Any]]:
+    """读取历史文件，文件不存在或损坏时返回空记录"""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def order_tests(test_ids: Sequence[str], history: Dict[str, Dict[str, Any]]) -> List[str]:
+    """按 "上次失败优先、其余耗时长优先" 排序
+
+    Args:
+        test_ids: 测试 ID，保持原始顺序
+        history: 历史记录
+
+    Returns:
+        排序后的测试 ID
+    """
+    durations = estimate_durations(test_ids, history)
+    position = {test_id: i for i, test_id in enumerate(test_ids)}
+
+    def key(test_id: str) -> Tuple[int, float, int]:
+        if history.get(test_id, {}).get("failed"):
+            return (0, durations[test_id], position[test_id])
+        return (1, -durations[test_id], position[test_id])
+
+    return sorted(test_ids, key=key)
+
+
+def estimate_durations(test_ids: Sequence[str], history: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    """返回每个测试的预计耗时（秒），没有历史记录的测试使用中位数"""
+    known = [history[t]["duration"] for t in test_ids if t in history]
+    default = statistics.median(known) if known else 0.0
+    return {t: history[t]["duration"] if t in history else default for t in test_ids}
+
+
+def assign_shards(test_ids: Sequence[str], durations: Dict[str, float], shards: int) -> List[List[str]]:
+    """按最长处理时间优先（LPT）把测试分配到多个分片
+
+    每次把剩余测试中耗时最长的分给当前总耗时最少的分片。
+
+    Returns:
+        每个分片的测试 ID 列表，分片内保持输入顺序
+    """
+    heap = [(0.0, i) for i in range(shards)]
+    owner: Dict[str, int] = {}
+    for test_id in sorted(test_ids, key=lambda t: -durations[t]):
+        load, shard = heapq.heappop(heap)
+        owner[test_id] = shard
+        heapq.heappush(heap, (load + durations[test_id], shard))
+    result: List[List[str]] = [[] for _ in range(shards)]
+    for test_id in test_ids:
+        result[owner[test_id]].append(test_id)
+    return result
+
+
+def _parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not value:
+        return None
+    index, _, total = value.partition("/")
+    try:
+        index, total = int(index), int(total)
+    except ValueError:
+        raise pytest.UsageError(f"--shard 格式应为 K/N，实际: {value}")
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard 的 K 应在 1 到 N 之间，实际: {value}")
+    return index, total
+
+
+class OrderingPlugin:
+    """测试排序插件，由 conftest 在 ``pytest_configure`` 中注册"""
+
+    def __init__(self, config: Any):
+        self.config = config
+        self.path = config.getoption("--history-file")
+        self.history = load_history(self.path)
+        self.shard = _parse_shard(config.getoption("--shard"))
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session: Any, config: Any, items: List[Any]) -> None:
+        by_id = {item.nodeid: item for item in items}
+        test_ids = list(by_id)
+        if self.shard:
+            index, total = self.shard
+            durations = estimate_durations(test_ids, self.history)
+            selected = set(assign_shards(test_ids, durations, total)[index - 1])
+            deselected = [by_id[t] for t in test_ids if t not in selected]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+            test_ids = [t for t in test_ids if t in selected]
+        if config.getoption("--order") == "history":
+            test_ids = order_tests(test_ids, self.history)
+        items[:] = [by_id[t] for t in test_ids]
+
+    def pytest_runtest_logreport(self, report: Any) -> None:
+        result = self._results.setdefault(report.nodeid, {"duration": 0.0, "failed": False, "skipped": False})
+        result["duration"] += report.duration
+        if report.failed:
+            result["failed"] = True
+        if report.skipped:
+            result["skipped"] = True
+
+    @property
+    def uses_history(self) -> bool:
+        """本次运行是否按历史排序或分片，只有这时才更新历史文件"""
+        return self.config.getoption("--order") == "history" or self.shard is not None
+
+    def pytest_sessionfinish(self, session: Any) -> None:
+        # pytest-xdist 的 worker 不写文件，由主进程汇总
+        if hasattr(self.config, "workerinput") or not self._results or not self.uses_history:
+            return
+        history = load_history(self.path)
+        now = time.time()
+        for test_id, result in self._results.items():
+            if result["skipped"] and not result["failed"]:
+                continue
+            previous = history.get(test_id)
+            duration = result["duration"]
+            if previous:
+                duration = _SMOOTHING * duration + (1 - _SMOOTHING) * previous["duration"]
+            history[test_id] = {
+                "duration": round(duration, 4),
+                "failed": result["failed"],
+                "updated": round(now),
+            }
+        Path(self.path).write_text(json.dumps(history, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def addoption(parser: Any) -> None:
+    """注册排序相关的命令行选项"""
+    parser.addoption(
+        "--order",
+        choices=("history", "file"),
+        default="file",
+        help="测试运行顺序：file 为文件顺序（默认）；history 为上次失败优先、其余耗时长优先，会打乱模块顺序"
+    )
+    parser.addoption(
+        "--history-file",
+        default=DEFAULT_HISTORY_FILE,
+        help="测试耗时和结果的历史文件"
+    )
+    parser.addoption(
+        "--shard",
+        default=None,
+        metavar="K/N",
+        help="按耗时均衡分成 N 个分片，只运行第 K 个"
+    )
@@ -0,0 +1,358 @@
+"""页面注入脚本注册表
+
+常用的页面辅助函数（登录按钮查找、email 输入框查找、对话消息提取、回复完成探测等）只在每个页面安装一次：
+通过 ``add_init_script`` 注入到之后的每次导航，并对当前文档立即执行一次。
+之后按名称调用，参数作为 evaluate 的参数传入，而不是拼接进脚本文本，
+既减少了每次调用的传输和解析开销，也避免了字符串插值带来的注入问题。
+"""
+import json
+import weakref
+from typing import Any, Dict
+
+from src.dom_diff import DOM_DIFF_SCRIPT
+
+
+# 以名称调用已安装的辅助函数；辅助函数不存在时返回标记，由 Python 端重新安装
+_CALL_SCRIPT = """
+([ns, name, args]) => {
+    const lib = window[ns];
+    if (!lib || typeof lib[name] !== 'function') return {__bmcpMissing: true};
+    return lib[name](...args);
+}
+"""
+
+
+class ScriptRegistry:
+    """页面辅助函数注册表
+
+    Usage:
+        registry = ScriptRegistry()
+        registry.register("pageTitle", "() => document.title")
+        title = await registry.call(page, "pageTitle")
+
+    Args:
+        namespace: 辅助函数挂载的全局对象名称
+    """
+
+    def __init__(self, namespace: str = "__bmcp"):
+        self.namespace = namespace
+        self._sources: Dict[str, str] = {}
+        self._bundle: str = ""
+        self._installed: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def register(self, name: str, source: str) -> None:
+        """注册一个辅助函数
+
+        Args:
+            name: 函数名称
+            source: JavaScript 函数表达式，例如 ``(selector) => ...``
+        """
+        self._sources[name] = source.strip()
+        self._bundle = ""
+
+    @property
+    def names(self):
+        """已注册的函数名称"""
+        return list(self._sources)
+
+    def bundle(self) -> str:
+        """生成安装全部辅助函数的脚本"""
+        if not self._bundle:
+            ns = json.dumps(self.namespace)
+            parts = [f"(() => {{ const lib = window[{ns}] = window[{ns}] || {{}};"]
+            for name, source in self._sources.items():
+                parts.append(f"lib[{json.dumps(name)}] = {source};")
+            parts.append("})();")
+            self._bundle = "\n".join(parts)
+        return self._bundle
+
+    async def install(self, page: Any) -> None:
+        """在页面上安装辅助函数
+
+        init script 对之后的每次导航生效，当前文档则立即执行一次。
+
+        Args:
+            page: Playwright 页面
+        """
+        script = self.bundle()
+        await page.add_init_script(script=script)
+        await page.evaluate(script)
+        self._installed.add(page)
+
+    async def call(self, page: Any, name: str, *args: Any) -> Any:
+        """按名称调用辅助函数
+
+        页面尚未安装辅助函数时自动安装。
+
+        Args:
+            page: Playwright 页面
+            name: 函数名称
+            *args: 传给函数的参数，需可 JSON 序列化
+
+        Returns:
+            函数返回值
+        """
+        if name not in self._sources:
+            raise KeyError(f"未注册的页面脚本: {name}")
+        if page not in self._installed:
+            await self.install(page)
+        payload = [self.namespace, name, list(args)]
+        result = await page.evaluate(_CALL_SCRIPT, payload)
+        if isinstance(result, dict) and result.get("__bmcpMissing"):
+            # 当前文档早于 init script 创建（例如 about:blank 或 iframe 替换），补装一次
+            await page.evaluate(self.bundle())
+            result = await page.evaluate(_CALL_SCRIPT, payload)
+        return result
+
+
+# 查找 "Sign Up / Log In" 按钮（最内层包含该文本的元素），click 为 true 时滚动到按钮并点击
+FIND_LOGIN_BUTTON = """
+(click) => {
+    const matches = (text) => text === 'Sign Up / Log In' ||
+        (text.includes('Sign Up') && text.includes('Log In') && text.length < 30);
+    for (const el of document.querySelectorAll('*')) {
+        const text = (el.textContent || el.innerText || '').trim();
+        if (!matches(text) || el.tagName === 'HTML' || el.tagName === 'BODY') continue;
+        let isLeaf = true;
+        for (const child of el.children) {
+            const childText = (child.textContent || child.innerText || '').trim();
+            if (childText === text || (childText.includes('Sign Up') && childText.includes('Log In'))) {
+                isLeaf = false;
+                break;
+            }
+        }
+        if (!isLeaf) continue;
+        const info = {found: true, tagName: el.tagName, className: String(el.className)};
+        if (!click) return info;
+        el.scrollIntoView({behavior: 'smooth', block: 'center'});
+        return new Promise((resolve) => setTimeout(() => {
+            if (typeof el.click === 'function') {
+                el.click();
+            } else {
+                el.dispatchEvent(new MouseEvent('click', {bubbles: true, cancelable: true, view: window, button: 0}));
+            }
+            resolve(info);
+        }, 500));
+    }
+    return {found: false, message: 'Button not found'};
+}
+"""
+
+# 查找可见的 email 输入框
+FIND_EMAIL_INPUT = """
+() => {
+    for (const input of document.querySelectorAll('input')) {
+        const style = window.getComputedStyle(input);
+        if (style.display === 'none' || style.visibility === 'hidden') continue;
+        const placeholder = input.placeholder || '';
+        const type = input.type || '';
+        if (type === 'email' || placeholder.toLowerCase().includes('email')) {
+            return {found: true, type: type, placeholder: placeholder, id: input.id, className: input.className};
+        }
+    }
+    return {found: false};
+}
+"""
+
+# 查找 email 输入框右侧或附近的 "下一步" 按钮并点击
+CLICK_NEXT_BUTTON = """
+() => {
+    const emailInput = document.querySelector('input[type="email"], input[placeholder*="email" i], input');
+    if (!emailInput) return {found: false, message: 'Email input not found'};
+    const inputRect = emailInput.getBoundingClientRect();
+    const visible = (el) => {
+        const style = window.getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden';
+    };
+    const press = (el) => {
+        el.scrollIntoView({behavior: 'smooth', block: 'center'});
+        setTimeout(() => {
+            if (typeof el.click === 'function') {
+                el.click();
+            } else {
+                el.dispatchEvent(new MouseEvent('click', {bubbles: true, cancelable: true, view: window}));
+            }
+        }, 500);
+        return {found: true, tagName: el.tagName, className: String(el.className)};
+    };
+
+    // 优先查找输入框右侧的按钮
+    const nearby = emailInput.parentElement.querySelectorAll('button, [role="button"], svg, [class*="arrow" i]');
+    for (const btn of nearby) {
+        if (!visible(btn)) continue;
+        const rect = btn.getBoundingClientRect();
+        if (rect.left > inputRect.right - 50 && rect.top < inputRect.bottom && rect.bottom > inputRect.top) {
+            return press(btn);
+        }
+    }
+
+    // 其次查找输入框附近的任意可点击元素
+    const clickable = document.querySelectorAll('button, [role="button"], [onclick], [class*="cursor-pointer" i]');
+    for (const el of clickable) {
+        if (!visible(el)) continue;
+        const rect = el.getBoundingClientRect();
+        if (Math.abs(rect.left - inputRect.right) < 100 &&
+            rect.top < inputRect.bottom + 50 &&
+            rect.bottom > inputRect.top - 50) {
+            return press(el);
+        }
+    }
+    return {found: false, message: 'Next button not found'};
+}
+"""
+
+# 结构化提取对话消息：直接定位消息容器并按文档顺序返回 {role, text, timestamp}，
+# 不读取布局信息。页面内维护增量索引：MutationObserver 只把发生变化的容器标记为脏，
+# 重复提取时只重建脏容器，并且只返回序号大于 since 的记录。
+EXTRACT_MESSAGES = """
+(opts) => {
+    let idx = window.__bmcpConversation;
+    if (!idx || idx.doc !== document || idx.selector !== opts.containers) {
+        if (idx && idx.observer) idx.observer.disconnect();
+        idx = window.__bmcpConversation = {
+            doc: document,
+            selector: opts.containers,
+            records: new WeakMap(),
+            dirty: new Set(),
+            list: [],
+            listed: new Set(),
+            stale: true,
+            seq: 0,
+            epoch: 0
+        };
+        // 变化所属的已索引容器：索引只保留最外层容器，向上查找到列表中的祖先，
+        // 不能用 closest()（它返回最内层的容器，内层容器没有记录，标记它不会触发重建）
+        const containerOf = (node) => {
+            let el = node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+            for (; el; el = el.parentElement) if (idx.listed.has(el)) return el;
+            return null;
+        };
+        const hasContainer = (node) => node.nodeType === Node.ELEMENT_NODE &&
+            (node.matches(opts.containers) || node.querySelector(opts.containers) !== null);
+        idx.observer = new MutationObserver((records) => {
+            for (const r of records) {
+                const owner = containerOf(r.target);
+                if (owner) idx.dirty.add(owner);
+                if (r.type !== 'childList') continue;
+                // 新增或删除了消息容器时需要重新建立列表
+                for (const n of r.addedNodes) if (hasContainer(n)) idx.stale = true;
+                for (const n of r.removedNodes) if (hasContainer(n)) idx.stale = true;
+            }
+        });
+        idx.observer.observe(document.body || document.documentElement, {
+            childList: true, subtree: true, characterData: true
+        });
+    }
+
+    const SKIP = 'button, [role="button"], svg, time, script, style';
+    const TIME_RE = /\\b\\d{1,2}:\\d{2}(?:\\s*[AP]M)?\\b/i;
+    const roleOf = (el) => {
+        const attr = el.getAttribute('data-message-author-role') || el.getAttribute('data-role') ||
+            el.getAttribute('data-author');
+        if (attr) return attr.toLowerCase();
+        const cls = (typeof el.className === 'string' ? el.className : '') + ' ' + (el.getAttribute('aria-label') || '');
+        if (/user|human|question|self|outgoing/i.test(cls)) return 'user';
+        if (/assistant|agent|bot|\\bai\\b|answer|response|incoming/i.test(cls)) return 'assistant';
+        return 'unknown';
+    };
+    const build = (el) => {
+        const parts = [];
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            const parent = node.parentElement;
+            if (parent && parent !== el && parent.closest(SKIP) && el.contains(parent.closest(SKIP))) continue;
+            const value = node.nodeValue.trim();
+            if (value) parts.push(value);
+        }
+        const timeEl = el.querySelector('time');
+        let timestamp = timeEl ? (timeEl.getAttribute('datetime') || timeEl.textContent.trim()) : null;
+        if (!timestamp) {
+            const match = (el.textContent || '').match(TIME_RE);
+            timestamp = match ? match[0] : null;
+        }
+        return {role: roleOf(el), text: parts.join('\\n'), timestamp: timestamp, seq: ++idx.seq};
+    };
+
+    let reset = false;
+    if (idx.stale) {
+        // 只保留最外层的消息容器，嵌套的子容器属于同一条消息
+        const all = Array.from(document.querySelectorAll(opts.containers));
+        const set = new Set(all);
+        idx.list = all.filter((el) => {
+            for (let p = el.parentElement; p; p = p.parentElement) if (set.has(p)) return false;
+            return true;
+        });
+        idx.listed = new Set(idx.list);
+        idx.stale = false;
+        idx.epoch++;
+        reset = true;
+    }
+    for (const el of idx.list) {
+        if (!idx.records.has(el) || idx.dirty.has(el)) idx.records.set(el, build(el));
+    }
+    idx.dirty.clear();
+
+    const since = reset || opts.epoch !== idx.epoch ? 0 : opts.since;
+    const changed = [];
+    idx.list.forEach((el, i) => {
+        const rec = idx.records.get(el);
+        if (rec.seq > since) changed.push({index: i, role: rec.role, text: rec.text, timestamp: rec.timestamp, seq: rec.seq});
+    });
+    return {epoch: idx.epoch, count: idx.list.length, seq: idx.seq, changed: changed};
+}
+"""
+
+
+# 回复完成探测：返回最后一条消息文本的 FNV-1a 哈希（不传回文本本身），
+# 以及最后一条消息内部或其后是否出现复制/反馈等只在回复结束后显示的按钮
+COMPLETION_PROBE = """
+(opts) => {
+    const all = Array.from(document.querySelectorAll(opts.containers));
+    const last = all.length ? all[all.length - 1] : null;
+    const text = last ? (last.innerText || last.textContent || '') : '';
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193) >>> 0;
+    }
+    let buttons = false;
+    if (last && opts.buttons) {
+        for (const el of document.querySelectorAll(opts.buttons)) {
+            const inside = last.contains(el);
+            const after = last.compareDocumentPosition(el) & Node.DOCUMENT_POSITION_FOLLOWING;
+            if ((inside || after) && el.getClientRects().length > 0) {
+                buttons = true;
+                break;
+            }
+        }
+    }
+    return {hash: text ? hash.toString(16) : '', length: text.length, count: all.length, buttons: buttons};
+}
+"""
+
+# 浏览器性能指标（毫秒，相对导航开始）：首字节、DOMContentLoaded、load 和首次内容绘制
+PAGE_TIMINGS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) return null;
+    const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+    const value = (t) => t > 0 ? Math.round(t) : null;
+    return {
+        ttfb: value(nav.responseStart),
+        dom_content_loaded: value(nav.domContentLoadedEventEnd),
+        load: value(nav.loadEventEnd),
+        fcp: fcp ? Math.round(fcp.startTime) : null,
+        transfer_size: nav.transferSize || null
+    };
+}
+"""
+
+# 项目默认的页面脚本注册表
+page_scripts = ScriptRegistry()
+page_scripts.register("findLoginButton", FIND_LOGIN_BUTTON)
+page_scripts.register("findEmailInput", FIND_EMAIL_INPUT)
+page_scripts.register("clickNextButton", CLICK_NEXT_BUTTON)
+page_scripts.register("extractMessages", EXTRACT_MESSAGES)
+page_scripts.register("domDiff", DOM_DIFF_SCRIPT)
+page_scripts.register("completionProbe", COMPLETION_PROBE)
+page_scripts.register("pageTimings", PAGE_TIMINGS)
@@ -0,0 +1,198 @@
+"""从结构化事件生成测试报告
+
+读取 ``src/events.py`` 写出的 JSON Lines 事件，逐行汇总而不把全部事件载入内存，
+可以一次聚合成千上万次运行：
+
+    python -m src.report artifacts/events                       # 全部运行，Markdown
+    python -m src.report artifacts/events/<run_id> --format json
+    python -m src.report artifacts/events -o TEST_REPORT.md
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# 报告中列出的失败步骤数上限
+MAX_FAILURES = 50
+
+
+@dataclass
+class DurationStats:
+    """耗时统计"""
+
+    count: int = 0
+    failed: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, duration: float, failed: bool) -> None:
+        self.count += 1
+        self.failed += failed
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "failed": self.failed,
+            "mean": round(self.mean, 4),
+            "max": round(self.max, 4),
+        }
+
+
+@dataclass
+class ReportBuilder:
+    """逐个事件累积的报告
+
+    Usage:
+        builder = ReportBuilder()
+        for event in read_events(["artifacts/events"]):
+            builder.add(event)
+        print(render_markdown(builder.summary()))
+    """
+
+    runs: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    steps: Dict[str, DurationStats] = field(default_factory=dict)
+    tools: Dict[str, DurationStats] = field(default_factory=dict)
+    failures: List[Dict[str, Any]] = field(default_factory=list)
+    warnings: int = 0
+    events: int = 0
+
+    def add(self, event: Dict[str, Any]) -> None:
+        self.events += 1
+        run_tests = self.runs.setdefault(event.get("run_id") or "-", {})
+        if event.get("type") == "step":
+            failed = event.get("status") == "failed"
+            key = f"{event.get('test') or '-'} :: {event['step']}"
+            self.steps.setdefault(key, DurationStats()).add(event.get("duration", 0.0), failed)
+            test = event.get("test") or "-"
+            # 一个测试的任一步骤失败即视为失败
+            if failed:
+                run_tests[test] = "failed"
+            else:
+                run_tests.setdefault(test, "passed")
+            if event.get("status") == "warning":
+                self.warnings += 1
+            if failed and len(self.failures) < MAX_FAILURES:
+                self.failures.append({
+                    "run_id": event.get("run_id"),
+                    "test": test,
+                    "step": event["step"],
+                    "error": event.get("error"),
+                    "artifacts": event.get("artifacts", []),
+                })
+        elif event.get("type") == "test":
+            # pytest 报告的最终结果优先于从步骤推断的结果
+            run_tests[event["test"]] = event.get("status", "passed")
+        elif event.get("type") == "tool_call":
+            self.tools.setdefault(event["tool"], DurationStats()).add(
+                event.get("duration", 0.0), event.get("status") == "failed"
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总结果，可直接序列化为 JSON"""
+        outcomes = [status for tests in self.runs.values() for status in tests.values()]
+        failed_runs = sum(1 for tests in self.runs.values() if "failed" in tests.values())
+        return {
+            "events": self.events,
+            "runs": len(self.runs),
+            "failed_runs": failed_runs,
+            "tests": {
+                "total": len(outcomes),
+                "failed": outcomes.count("failed"),
+                "skipped": outcomes.count("skipped"),
+            },
+            "warnings": self.warnings,
+            "steps": {key: stats.to_dict() for key, stats in sorted(self.steps.items())},
+            "tools": {name: stats.to_dict() for name, stats in sorted(self.tools.items())},
+            "failures": self.failures,
+        }
+
+
+def read_events(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """逐行读取事件，目录会递归查找 ``*.jsonl``，无法解析的行（如写入中断）被跳过"""
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.rglob("*.jsonl")) if path.is_dir() else [path]
+        for file in files:
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+def build_report(paths: Iterable[str]) -> Dict[str, Any]:
+    """读取事件并返回汇总结果"""
+    builder = ReportBuilder()
+    for event in read_events(paths):
+        builder.add(event)
+    return builder.summary()
+
+
+def render_markdown(summary: Dict[str, Any]) -> str:
+    """把汇总结果渲染为 Markdown 报告"""
+    tests = summary["tests"]
+    lines = [
+        "# 测试报告",
+        "",
+        "## 📊 测试执行概览",
+        "",
+        f"- 运行次数: {summary['runs']}（失败 {summary['failed_runs']}）",
+        f"- 测试: {tests['total']}（失败 {tests['failed']}，跳过 {tests['skipped']}）",
+        f"- 警告步骤: {summary['warnings']}",
+        f"- 事件数: {summary['events']}",
+        "",
+        "## 📋 步骤",
+        "",
+        "| 测试 :: 步骤 | 次数 | 失败 | 平均耗时 (秒) | 最长耗时 (秒) |",
+        "| --- | ---: | ---: | ---: | ---: |",
+    ]
+    for key, stats in summary["steps"].items():
+        lines.append(f"| {key} | {stats['count']} | {stats['failed']} | {stats['mean']:.2f} | {stats['max']:.2f} |")
+    lines += [
+        "",
+        "## 🔧 工具调用",
+        "",
+        "| 工具 | 次数 | 失败 | 平均耗时 (秒) | 最长耗时 (秒) |",
+        "| --- | ---: | ---: | ---: | ---: |",
+    ]
+    for name, stats in summary["tools"].items():
+        lines.append(f"| {name} | {stats['count']} | {stats['failed']} | {stats['mean']:.3f} | {stats['max']:.3f} |")
+    if summary["failures"]:
+        lines += ["", "## ❌ 失败步骤", ""]
+        for failure in summary["failures"]:
+            lines.append(f"- `{failure['run_id']}` {failure['test']} :: {failure['step']}: {failure['error'] or ''}")
+            for artifact in failure["artifacts"]:
+                lines.append(f"  - 产物: {artifact.get('path') or artifact['sha256']}")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="从结构化事件生成测试报告")
+    parser.add_argument("paths", nargs="+", help="事件文件或目录")
+    parser.add_argument("--format", choices=("markdown", "json"), default="markdown")
+    parser.add_argument("-o", "--output", help="输出文件，默认输出到标准输出")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    summary = build_report(args.paths)
+    if args.format == "json":
+        text = json.dumps(summary, ensure_ascii=False, indent=2) + "\n"
+    else:
+        text = render_markdown(summary)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""调用弹性策略：重试退避与熔断器
+
+MCP 服务器不健康时，熔断器让后续调用立即失败，
+避免每个测试都挂起直到 pytest 超时终止整个运行。
+所有时间参数均以毫秒为单位，与客户端其余接口保持一致。
+"""
+import random
+import time
+from typing import Callable, Dict, Optional
+
+from src.errors import CircuitOpenError
+
+
+class RetryPolicy:
+    """带抖动的指数退避重试策略
+
+    Args:
+        attempts: 最大尝试次数（包含第一次调用）
+        base_delay: 第一次重试前的基础等待时间（毫秒）
+        max_delay: 单次等待时间上限（毫秒）
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: int = 100, max_delay: int = 2000):
+        if attempts < 1:
+            raise ValueError("attempts 必须大于等于 1")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """计算第 attempt 次失败后的等待时间
+
+        采用 full jitter：在 [0, min(max_delay, base_delay * 2^(attempt-1))] 中均匀取值，
+        避免多个并发调用在同一时刻重试。
+
+        Args:
+            attempt: 已失败的次数，从 1 开始
+
+        Returns:
+            等待时间（秒），可直接传给 asyncio.sleep
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap) / 1000
+
+
+class CircuitBreaker:
+    """熔断器
+
+    连续失败达到阈值后进入打开状态，期间所有调用立即抛出 CircuitOpenError；
+    经过 reset_timeout 后进入半开状态，放行一次试探调用，成功则关闭，失败则重新打开。
+
+    Args:
+        failure_threshold: 触发熔断的连续失败次数
+        reset_timeout: 打开状态持续时间（毫秒）
+        clock: 返回当前时间（秒）的函数，便于测试注入
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: int = 30000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """当前状态：closed、open 或 half_open"""
+        if self._opened_at is None:
+            return self.CLOSED
+        if (self._clock() - self._opened_at) * 1000 >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self, name: str = "") -> None:
+        """调用前检查，熔断打开时抛出 CircuitOpenError
+
+        Args:
+            name: 调用名称，用于错误信息
+        """
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+            raise CircuitOpenError(
+                f"熔断器已打开（连续失败 {self._failures} 次），拒绝调用 {name}"
+            )
+        if state == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """记录一次成功调用，关闭熔断器"""
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_ignored(self) -> None:
+        """记录一次与服务器健康无关的失败（例如找不到元素）
+
+        不改变失败计数和状态，只结束半开状态下的试探，下一次调用可以继续试探。
+        """
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """记录一次失败调用"""
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+
+# 按 MCP 服务器名称共享的熔断器，同一进程内的所有客户端实例共用
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(server_name: str) -> CircuitBreaker:
+    """获取指定 MCP 服务器共享的熔断器
+
+    Args:
+        server_name: MCP 服务器名称
+
+    Returns:
+        该服务器的熔断器实例
+    """
+    if server_name not in _breakers:
+        _breakers[server_name] = CircuitBreaker()
+    return _breakers[server_name]
@@ -0,0 +1,79 @@
+"""客户端操作结果
+
+``BrowserMCPClient`` 的操作失败时抛出异常（``LookupError``、``ToolTimeoutError`` 等），
+成功时返回不可变的结果对象，不再返回带 ``success`` 标志的字典：
+
+- 字段固定（``__slots__``），属性访问可以做类型检查，每个对象不带 ``__dict__``
+- 结果由工厂函数按字段值缓存，同一元素上的重复操作复用同一个对象，
+  负载运行和批量流程中不会为每次调用分配新的结果
+
+Usage:
+    result = await browser.click("button#login")
+    assert result.selector == "button#login"
+"""
+import functools
+from dataclasses import dataclass
+
+# 缓存的结果数量上限，超过后淘汰最久未使用的结果
+_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class NavigationResult:
+    """导航或等待导航完成后的页面
+
+    Attributes:
+        url: 当前页面 URL
+        title: 当前页面标题
+    """
+
+    __slots__ = ("url", "title")
+
+    url: str
+    title: str
+
+
+@dataclass(frozen=True)
+class ActionResult:
+    """点击或填写完成的元素
+
+    Attributes:
+        action: click 或 fill
+        selector: 实际操作的元素引用，按 role/name 定位时为从快照解析出的 ref
+    """
+
+    __slots__ = ("action", "selector")
+
+    action: str
+    selector: str
+
+
+@dataclass(frozen=True)
+class WaitResult:
+    """已经出现在页面中的元素
+
+    Attributes:
+        selector: 等待的选择器
+    """
+
+    __slots__ = ("selector",)
+
+    selector: str
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def navigation_result(url: str, title: str) -> NavigationResult:
+    """URL 和标题对应的共享结果"""
+    return NavigationResult(url, title)
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def action_result(action: str, selector: str) -> ActionResult:
+    """操作和元素对应的共享结果"""
+    return ActionResult(action, selector)
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def wait_result(selector: str) -> WaitResult:
+    """选择器对应的共享结果"""
+    return WaitResult(selector)
@@ -0,0 +1,193 @@
+"""单浏览器多流程并发调度器
+
+在同一个 Chromium 实例上同时驱动多个流程时，限制同时活跃的页面数量，
+超出部分按流程轮转排队，避免某个流程一次提交大量任务而饿死其他流程，
+并提供队列深度和等待时间指标。
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict
+
+
+@dataclass
+class SchedulerStats:
+    """调度器指标快照
+
+    Attributes:
+        active: 当前占用的槽位数
+        queued: 当前排队等待的任务数
+        max_queued: 历史最大排队数
+        completed: 已释放槽位的任务数
+        avg_wait: 平均等待时间（毫秒）
+        max_wait: 最长等待时间（毫秒）
+        p95_wait: 最近等待时间的 95 分位（毫秒）
+    """
+
+    active: int
+    queued: int
+    max_queued: int
+    completed: int
+    avg_wait: float
+    max_wait: float
+    p95_wait: float
+
+
+class FlowScheduler:
+    """公平的页面并发限制器
+
+    Usage:
+        scheduler = FlowScheduler(max_active=4)
+
+        async with scheduler.page(context, flow="login") as page:
+            await page.goto(BASE_URL)
+
+        async with scheduler.slot("share-link"):
+            async with BrowserMCPClient() as browser:
+                ...
+
+    Args:
+        max_active: 同时活跃的页面（任务）上限
+        wait_window: 用于计算分位数的最近等待样本数
+    """
+
+    def __init__(self, max_active: int = 4, wait_window: int = 1000):
+        if max_active < 1:
+            raise ValueError("max_active 必须大于等于 1")
+        self.max_active = max_active
+        self._active = 0
+        # 每个流程一个 FIFO 队列，流程之间按轮转顺序分配槽位
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._turns: Deque[str] = deque()
+        self._queued = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=wait_window)
+
+    async def acquire(self, flow: str = "default") -> None:
+        """获取一个槽位，没有空闲槽位时按公平顺序排队
+
+        Args:
+            flow: 流程名称，同一流程内部 FIFO，不同流程之间轮转
+        """
+        started = time.monotonic()
+        if self._active < self.max_active and not self._queued:
+            self._active += 1
+            self._record_wait(started)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        if flow not in self._queues:
+            self._queues[flow] = deque()
+            self._turns.append(flow)
+        self._queues[flow].append(future)
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 槽位已移交但调用方被取消，转交给下一个任务，不计为完成
+                self._hand_off()
+            else:
+                self._discard(flow, future)
+            raise
+        self._record_wait(started)
+
+    def release(self) -> None:
+        """释放槽位，直接移交给下一个排队的任务"""
+        self._completed += 1
+        self._hand_off()
+
+    def _hand_off(self) -> None:
+        """把当前槽位交给下一个排队的任务，没有排队任务时归还"""
+        while self._turns:
+            flow = self._turns.popleft()
+            queue = self._queues[flow]
+            future = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._turns.append(flow)
+            else:
+                del self._queues[flow]
+            if not future.done():
+                # 槽位直接移交，活跃数不变，避免新来的任务插队
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, flow: str = "default"):
+        """占用一个槽位的上下文管理器"""
+        await self.acquire(flow)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def page(self, context: Any, flow: str = "default"):
+        """在槽位内打开 Playwright 页面，退出时关闭页面并释放槽位
+
+        Args:
+            context: Playwright BrowserContext 或 Browser
+            flow: 流程名称
+        """
+        async with self.slot(flow):
+            page = await context.new_page()
+            try:
+                yield page
+            finally:
+                await page.close()
+
+    async def run(self, flow: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """在槽位内执行一个异步函数
+
+        Args:
+            flow: 流程名称
+            func: 异步函数
+            *args: 传给 func 的位置参数
+            **kwargs: 传给 func 的关键字参数
+
+        Returns:
+            func 的返回值
+        """
+        async with self.slot(flow):
+            return await func(*args, **kwargs)
+
+    def stats(self) -> SchedulerStats:
+        """返回当前指标"""
+        recent = sorted(self._recent_waits)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return SchedulerStats(
+            active=self._active,
+            queued=self._queued,
+            max_queued=self._max_queued,
+            completed=self._completed,
+            avg_wait=self._wait_total / self._wait_count if self._wait_count else 0.0,
+            max_wait=self._wait_max,
+            p95_wait=p95,
+        )
+
+    def _record_wait(self, started: float) -> None:
+        waited = (time.monotonic() - started) * 1000
+        self._wait_count += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._recent_waits.append(waited)
+
+    def _discard(self, flow: str, future: asyncio.Future) -> None:
+        """移除被取消的排队任务"""
+        queue = self._queues.get(flow)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self._queued -= 1
+        if not queue:
+            del self._queues[flow]
+            self._turns.remove(flow)
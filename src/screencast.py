@@ -0,0 +1,270 @@
+"""基于 CDP 屏幕录制的步骤记录
+
+每一步都保存整页 PNG 截图既慢（每次都要重新渲染整个页面并编码 PNG），又看不到步骤之间发生了什么。
+``ScreencastRecorder`` 使用 CDP ``Page.startScreencast`` 以低帧率接收浏览器已经编码好的 JPEG 帧，
+由后台线程写入一个帧归档，流程在每一步调用 ``mark()`` 写入步骤标记：
+
+    recording/
+        frames.zip      # 000001.jpg, 000002.jpg, ...（JPEG 已压缩，归档不再压缩）
+        index.jsonl     # 每行一个帧或步骤标记，按时间顺序
+
+index.jsonl 示例：
+    {"type": "frame", "seq": 1, "t": 0.012, "name": "000001.jpg"}
+    {"type": "step", "t": 3.105, "name": "step1_homepage", "frame": 1}
+
+CDP 只在 Chromium 上可用，其他浏览器上 ``start()`` 返回 False，调用方回退到截图。
+
+Usage:
+    recorder = ScreencastRecorder(cdp, "screenshots/recording", fps=2)
+    await recorder.start()
+    ...
+    recorder.mark("step1_homepage")
+    ...
+    await recorder.stop()
+
+    archive = ScreencastArchive("screenshots/recording")
+    frames = archive.frames_between("step5_email_entered", "step6_password_entered")
+"""
+import asyncio
+import base64
+import json
+import queue
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.cdp import CDPChannel
+
+
+# 帧归档和索引文件名
+FRAMES_FILE = "frames.zip"
+INDEX_FILE = "index.jsonl"
+
+# 队列中的结束标记
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class FrameEntry:
+    """归档中的一帧"""
+
+    seq: int
+    t: float
+    name: str
+
+
+@dataclass(frozen=True)
+class StepMarker:
+    """步骤标记
+
+    Attributes:
+        name: 步骤名称
+        t: 相对录制开始的时间（秒）
+        frame: 标记时最近一帧的序号，还没有帧时为 0
+    """
+
+    name: str
+    t: float
+    frame: int
+
+
+class ScreencastRecorder:
+    """CDP 屏幕录制器
+
+    Args:
+        cdp: 页面的 CDP 通道
+        output_dir: 输出目录
+        fps: 保存的最高帧率，超出的帧确认后直接丢弃
+        quality: JPEG 质量（0-100）
+        max_width: 帧的最大宽度（像素）
+        max_height: 帧的最大高度（像素）
+        clock: 时间函数，测试时可替换
+    """
+
+    def __init__(
+        self,
+        cdp: CDPChannel,
+        output_dir: str,
+        fps: float = 2.0,
+        quality: int = 60,
+        max_width: int = 1280,
+        max_height: int = 1280,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if fps <= 0:
+            raise ValueError(f"帧率必须大于 0，实际: {fps}")
+        self.cdp = cdp
+        self.output_dir = Path(output_dir)
+        self.interval = 1.0 / fps
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+        self.clock = clock
+        self.frames = 0
+        self.dropped = 0
+        self.steps: List[StepMarker] = []
+        self._started: Optional[float] = None
+        self._last_frame: Optional[float] = None
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._acks: Set["asyncio.Future[None]"] = set()
+
+    @property
+    def recording(self) -> bool:
+        return self._writer is not None
+
+    async def start(self) -> bool:
+        """开始录制
+
+        Returns:
+            是否成功开始；CDP 不可用时返回 False
+        """
+        if self.recording:
+            return True
+        session = self.cdp.session
+        if not hasattr(session, "on"):
+            return False
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._started = self.clock()
+        self._writer = threading.Thread(target=self._write_loop, name="screencast-writer", daemon=True)
+        self._writer.start()
+        session.on("Page.screencastFrame", self._on_frame)
+        try:
+            await self.cdp.send("Page.startScreencast", {
+                "format": "jpeg",
+                "quality": self.quality,
+                "maxWidth": self.max_width,
+                "maxHeight": self.max_height,
+            })
+        except Exception:
+            self._stop_writer()
+            return False
+        return True
+
+    def _on_frame(self, params: Dict[str, Any]) -> None:
+        # 浏览器在收到确认前不会发送下一帧，所以丢弃的帧也要确认
+        ack = asyncio.ensure_future(self._ack(params["sessionId"]))
+        self._acks.add(ack)
+        ack.add_done_callback(self._acks.discard)
+        now = self.clock()
+        if self._last_frame is not None and now - self._last_frame < self.interval:
+            self.dropped += 1
+            return
+        self._last_frame = now
+        self.frames += 1
+        self._queue.put(("frame", self.frames, now - self._started, params["data"]))
+
+    async def _ack(self, session_id: int) -> None:
+        try:
+            await self.cdp.send("Page.screencastFrameAck", {"sessionId": session_id})
+        except Exception:
+            # 页面关闭后确认失败不影响录制结果
+            pass
+
+    def mark(self, name: str) -> StepMarker:
+        """写入步骤标记"""
+        if self._started is None:
+            raise RuntimeError("录制尚未开始")
+        marker = StepMarker(name, self.clock() - self._started, self.frames)
+        self.steps.append(marker)
+        self._queue.put(("step", marker))
+        return marker
+
+    def _write_loop(self) -> None:
+        # 解码和写文件都在后台线程完成，不占用事件循环
+        try:
+            with zipfile.ZipFile(self.output_dir / FRAMES_FILE, "w", zipfile.ZIP_STORED) as archive, \
+                    open(self.output_dir / INDEX_FILE, "w", encoding="utf-8") as index:
+                while True:
+                    item = self._queue.get()
+                    if item is _STOP:
+                        break
+                    if item[0] == "frame":
+                        _, seq, t, data = item
+                        name = f"{seq:06d}.jpg"
+                        archive.writestr(name, base64.b64decode(data))
+                        entry = {"type": "frame", "seq": seq, "t": round(t, 3), "name": name}
+                    else:
+                        marker = item[1]
+                        entry = {"type": "step", "t": round(marker.t, 3), "name": marker.name, "frame": marker.frame}
+                    index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except BaseException as e:
+            self._error = e
+
+    def _stop_writer(self) -> None:
+        if self._writer is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._writer = None
+
+    async def stop(self) -> Path:
+        """停止录制并等待后台线程写完
+
+        Returns:
+            输出目录
+
+        Raises:
+            RuntimeError: 后台写入失败
+        """
+        if self.recording:
+            try:
+                await self.cdp.send("Page.stopScreencast")
+            except Exception:
+                # 页面已关闭时无法停止录制，已收到的帧仍然写入
+                pass
+            if self._acks:
+                await asyncio.gather(*self._acks)
+            if hasattr(self.cdp.session, "remove_listener"):
+                self.cdp.session.remove_listener("Page.screencastFrame", self._on_frame)
+            self._stop_writer()
+        if self._error is not None:
+            raise RuntimeError(f"屏幕录制写入失败: {self._error}") from self._error
+        return self.output_dir
+
+
+class ScreencastArchive:
+    """读取录制结果
+
+    Args:
+        path: 录制输出目录
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.frames: List[FrameEntry] = []
+        self.steps: List[StepMarker] = []
+        with open(self.path / INDEX_FILE, encoding="utf-8") as index:
+            for line in index:
+                entry = json.loads(line)
+                if entry["type"] == "frame":
+                    self.frames.append(FrameEntry(entry["seq"], entry["t"], entry["name"]))
+                else:
+                    self.steps.append(StepMarker(entry["name"], entry["t"], entry["frame"]))
+
+    def step(self, name: str) -> StepMarker:
+        for marker in self.steps:
+            if marker.name == name:
+                return marker
+        raise KeyError(f"没有步骤标记: {name}")
+
+    def read_frame(self, frame: FrameEntry) -> bytes:
+        """读取一帧的 JPEG 数据"""
+        with zipfile.ZipFile(self.path / FRAMES_FILE) as archive:
+            return archive.read(frame.name)
+
+    def frame_at(self, step: str) -> Optional[FrameEntry]:
+        """步骤标记时屏幕上显示的帧"""
+        marker = self.step(step)
+        candidates = [frame for frame in self.frames if frame.seq <= marker.frame]
+        return candidates[-1] if candidates else None
+
+    def frames_between(self, start: str, end: Optional[str] = None) -> List[FrameEntry]:
+        """两个步骤之间的全部帧，``end`` 为 None 时到录制结束"""
+        t0 = self.step(start).t
+        t1 = self.step(end).t if end else float("inf")
+        return [frame for frame in self.frames if t0 <= frame.t <= t1]
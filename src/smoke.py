@@ -0,0 +1,181 @@
+"""冒烟测试快速通道
+
+冒烟检查只需要确认首页能加载、关键元素存在，不需要每个检查都重新导航和准备 fixture。
+快速通道只加载一次页面并保存快照，所有冒烟检查针对同一份页面状态并行运行，
+整个过程（包括页面加载）受一个总时间预算约束，每个检查单独报告结果。
+
+Usage:
+    suite = SmokeSuite(budget=10)
+
+    @suite.check("页面标题存在")
+    def title_present(state):
+        assert state.title
+
+    run = await suite.run_url(client, BASE_URL)
+    for result in run.results.values():
+        print(result.name, result.passed, result.error)
+"""
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from src.accessibility import AccessibilitySnapshot
+
+
+@dataclass(frozen=True)
+class PageState:
+    """一次页面加载后的状态快照
+
+    Attributes:
+        url: 加载后的实际 URL
+        title: 页面标题
+        snapshot: 可访问性快照
+        load_time: 页面加载和快照耗时（秒）
+    """
+
+    url: str
+    title: Optional[str]
+    snapshot: AccessibilitySnapshot
+    load_time: float = 0.0
+
+
+@dataclass
+class SmokeResult:
+    """单个冒烟检查的结果"""
+
+    name: str
+    passed: bool
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class SmokeRun:
+    """一次冒烟运行的结果
+
+    Attributes:
+        state: 共享的页面状态，页面加载失败时为 None
+        results: 按检查名称索引的结果
+        elapsed: 总耗时（秒）
+    """
+
+    state: Optional[PageState]
+    results: Dict[str, SmokeResult] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results.values())
+
+
+async def capture_page_state(client: Any, url: str) -> PageState:
+    """导航到页面并保存状态快照
+
+    Args:
+        client: BrowserMCPClient 实例
+        url: 页面地址
+    """
+    start = time.monotonic()
+    await client.navigate(url)
+    current_url = await client.get_url()
+    title = await client.get_title()
+    snapshot = await client.snapshot()
+    return PageState(current_url, title, snapshot, time.monotonic() - start)
+
+
+class SmokeSuite:
+    """冒烟检查集合
+
+    Args:
+        budget: 总时间预算（秒），包括页面加载
+    """
+
+    def __init__(self, budget: float = 10.0):
+        self.budget = budget
+        self.checks: Dict[str, Callable[[PageState], Any]] = {}
+
+    def check(self, name: Optional[str] = None) -> Callable:
+        """注册冒烟检查的装饰器
+
+        检查函数接收 ``PageState``，可以是同步或异步函数，失败时抛出 AssertionError。
+        同步函数在线程池中运行，不阻塞事件循环，也不占用其他检查的时间预算。
+        """
+        def decorator(func: Callable[[PageState], Any]) -> Callable[[PageState], Any]:
+            key = name or func.__name__
+            if key in self.checks:
+                raise ValueError(f"冒烟检查名称重复: {key}")
+            self.checks[key] = func
+            return func
+        return decorator
+
+    @property
+    def names(self):
+        return list(self.checks)
+
+    async def _run_one(self, name: str, func: Callable, state: PageState) -> SmokeResult:
+        start = time.monotonic()
+        try:
+            if inspect.iscoroutinefunction(func):
+                await func(state)
+            else:
+                outcome = await asyncio.to_thread(func, state)
+                if inspect.isawaitable(outcome):
+                    await outcome
+        except Exception as e:
+            return SmokeResult(name, False, time.monotonic() - start, f"{type(e).__name__}: {e}")
+        return SmokeResult(name, True, time.monotonic() - start)
+
+    async def run(self, state: PageState, budget: Optional[float] = None) -> Dict[str, SmokeResult]:
+        """在同一份页面状态上并行运行全部检查
+
+        Args:
+            state: 共享的页面状态
+            budget: 时间预算（秒），默认使用 ``self.budget``
+
+        Returns:
+            按检查名称索引的结果；超出预算仍未完成的检查记为失败
+        """
+        budget = self.budget if budget is None else budget
+        tasks = {
+            name: asyncio.ensure_future(self._run_one(name, func, state))
+            for name, func in self.checks.items()
+        }
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=max(budget, 0))
+        results = {}
+        for name, task in tasks.items():
+            if task.done():
+                results[name] = task.result()
+            else:
+                task.cancel()
+                results[name] = SmokeResult(name, False, budget, f"超出冒烟时间预算（剩余 {max(budget, 0):.2f} 秒）")
+        return results
+
+    async def run_url(self, client: Any, url: str, budget: Optional[float] = None) -> SmokeRun:
+        """加载一次页面并运行全部检查，页面加载也计入时间预算
+
+        Args:
+            client: BrowserMCPClient 实例
+            url: 页面地址
+            budget: 总时间预算（秒），默认使用 ``self.budget``
+        """
+        budget = self.budget if budget is None else budget
+        start = time.monotonic()
+        try:
+            state = await asyncio.wait_for(capture_page_state(client, url), budget)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"页面加载超出冒烟时间预算 {budget} 秒"
+            else:
+                error = f"页面加载失败: {type(e).__name__}: {e}"
+            results = {name: SmokeResult(name, False, 0.0, error) for name in self.checks}
+            return SmokeRun(None, results, time.monotonic() - start)
+        remaining = budget - (time.monotonic() - start)
+        results = await self.run(state, budget=remaining)
+        return SmokeRun(state, results, time.monotonic() - start)
+
+
+# 项目默认的冒烟检查集合
+smoke_suite = SmokeSuite()
@@ -0,0 +1,269 @@
+"""长时间浸泡（soak）测试运行器
+
+循环执行一个流程数小时，每 N 次迭代或浏览器进程 RSS 超过阈值时回收浏览器上下文，
+并按迭代记录延迟和内存。内存分三类记录，使应用和测试框架的泄漏可以分开观察：
+
+- harness_rss：Python 进程以及 Playwright driver 的 RSS（测试框架）
+- browser_rss：浏览器进程树的 RSS
+- js_heap / dom_nodes：页面内 JS 堆和 DOM 节点数（被测应用）
+"""
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.artifacts import get_artifact_store
+
+
+# 页面内内存指标；performance.memory 仅 Chromium 提供
+_PAGE_MEMORY_SCRIPT = """
+() => ({
+    jsHeap: (performance.memory && performance.memory.usedJSHeapSize) || null,
+    domNodes: document.getElementsByTagName('*').length
+})
+"""
+
+_BROWSER_MARKERS = ("chrome", "chromium", "headless_shell", "firefox", "webkit")
+
+
+def _read_proc(pid: int, name: str) -> Optional[str]:
+    try:
+        with open(f"/proc/{pid}/{name}", "rb") as f:
+            return f.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """读取进程 RSS（字节），非 Linux 平台或进程不存在时返回 None"""
+    status = _read_proc(pid, "status")
+    if status is None:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+def child_processes(root: int) -> Dict[int, str]:
+    """返回 root 的所有后代进程及其命令行"""
+    parents: Dict[int, int] = {}
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        stat = _read_proc(int(entry), "stat")
+        if stat:
+            # comm 字段可能包含空格，父进程号位于最后一个右括号之后的第二个字段
+            parents[int(entry)] = int(stat.rsplit(")", 1)[1].split()[1])
+
+    descendants: Dict[int, str] = {}
+    frontier = [root]
+    while frontier:
+        current = frontier.pop()
+        for pid, ppid in parents.items():
+            if ppid == current and pid not in descendants:
+                cmdline = _read_proc(pid, "cmdline") or ""
+                descendants[pid] = cmdline.replace("\0", " ")
+                frontier.append(pid)
+    return descendants
+
+
+def sample_process_memory() -> Dict[str, Optional[int]]:
+    """采样测试框架和浏览器进程树的 RSS
+
+    Returns:
+        包含 harness_rss 和 browser_rss（字节）的字典，无法读取时值为 None
+    """
+    harness = process_rss(os.getpid())
+    browser = None
+    for pid, cmdline in child_processes(os.getpid()).items():
+        rss = process_rss(pid) or 0
+        if any(marker in cmdline.lower() for marker in _BROWSER_MARKERS):
+            browser = (browser or 0) + rss
+        elif harness is not None:
+            # Playwright driver 等非浏览器子进程计入测试框架
+            harness += rss
+    return {"harness_rss": harness, "browser_rss": browser}
+
+
+@dataclass
+class SoakSample:
+    """一次迭代的记录"""
+
+    iteration: int
+    generation: int
+    timestamp: float
+    latency_ms: float
+    ok: bool
+    error: Optional[str]
+    harness_rss: Optional[int]
+    browser_rss: Optional[int]
+    js_heap: Optional[int]
+    dom_nodes: Optional[int]
+    recycled: bool = False
+
+
+def _slope(values: List[float]) -> Optional[float]:
+    """最小二乘斜率（每次迭代的增量）"""
+    n = len(values)
+    if n < 2:
+        return None
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    denominator = sum((x - mean_x) ** 2 for x in range(n))
+    return sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values)) / denominator
+
+
+def summarize(samples: List[SoakSample]) -> Dict[str, Any]:
+    """汇总浸泡测试结果
+
+    JS 堆在每次回收上下文后重置，因此按上下文代次分别计算斜率后取平均；
+    测试框架和浏览器 RSS 在整个运行期间计算斜率，回收后仍持续增长即说明框架或浏览器泄漏。
+
+    Args:
+        samples: 迭代记录列表
+
+    Returns:
+        汇总字典
+    """
+    def series(name):
+        return [getattr(s, name) for s in samples if getattr(s, name) is not None]
+
+    generations: Dict[int, List[float]] = {}
+    for s in samples:
+        if s.js_heap is not None:
+            generations.setdefault(s.generation, []).append(s.js_heap)
+    heap_slopes = [v for v in (_slope(g) for g in generations.values()) if v is not None]
+    latencies = sorted(s.latency_ms for s in samples)
+
+    return {
+        "iterations": len(samples),
+        "failures": sum(1 for s in samples if not s.ok),
+        "recycles": sum(1 for s in samples if s.recycled),
+        "latency_p50_ms": latencies[len(latencies) // 2] if latencies else None,
+        "latency_max_ms": latencies[-1] if latencies else None,
+        "harness_rss_slope": _slope(series("harness_rss")),
+        "browser_rss_slope": _slope(series("browser_rss")),
+        "js_heap_slope": sum(heap_slopes) / len(heap_slopes) if heap_slopes else None,
+    }
+
+
+class SoakRunner:
+    """循环执行流程并定期回收浏览器上下文
+
+    Usage:
+        browser = await p.chromium.launch(headless=True)
+        runner = SoakRunner(browser, run_share_link_flow, duration=4 * 3600, recycle_every=20)
+        summary = await runner.run()
+
+    Args:
+        browser: Playwright Browser
+        flow: 接收页面的异步函数，每次迭代调用一次，抛出异常视为失败
+        iterations: 最大迭代次数，None 表示不限制
+        duration: 最长运行时间（秒），None 表示不限制
+        recycle_every: 每多少次迭代回收一次上下文
+        rss_limit_mb: 浏览器进程树 RSS 超过该值（MB）时立即回收上下文
+        output: 逐迭代记录的 JSON lines 文件路径，为 None 时写入当前产物运行目录下的 soak.jsonl
+        context_options: 创建上下文时传给 browser.new_context 的参数
+    """
+
+    def __init__(
+        self,
+        browser: Any,
+        flow: Callable[[Any], Awaitable[Any]],
+        iterations: Optional[int] = None,
+        duration: Optional[float] = None,
+        recycle_every: int = 50,
+        rss_limit_mb: Optional[float] = None,
+        output: Optional[str] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+    ):
+        if iterations is None and duration is None:
+            raise ValueError("必须指定 iterations 或 duration")
+        if recycle_every < 1:
+            raise ValueError("recycle_every 必须大于等于 1")
+        self.browser = browser
+        self.flow = flow
+        self.iterations = iterations
+        self.duration = duration
+        self.recycle_every = recycle_every
+        self.rss_limit = rss_limit_mb * 1024 * 1024 if rss_limit_mb else None
+        self.output = Path(output) if output else get_artifact_store().run_dir / "soak.jsonl"
+        self.context_options = context_options or {}
+        self.samples: List[SoakSample] = []
+        self._context = None
+        self._page = None
+        self._generation = 0
+
+    async def _open(self) -> None:
+        self._context = await self.browser.new_context(**self.context_options)
+        self._page = await self._context.new_page()
+        self._generation += 1
+
+    async def _recycle(self) -> None:
+        if self._context is not None:
+            await self._context.close()
+        await self._open()
+
+    async def _page_memory(self) -> Dict[str, Optional[int]]:
+        try:
+            return await self._page.evaluate(_PAGE_MEMORY_SCRIPT)
+        except Exception:
+            return {"jsHeap": None, "domNodes": None}
+
+    async def run(self) -> Dict[str, Any]:
+        """运行浸泡测试
+
+        Returns:
+            summarize() 生成的汇总字典
+        """
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + self.duration if self.duration else None
+        await self._open()
+        iteration = 0
+        try:
+            with open(self.output, "a", encoding="utf-8") as log:
+                while self.iterations is None or iteration < self.iterations:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        break
+                    iteration += 1
+
+                    started = time.monotonic()
+                    error = None
+                    try:
+                        await self.flow(self._page)
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}"
+                    latency = (time.monotonic() - started) * 1000
+
+                    page_memory = await self._page_memory()
+                    sample = SoakSample(
+                        iteration=iteration,
+                        generation=self._generation,
+                        timestamp=time.time(),
+                        latency_ms=round(latency, 1),
+                        ok=error is None,
+                        error=error,
+                        js_heap=page_memory.get("jsHeap"),
+                        dom_nodes=page_memory.get("domNodes"),
+                        **sample_process_memory(),
+                    )
+
+                    over_limit = (
+                        self.rss_limit is not None
+                        and sample.browser_rss is not None
+                        and sample.browser_rss > self.rss_limit
+                    )
+                    if over_limit or iteration % self.recycle_every == 0:
+                        sample.recycled = True
+                        await self._recycle()
+
+                    self.samples.append(sample)
+                    log.write(json.dumps(asdict(sample), ensure_ascii=False) + "\n")
+                    log.flush()
+        finally:
+            if self._context is not None:
+                await self._context.close()
+        return summarize(self.samples)
@@ -4,6 +4,7 @@
 """
 from typing import Any, Dict, Optional
 from src.mcp_client import BrowserMCPClient
+from src.results import ActionResult
 
 
 async def wait_for_element_text(
@@ -59,7 +60,7 @@ async def verify_page_title(browser: BrowserMCPClient, expected_title: str) -> b
 async def fill_form(
     browser: BrowserMCPClient,
     form_fields: Dict[str, str]
-) -> Dict[str, Any]:
+) -> Dict[str, ActionResult]:
     """填充表单字段
     
     Args:
@@ -67,7 +68,10 @@ async def fill_form(
         form_fields: 字段名和值的字典，键为选择器，值为要填入的文本
         
     Returns:
-        操作结果字典
+        选择器到填写结果的字典
+        
+    Raises:
+        LookupError: 页面中没有某个字段对应的输入框
     """
     results = {}
     for selector, value in form_fields.items():
@@ -0,0 +1,343 @@
+"""历史运行指标与趋势查询
+
+把每次运行的步骤耗时、浏览器性能指标和 share link 响应时间存入本地 SQLite 时间序列，
+用于观察首页加载、登录和智能体回复时间是否随部署逐渐变慢：
+
+- 指标来自结构化事件（``src/events.py``）：``step`` 事件的耗时和 ``metric`` 事件的数值
+- 每次运行对应一个部署版本（``DEPLOY_VERSION``），可以按部署版本比较
+- 查询按 (指标, 时间) 建立索引，滚动百分位只读取最近的样本
+
+Usage:
+    python -m src.trends ingest artifacts/events             # 导入事件（重复导入会去重）
+    python -m src.trends report --metric 'share_link.*'      # 滚动 p50/p90/p95 和回归标记
+    python -m src.trends deploys share_link.response_time    # 按部署版本比较
+    python -m src.trends check                               # 有回归时退出码为 1，用于 CI
+"""
+import argparse
+import fnmatch
+import sqlite3
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.report import read_events
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    deploy TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL,
+    UNIQUE (run_id, metric, ts)
+);
+CREATE INDEX IF NOT EXISTS samples_metric_ts ON samples (metric, ts);
+"""
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """线性插值百分位
+
+    Args:
+        values: 样本，不要求有序
+        q: 百分位（0-100）
+    """
+    if not values:
+        raise ValueError("没有样本")
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def step_metric(test: Optional[str], step: str) -> str:
+    """步骤事件对应的指标名，例如 ``test_share_link_full/submit``"""
+    name = (test or "-").split("::", 1)[-1]
+    return f"{name}/{step}"
+
+
+@dataclass(frozen=True)
+class TrendRow:
+    """一个指标的滚动统计
+
+    Attributes:
+        samples: 统计窗口内的样本数
+        recent: 最近样本的中位数
+        regression: 最近样本是否明显慢于之前的基线
+    """
+
+    metric: str
+    samples: int
+    p50: float
+    p90: float
+    p95: float
+    recent: float
+    baseline: Optional[float]
+    regression: bool
+
+
+class TrendStore:
+    """指标时间序列存储
+
+    Args:
+        path: SQLite 文件路径
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._db: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_config(cls) -> "TrendStore":
+        """使用 ``<ARTIFACT_DIR>/trends.sqlite``"""
+        from config import get_settings
+
+        return cls(str(Path(get_settings().artifact_dir) / "trends.sqlite"))
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def add_run(self, run_id: str, started: Optional[float] = None, deploy: Optional[str] = None) -> None:
+        """登记一次运行，已存在时只补充部署版本"""
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started, deploy) VALUES (?, ?, ?)",
+                (run_id, started if started is not None else time.time(), deploy),
+            )
+            if deploy:
+                self.db.execute(
+                    "UPDATE runs SET deploy = ? WHERE run_id = ? AND deploy IS NULL", (deploy, run_id)
+                )
+
+    def record(self, run_id: str, metric: str, value: float, ts: Optional[float] = None) -> None:
+        """记录一个样本"""
+        ts = ts if ts is not None else time.time()
+        self.add_run(run_id, ts)
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO samples (run_id, metric, ts, value) VALUES (?, ?, ?, ?)",
+                (run_id, metric, ts, value),
+            )
+
+    def ingest(self, events: Iterable[Dict[str, Any]]) -> int:
+        """导入结构化事件
+
+        ``step`` 事件按耗时记录，``metric`` 事件按数值记录，``run`` 事件提供部署版本。
+        同一事件重复导入时被忽略。
+
+        Returns:
+            新增的样本数
+        """
+        runs: Dict[str, Tuple[float, Optional[str]]] = {}
+        samples: List[Tuple[str, str, float, float]] = []
+        for event in events:
+            run_id = event.get("run_id")
+            if not run_id:
+                continue
+            ts = event.get("ts", 0.0)
+            started, deploy = runs.get(run_id, (ts, None))
+            runs[run_id] = (min(started, ts), deploy or event.get("deploy") or None)
+            if event.get("type") == "step" and event.get("status") != "failed":
+                # 失败步骤的耗时通常是超时，不代表正常的性能
+                samples.append((run_id, step_metric(event.get("test"), event["step"]), ts, event["duration"]))
+            elif event.get("type") == "metric":
+                samples.append((run_id, event["name"], ts, event["value"]))
+        for run_id, (started, deploy) in runs.items():
+            self.add_run(run_id, started, deploy)
+        before = self.db.total_changes
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO samples (run_id, metric, ts, value) VALUES (?, ?, ?, ?)", samples
+            )
+        return self.db.total_changes - before
+
+    def metrics(self, pattern: str = "*") -> List[str]:
+        """已记录的指标名，支持 ``*`` 通配符"""
+        names = [row[0] for row in self.db.execute("SELECT DISTINCT metric FROM samples ORDER BY metric")]
+        return [name for name in names if fnmatch.fnmatch(name, pattern)]
+
+    def series(self, metric: str, limit: int = 100, deploy: Optional[str] = None) -> List[Tuple[float, float]]:
+        """最近的样本 ``(时间戳, 数值)``，按时间从早到晚"""
+        sql = "SELECT s.ts, s.value FROM samples s"
+        params: List[Any] = []
+        if deploy is not None:
+            sql += " JOIN runs r ON s.run_id = r.run_id WHERE s.metric = ? AND r.deploy = ?"
+            params += [metric, deploy]
+        else:
+            sql += " WHERE s.metric = ?"
+            params.append(metric)
+        sql += " ORDER BY s.ts DESC LIMIT ?"
+        params.append(limit)
+        return list(reversed(self.db.execute(sql, params).fetchall()))
+
+    def trend(
+        self,
+        metric: str,
+        window: int = 50,
+        recent: int = 5,
+        tolerance: float = 0.2,
+        min_baseline: int = 5,
+    ) -> Optional[TrendRow]:
+        """指标的滚动百分位和回归判断
+
+        最近 ``recent`` 个样本的中位数同时超过基线（之前的样本）的 p90 和 p50 的 ``1 + tolerance`` 倍时
+        视为回归，避免单次抖动触发。
+
+        Args:
+            metric: 指标名
+            window: 统计窗口的样本数
+            recent: 视为 "最近" 的样本数
+            tolerance: 相对基线中位数允许的增幅
+            min_baseline: 判断回归所需的最少基线样本数
+        """
+        values = [value for _, value in self.series(metric, limit=window)]
+        if not values:
+            return None
+        latest = values[-recent:]
+        baseline = values[:-recent] if len(values) > recent else []
+        recent_median = statistics.median(latest)
+        regression = False
+        baseline_median = None
+        if len(baseline) >= min_baseline:
+            baseline_median = statistics.median(baseline)
+            regression = (
+                recent_median > percentile(baseline, 90)
+                and recent_median > baseline_median * (1 + tolerance)
+            )
+        return TrendRow(
+            metric,
+            len(values),
+            percentile(values, 50),
+            percentile(values, 90),
+            percentile(values, 95),
+            recent_median,
+            baseline_median,
+            regression,
+        )
+
+    def by_deploy(self, metric: str, limit: int = 10) -> List[Tuple[str, int, float, float]]:
+        """按部署版本统计 ``(部署版本, 样本数, p50, p90)``，最近的部署在前"""
+        rows = self.db.execute(
+            "SELECT r.deploy, s.value, r.started FROM samples s JOIN runs r ON s.run_id = r.run_id "
+            "WHERE s.metric = ? AND r.deploy IS NOT NULL ORDER BY r.started",
+            (metric,),
+        ).fetchall()
+        groups: Dict[str, List[float]] = {}
+        latest: Dict[str, float] = {}
+        for deploy, value, started in rows:
+            groups.setdefault(deploy, []).append(value)
+            latest[deploy] = started
+        ordered = sorted(groups, key=lambda d: latest[d], reverse=True)[:limit]
+        return [(d, len(groups[d]), percentile(groups[d], 50), percentile(groups[d], 90)) for d in ordered]
+
+
+def emit_metric(name: str, value: float, unit: str = "s", log: Any = None) -> None:
+    """记录一个指标事件，之后由 ``ingest`` 导入趋势数据库
+
+    Args:
+        name: 指标名，例如 ``share_link.response_time``
+        value: 数值
+        unit: 单位，s 或 ms
+        log: 事件日志，默认使用当前进程的日志
+    """
+    if log is None:
+        from src.events import get_event_log
+
+        log = get_event_log()
+    log.emit("metric", name=name, value=value, unit=unit)
+
+
+async def collect_page_timings(page: Any, prefix: str, registry: Any = None, log: Any = None) -> Dict[str, Any]:
+    """读取浏览器导航性能指标并记录为 ``<prefix>.ttfb`` 等指标（毫秒）
+
+    Args:
+        page: Playwright 页面
+        prefix: 指标名前缀，例如 ``page.homepage``
+        registry: 页面脚本注册表，默认使用 ``page_scripts``
+
+    Returns:
+        指标字典，页面没有导航记录时为空
+    """
+    if registry is None:
+        from src.page_scripts import page_scripts as registry
+    timings = await registry.call(page, "pageTimings") or {}
+    for key, value in timings.items():
+        if value is not None:
+            emit_metric(f"{prefix}.{key}", value, unit="bytes" if key == "transfer_size" else "ms", log=log)
+    return timings
+
+
+def _format(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="历史运行指标与趋势")
+    parser.add_argument("--db", default=None, help="SQLite 文件，默认使用 <ARTIFACT_DIR>/trends.sqlite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="导入结构化事件")
+    ingest.add_argument("paths", nargs="+", help="事件文件或目录")
+
+    for name, help_text in (("report", "输出滚动百分位和回归标记"), ("check", "有回归时以退出码 1 结束")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--metric", default="*", help="指标名，支持 * 通配符")
+        command.add_argument("--window", type=int, default=50, help="统计窗口的样本数")
+        command.add_argument("--recent", type=int, default=5, help="视为最近的样本数")
+        command.add_argument("--tolerance", type=float, default=0.2, help="相对基线中位数允许的增幅")
+
+    deploys = commands.add_parser("deploys", help="按部署版本比较一个指标")
+    deploys.add_argument("metric")
+    deploys.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    store = TrendStore(args.db) if args.db else TrendStore.from_config()
+
+    if args.command == "ingest":
+        print(f"新增样本: {store.ingest(read_events(args.paths))}")
+        return 0
+    if args.command == "deploys":
+        print("部署版本\t样本数\tp50\tp90")
+        for deploy, count, p50, p90 in store.by_deploy(args.metric, args.limit):
+            print(f"{deploy}\t{count}\t{p50:.2f}\t{p90:.2f}")
+        return 0
+
+    rows = [store.trend(m, args.window, args.recent, args.tolerance) for m in store.metrics(args.metric)]
+    rows = [row for row in rows if row is not None]
+    if args.command == "report":
+        print("指标\t样本数\tp50\tp90\tp95\t最近\t基线")
+        for row in rows:
+            flag = "\t⚠️ 回归" if row.regression else ""
+            print(
+                f"{row.metric}\t{row.samples}\t{row.p50:.2f}\t{row.p90:.2f}\t{row.p95:.2f}\t"
+                f"{row.recent:.2f}\t{_format(row.baseline)}{flag}"
+            )
+    regressions = [row for row in rows if row.regression]
+    if args.command == "check":
+        for row in regressions:
+            print(f"⚠️ {row.metric}: 最近 {row.recent:.2f}，基线中位数 {_format(row.baseline)}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
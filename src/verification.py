@@ -0,0 +1,272 @@
+"""响应内容关键词验证
+
+把一组验证规则（必须包含的关键词、不应包含的关键词、最小长度、预期文件）
+编译成单个组合正则表达式，一次扫描即可找出所有命中的关键词。
+匹配前统一做 NFKC 规范化、大小写折叠以及繁体到简体的字符映射，
+使 "檔案" 与 "档案"、全角与半角字符互相匹配。
+
+``StreamingVerifier`` 可以逐块接收流式输出：出现错误关键词时立即判定失败，
+没有错误关键词的规则在全部必须关键词出现后立即判定通过，不必等待完整回复。
+"""
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+# 常用繁体字到简体字的映射，覆盖测试问题和响应中常见的字符；
+# 不追求完整，规则关键词与响应使用同一映射即可互相匹配
+_TRADITIONAL = (
+    "檔錄誤錯無敗開關這個資夾當於與為們來時會說問題號應對見體發後點過還"
+    "電網頁碼檢驗內學國長東讀寫單條據庫務傳載變數紀記認設計請輸結構處儲執"
+    "連線響訊息類別統選擇標準確實顯示氣從區現將歡迎帳戶碼覽複製幫嗎麼麗"
+)
+_SIMPLIFIED = (
+    "档录误错无败开关这个资夹当于与为们来时会说问题号应对见体发后点过还"
+    "电网页码检验内学国长东读写单条据库务传载变数纪记认设计请输结构处储执"
+    "连线响讯息类别统选择标准确实显示气从区现将欢迎帐户码览复制帮吗么丽"
+)
+_TO_SIMPLIFIED = str.maketrans(_TRADITIONAL, _SIMPLIFIED)
+
+
+def normalize_text(text: str) -> str:
+    """规范化文本用于关键词匹配
+
+    依次执行 NFKC 规范化、大小写折叠和繁体到简体的字符映射。
+    """
+    return unicodedata.normalize("NFKC", text).casefold().translate(_TO_SIMPLIFIED)
+
+
+class KeywordMatcher:
+    """多关键词匹配器
+
+    所有关键词编译成一个按长度降序排列的组合正则，扫描一遍文本即可找出全部命中的关键词。
+    同一位置只能匹配最长的关键词，因此预先记录每个关键词包含的更短关键词，命中长关键词时一并计入。
+
+    Args:
+        keywords: 关键词列表
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._keys: Dict[str, List[str]] = {}
+        for keyword in keywords:
+            self._keys.setdefault(normalize_text(keyword), []).append(keyword)
+        ordered = sorted(self._keys, key=len, reverse=True)
+        self.max_length = len(ordered[0]) if ordered else 0
+        self._pattern = re.compile("|".join(re.escape(k) for k in ordered)) if ordered else None
+        self._contains = {k: [o for o in ordered if o in k] for k in ordered}
+
+    def find(self, text: str, normalized: bool = False) -> FrozenSet[str]:
+        """返回文本中出现的关键词（原始写法）
+
+        Args:
+            text: 待匹配文本
+            normalized: 文本是否已经规范化
+        """
+        if self._pattern is None:
+            return frozenset()
+        if not normalized:
+            text = normalize_text(text)
+        found = set()
+        pos = 0
+        while True:
+            match = self._pattern.search(text, pos)
+            if match is None:
+                break
+            for key in self._contains[match.group()]:
+                found.update(self._keys[key])
+            pos = match.start() + 1
+        return frozenset(found)
+
+
+@lru_cache(maxsize=128)
+def _matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+@dataclass(frozen=True)
+class VerificationRule:
+    """一组响应验证规则
+
+    Attributes:
+        required_keywords: 必须包含的关键词
+        exclude_keywords: 不应包含的错误关键词
+        min_length: 响应最小长度（字符数）
+        expected_file: 预期出现的文件名
+    """
+
+    required_keywords: Tuple[str, ...] = ()
+    exclude_keywords: Tuple[str, ...] = ()
+    min_length: int = 0
+    expected_file: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, rules: Dict[str, Any]) -> "VerificationRule":
+        """从 ``VERIFICATION_RULES`` 风格的字典构建规则"""
+        return cls(
+            required_keywords=tuple(rules.get("required_keywords", ())),
+            exclude_keywords=tuple(rules.get("exclude_keywords", ())),
+            min_length=rules.get("min_length", 0),
+            expected_file=rules.get("expected_file"),
+        )
+
+    @property
+    def required_matcher(self) -> KeywordMatcher:
+        """必须关键词与预期文件的组合匹配器"""
+        keys = self.required_keywords + ((self.expected_file,) if self.expected_file else ())
+        return _matcher(keys)
+
+    @property
+    def exclude_matcher(self) -> KeywordMatcher:
+        """错误关键词的组合匹配器"""
+        return _matcher(self.exclude_keywords)
+
+
+@dataclass
+class VerificationResult:
+    """验证结果
+
+    Attributes:
+        passed: 是否通过
+        checks: 通过的检查项
+        errors: 失败的检查项
+        decided_at: 判定结果时已接收的字符数，完整文本验证时为文本长度
+    """
+
+    passed: bool = False
+    checks: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    decided_at: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为与原有 ``verification_result`` 相同结构的字典"""
+        return {"passed": self.passed, "checks": list(self.checks), "errors": list(self.errors)}
+
+
+class StreamingVerifier:
+    """流式响应验证器
+
+    Usage:
+        verifier = StreamingVerifier(rule)
+        for chunk in chunks:
+            if verifier.feed(chunk) is not None:
+                break
+        result = verifier.finish()
+
+    只能拿到目前为止的完整回复（例如轮询页面中的回复消息）时使用 ``update``，只送入新增的后缀。
+
+    Args:
+        rule: 验证规则
+    """
+
+    def __init__(self, rule: VerificationRule):
+        self.rule = rule
+        self._required = rule.required_matcher
+        self._exclude = rule.exclude_matcher
+        # 保留上一块末尾的字符，使跨块边界的关键词也能匹配
+        self._overlap = max(self._required.max_length, self._exclude.max_length) - 1
+        self._reset()
+
+    def _reset(self) -> None:
+        self.length = 0
+        self.required_found: set = set()
+        self.exclude_found: set = set()
+        self.verdict: Optional[bool] = None
+        self._decided_at = 0
+        self._tail = ""
+        # update() 已接收的完整回复
+        self._text = ""
+
+    def feed(self, chunk: str) -> Optional[bool]:
+        """接收一块新文本
+
+        Args:
+            chunk: 新增的响应文本
+
+        Returns:
+            已能判定时返回 True（通过）或 False（失败），否则返回 None
+        """
+        self.length += len(chunk)
+        text = self._tail + normalize_text(chunk)
+        self.required_found |= self._required.find(text, normalized=True)
+        self.exclude_found |= self._exclude.find(text, normalized=True)
+        self._tail = text[-self._overlap:] if self._overlap > 0 else ""
+        if self.verdict is not None:
+            return self.verdict
+        if self.exclude_found:
+            self._decide(False)
+        elif not self.rule.exclude_keywords and self._satisfied():
+            # 没有错误关键词时，之后的文本不会再改变结果
+            self._decide(True)
+        return self.verdict
+
+    def update(self, text: str) -> Optional[bool]:
+        """接收到目前为止的完整回复，只把新增的后缀送入 ``feed``
+
+        回复被改写而不是在原文本后追加时（例如占位文本被替换为正文），丢弃已接收的内容重新验证。
+
+        Args:
+            text: 目前为止的完整回复
+
+        Returns:
+            同 ``feed``
+        """
+        if not text.startswith(self._text):
+            self._reset()
+        chunk = text[len(self._text):]
+        self._text = text
+        return self.feed(chunk) if chunk else self.verdict
+
+    def finish(self) -> VerificationResult:
+        """结束输入并生成完整的验证结果"""
+        if self.verdict is None:
+            self._decide(not self.exclude_found and self._satisfied())
+        return self._result()
+
+    def _satisfied(self) -> bool:
+        keys = self.rule.required_keywords + ((self.rule.expected_file,) if self.rule.expected_file else ())
+        return self.length >= self.rule.min_length and all(k in self.required_found for k in keys)
+
+    def _decide(self, passed: bool) -> None:
+        self.verdict = passed
+        self._decided_at = self.length
+
+    def _result(self) -> VerificationResult:
+        rule = self.rule
+        result = VerificationResult(passed=bool(self.verdict), decided_at=self._decided_at)
+        if self.length >= rule.min_length:
+            result.checks.append("✅ 响应长度符合要求")
+        else:
+            result.errors.append(f"响应长度不足: {self.length} < {rule.min_length}")
+        for keyword in rule.required_keywords:
+            if keyword in self.required_found:
+                result.checks.append(f"✅ 包含关键词: {keyword}")
+            else:
+                result.errors.append(f"缺少关键词: {keyword}")
+        for keyword in rule.exclude_keywords:
+            if keyword in self.exclude_found:
+                result.errors.append(f"包含错误关键词: {keyword}")
+        if not self.exclude_found:
+            result.checks.append("✅ 未包含错误关键词")
+        if rule.expected_file:
+            if rule.expected_file in self.required_found:
+                result.checks.append(f"✅ 包含预期文件: {rule.expected_file}")
+            else:
+                result.errors.append(f"未找到预期文件: {rule.expected_file}")
+        return result
+
+
+def verify_text(text: str, rule: VerificationRule) -> VerificationResult:
+    """验证完整的响应文本
+
+    Args:
+        text: 响应文本
+        rule: 验证规则
+
+    Returns:
+        验证结果
+    """
+    verifier = StreamingVerifier(rule)
+    verifier.feed(text)
+    return verifier.finish()
@@ -3,17 +3,10 @@
 直接使用 Browser MCP 工具测试 banner 链接，实际运行并展示结果。
 """
 import asyncio
-import sys
-import os
 
-# 添加项目根目录到路径
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config import TestConfig
 
-try:
-    from config import TestConfig
-    BASE_URL = TestConfig.PROTAGO_BASE_URL
-except ImportError:
-    BASE_URL = "https://xyz-beta.protago-dev.com"
+BASE_URL = TestConfig.PROTAGO_BASE_URL
 
 
 async def test_banner_links():
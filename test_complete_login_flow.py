@@ -14,18 +14,48 @@
 """
 import asyncio
 from playwright.async_api import async_playwright
-from pathlib import Path
 
-# 创建截图目录
-SCREENSHOT_DIR = Path("screenshots")
-SCREENSHOT_DIR.mkdir(exist_ok=True)
+from src.artifacts import get_artifact_store
+from src.cdp import CDPChannel
+from src.events import get_event_log
+from src.page_scripts import page_scripts
+from src.screencast import ScreencastRecorder
+from src.trends import collect_page_timings
+
+from config import TestConfig
+
+# 产物存储中的测试 ID
+TEST_ID = "test_complete_login_flow.py::test_complete_login_flow"
+
+
+async def capture_step(page, recorder, steps, artifacts, name):
+    """记录一个步骤并把引用加到当前步骤事件：录制中引用步骤标记，否则引用写入产物存储的整页截图"""
+    if recorder is not None:
+        steps.attach_recording(recorder.mark(name), recorder.output_dir)
+    else:
+        artifact = artifacts.put(name, await page.screenshot(full_page=True))
+        steps.attach(artifact, artifacts.path(artifact))
 
 
 async def test_complete_login_flow():
     """完整的登录流程测试"""
+    browser_profile = TestConfig.get_browser_profile()
+    store = get_artifact_store()
+    artifacts = store.for_test(TEST_ID)
+    steps = get_event_log().sequence(TEST_ID)
+    
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+        browser = await p.chromium.launch(**browser_profile["launch"])
+        page = await browser.new_page(**browser_profile["context"])
+        
+        # 可选：用 CDP 屏幕录制代替每一步的截图
+        recorder = None
+        if TestConfig.RECORD_SCREENCAST:
+            cdp = await CDPChannel.attach(page)
+            if cdp is not None:
+                recorder = ScreencastRecorder(cdp, str(store.root / "recordings" / store.run_id))
+                if not await recorder.start():
+                    recorder = None
         
         print("=" * 60)
         print("完整登录流程测试")
@@ -35,81 +65,28 @@ async def test_complete_login_flow():
         try:
             # 步骤 1: 连接到首页
             print("步骤 1: 连接到首页")
+            steps.start("homepage")
             await page.goto("https://xyz-beta.protago-dev.com/", wait_until="domcontentloaded")
             await page.wait_for_timeout(3000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step1_homepage.png", full_page=True)
+            await collect_page_timings(page, "page.homepage")
+            await capture_step(page, recorder, steps, artifacts, "step1_homepage")
             print(f"✅ 首页加载完成: {page.url}")
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step1_homepage.png'}")
             print()
             
             # 步骤 2: 点击 Sign Up/Log In 按钮
             print("步骤 2: 点击 Sign Up/Log In 按钮")
+            steps.start("open_login")
             # 使用 JavaScript 查找并点击按钮
-            click_result = await page.evaluate("""
-                () => {
-                    const allElements = document.querySelectorAll('*');
-                    let foundButton = null;
-                    
-                    for (let el of allElements) {
-                        const text = (el.textContent || el.innerText || '').trim();
-                        // 精确匹配 "Sign Up / Log In"
-                        if (text === 'Sign Up / Log In' || 
-                            (text.includes('Sign Up') && text.includes('Log In') && text.length < 30)) {
-                            // 找到最内层的元素
-                            let isLeaf = true;
-                            for (let child of el.children) {
-                                const childText = (child.textContent || child.innerText || '').trim();
-                                if (childText === text || (childText.includes('Sign Up') && childText.includes('Log In'))) {
-                                    isLeaf = false;
-                                    break;
-                                }
-                            }
-                            if (isLeaf && el.tagName !== 'HTML' && el.tagName !== 'BODY') {
-                                foundButton = el;
-                                break;
-                            }
-                        }
-                    }
-                    
-                    if (foundButton) {
-                        // 滚动到按钮位置
-                        foundButton.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                        return new Promise((resolve) => {
-                            setTimeout(() => {
-                                // 触发点击事件
-                                const clickEvent = new MouseEvent('click', {
-                                    bubbles: true,
-                                    cancelable: true,
-                                    view: window,
-                                    button: 0
-                                });
-                                foundButton.dispatchEvent(clickEvent);
-                                
-                                // 也尝试直接调用 click 方法
-                                if (typeof foundButton.click === 'function') {
-                                    foundButton.click();
-                                }
-                                
-                                resolve({
-                                    success: true,
-                                    tagName: foundButton.tagName,
-                                    className: foundButton.className
-                                });
-                            }, 500);
-                        });
-                    }
-                    return {success: false, message: 'Button not found'};
-                }
-            """)
+            click_result = await page_scripts.call(page, "findLoginButton", True)
             
             print(f"   点击结果: {click_result}")
             await page.wait_for_timeout(2000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step2_after_click_button.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step2_after_click_button.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step2_after_click_button")
             print()
             
             # 步骤 3: 等待弹窗出现
             print("步骤 3: 等待弹窗出现")
+            steps.start("modal")
             try:
                 # 等待弹窗出现
                 await page.wait_for_selector('[role="dialog"]', timeout=5000)
@@ -120,12 +97,12 @@ async def test_complete_login_flow():
                 await page.wait_for_timeout(2000)
             
             await page.wait_for_timeout(1000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step3_modal_appeared.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step3_modal_appeared.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step3_modal_appeared")
             print()
             
             # 步骤 4: 验证弹窗内可输入 email 的字段
             print("步骤 4: 验证弹窗内可输入 email 的字段")
+            steps.start("email_field")
             # 尝试多种选择器
             email_input = None
             selectors = [
@@ -152,28 +129,7 @@ async def test_complete_login_flow():
             if not email_input:
                 # 如果还是找不到，使用 JavaScript 查找
                 print("   尝试使用 JavaScript 查找 email 输入字段...")
-                email_info = await page.evaluate("""
-                    () => {
-                        const inputs = document.querySelectorAll('input');
-                        for (let input of inputs) {
-                            const style = window.getComputedStyle(input);
-                            if (style.display !== 'none' && style.visibility !== 'hidden') {
-                                const placeholder = input.placeholder || '';
-                                const type = input.type || '';
-                                if (type === 'email' || placeholder.toLowerCase().includes('email')) {
-                                    return {
-                                        found: true,
-                                        type: type,
-                                        placeholder: placeholder,
-                                        id: input.id,
-                                        className: input.className
-                                    };
-                                }
-                            }
-                        }
-                        return {found: false};
-                    }
-                """)
+                email_info = await page_scripts.call(page, "findEmailInput")
                 print(f"   JavaScript 查找结果: {email_info}")
                 
                 if email_info.get('found'):
@@ -187,12 +143,12 @@ async def test_complete_login_flow():
             is_editable = await email_input.is_editable()
             print(f"   Email 字段可编辑: {is_editable}")
             
-            await page.screenshot(path=SCREENSHOT_DIR / "step4_email_field_visible.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step4_email_field_visible.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step4_email_field_visible")
             print()
             
             # 步骤 5: 输入 email
             print("步骤 5: 输入 email: xyzdev01@cqigames.com")
+            steps.start("email")
             await email_input.fill("xyzdev01@cqigames.com")
             await page.wait_for_timeout(500)
             
@@ -203,64 +159,16 @@ async def test_complete_login_flow():
             else:
                 print(f"⚠️  Email 输入值不匹配: 期望 'xyzdev01@cqigames.com', 实际 '{input_value}'")
             
-            await page.screenshot(path=SCREENSHOT_DIR / "step5_email_entered.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step5_email_entered.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step5_email_entered")
             print()
             
             # 步骤 5.5: 点击下一步按钮（如果存在）
             print("步骤 5.5: 检查是否需要点击下一步按钮")
+            steps.start("next")
             await page.wait_for_timeout(1000)  # 先等待一下，让弹窗完全加载
             
             # 使用 JavaScript 查找并点击下一步按钮
-            next_button_result = await page.evaluate("""
-                () => {
-                    // 查找 email 输入框
-                    const emailInput = document.querySelector('input[type="email"], input[placeholder*="email" i], input');
-                    if (!emailInput) return {found: false, message: 'Email input not found'};
-                    
-                    // 查找 email 输入框右侧或附近的按钮
-                    const parent = emailInput.parentElement;
-                    const buttons = parent.querySelectorAll('button, [role="button"], svg, [class*="arrow" i]');
-                    
-                    for (let btn of buttons) {
-                        const style = window.getComputedStyle(btn);
-                        if (style.display !== 'none' && style.visibility !== 'hidden') {
-                            const rect = btn.getBoundingClientRect();
-                            const inputRect = emailInput.getBoundingClientRect();
-                            // 检查按钮是否在输入框右侧
-                            if (rect.left > inputRect.right - 50 && rect.top < inputRect.bottom && rect.bottom > inputRect.top) {
-                                btn.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                setTimeout(() => {
-                                    btn.click();
-                                }, 500);
-                                return {found: true, tagName: btn.tagName, className: btn.className};
-                            }
-                        }
-                    }
-                    
-                    // 如果没找到，尝试查找所有可点击的元素
-                    const allClickable = document.querySelectorAll('button, [role="button"], [onclick], [class*="cursor-pointer" i]');
-                    for (let el of allClickable) {
-                        const style = window.getComputedStyle(el);
-                        if (style.display !== 'none' && style.visibility !== 'hidden') {
-                            const rect = el.getBoundingClientRect();
-                            const inputRect = emailInput.getBoundingClientRect();
-                            // 检查是否在输入框附近
-                            if (Math.abs(rect.left - inputRect.right) < 100 && 
-                                rect.top < inputRect.bottom + 50 && 
-                                rect.bottom > inputRect.top - 50) {
-                                el.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                setTimeout(() => {
-                                    el.click();
-                                }, 500);
-                                return {found: true, tagName: el.tagName, className: el.className};
-                            }
-                        }
-                    }
-                    
-                    return {found: false, message: 'Next button not found'};
-                }
-            """)
+            next_button_result = await page_scripts.call(page, "clickNextButton")
             
             print(f"   下一步按钮查找结果: {next_button_result}")
             
@@ -272,12 +180,12 @@ async def test_complete_login_flow():
                 await email_input.press('Enter')
                 await page.wait_for_timeout(4000)
             
-            await page.screenshot(path=SCREENSHOT_DIR / "step5_5_after_next.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step5_5_after_next.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step5_5_after_next")
             print()
             
             # 步骤 6: 输入 password
             print("步骤 6: 输入 password: Abc123123?")
+            steps.start("password")
             # 尝试多种方法查找 password 字段
             password_input = None
             password_found = False
@@ -353,8 +261,8 @@ async def test_complete_login_flow():
                 
                 if not password_found:
                     # 如果找不到 password 字段，先截图看看当前状态
-                    await page.screenshot(path=SCREENSHOT_DIR / "step6_debug_no_password.png", full_page=True)
-                    print(f"   ⚠️  未找到 password 字段，调试截图已保存: {SCREENSHOT_DIR / 'step6_debug_no_password.png'}")
+                    await capture_step(page, recorder, steps, artifacts, "step6_debug_no_password")
+                    print("   ⚠️  未找到 password 字段，已保存调试截图")
                     print(f"   当前页面所有输入框: {password_info.get('allInputs', [])}")
                     raise Exception("无法找到 password 输入字段")
             
@@ -371,12 +279,12 @@ async def test_complete_login_flow():
             else:
                 print("⚠️  Password 输入可能失败")
             
-            await page.screenshot(path=SCREENSHOT_DIR / "step6_password_entered.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step6_password_entered.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step6_password_entered")
             print()
             
             # 步骤 7: 点击登录按钮
             print("步骤 7: 点击登录按钮")
+            steps.start("login")
             sign_in_button = None
             sign_in_found = False
             
@@ -451,19 +359,19 @@ async def test_complete_login_flow():
                         print("✅ 使用 JavaScript 找到登录按钮")
             
             if not sign_in_found or not sign_in_button:
-                await page.screenshot(path=SCREENSHOT_DIR / "step7_debug_no_signin_button.png", full_page=True)
+                await capture_step(page, recorder, steps, artifacts, "step7_debug_no_signin_button")
                 raise Exception("无法找到登录按钮")
             
             await sign_in_button.click()
             print("✅ 点击登录按钮成功")
             
             await page.wait_for_timeout(5000)  # 等待登录完成
-            await page.screenshot(path=SCREENSHOT_DIR / "step7_after_login_click.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step7_after_login_click.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step7_after_login_click")
             print()
             
             # 步骤 8: 验证已登录 xyz
             print("步骤 8: 验证已登录 xyz")
+            steps.start("verify_login")
             await page.wait_for_timeout(3000)
             
             # 检查页面内容是否包含登录后的元素
@@ -480,20 +388,20 @@ async def test_complete_login_flow():
             else:
                 print("⚠️  未明确检测到登录状态，继续执行...")
             
-            await page.screenshot(path=SCREENSHOT_DIR / "step8_login_verified.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step8_login_verified.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step8_login_verified")
             print()
             
             # 步骤 9: 导航到 Society 页面（登录后通常在这里）
             print("步骤 9: 导航到 Society 页面")
+            steps.start("society")
             await page.goto("https://xyz-beta.protago-dev.com/agentSociety/society", wait_until="domcontentloaded")
             await page.wait_for_timeout(3000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step9_society_page.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step9_society_page.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step9_society_page")
             print()
             
             # 步骤 10: 点击左下角的个人头像
             print("步骤 10: 点击左下角的个人头像")
+            steps.start("avatar")
             # 尝试多种方法查找头像
             avatar_found = False
             
@@ -565,12 +473,12 @@ async def test_complete_login_flow():
                     print(f"⚠️  方法2失败: {e}")
             
             await page.wait_for_timeout(2000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step10_avatar_clicked.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step10_avatar_clicked.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step10_avatar_clicked")
             print()
             
             # 步骤 11: 在弹出选单中选 Account
             print("步骤 11: 在弹出选单中选 Account")
+            steps.start("account_menu")
             try:
                 account_menu = page.locator('text=Account, text=账户, [role="menuitem"]:has-text("Account"), [role="menuitem"]:has-text("账户")').first
                 await account_menu.wait_for(state='visible', timeout=5000)
@@ -584,12 +492,12 @@ async def test_complete_login_flow():
                 print("✅ 直接导航到账户设置页面")
             
             await page.wait_for_timeout(3000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step11_account_menu_clicked.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step11_account_menu_clicked.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step11_account_menu_clicked")
             print()
             
             # 步骤 12: 验证被引导到账户设置页面
             print("步骤 12: 验证被引导到账户设置页面")
+            steps.start("account_page")
             current_url = page.url
             expected_url = "https://xyz-beta.protago-dev.com/agentSociety/setting/account"
             
@@ -603,8 +511,7 @@ async def test_complete_login_flow():
                 current_url = page.url
                 print(f"   已导航到: {current_url}")
             
-            await page.screenshot(path=SCREENSHOT_DIR / "step12_account_page.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step12_account_page.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step12_account_page")
             
             # 额外截图：Account 页面详细内容
             print("   正在捕获 Account 页面详细内容...")
@@ -612,20 +519,21 @@ async def test_complete_login_flow():
             # 滚动到页面顶部，确保能看到所有内容
             await page.evaluate("window.scrollTo(0, 0)")
             await page.wait_for_timeout(1000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step12_account_page_top.png", full_page=True)
+            await capture_step(page, recorder, steps, artifacts, "step12_account_page_top")
             # 滚动到页面中间
             await page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
             await page.wait_for_timeout(1000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step12_account_page_middle.png", full_page=True)
+            await capture_step(page, recorder, steps, artifacts, "step12_account_page_middle")
             # 滚动到页面底部
             await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
             await page.wait_for_timeout(1000)
-            await page.screenshot(path=SCREENSHOT_DIR / "step12_account_page_bottom.png", full_page=True)
+            await capture_step(page, recorder, steps, artifacts, "step12_account_page_bottom")
             print(f"   Account 页面详细截图已保存（top, middle, bottom）")
             print()
             
             # 步骤 13: 验证使用者名字和 email
             print("步骤 13: 验证使用者名字 xyzdev01 以及 email xyzdev01@cqigames.com")
+            steps.start("verify_account")
             await page.wait_for_timeout(2000)
             # 滚动回顶部以便查看用户信息
             await page.evaluate("window.scrollTo(0, 0)")
@@ -658,8 +566,7 @@ async def test_complete_login_flow():
             except:
                 pass
             
-            await page.screenshot(path=SCREENSHOT_DIR / "step13_account_info_verified.png", full_page=True)
-            print(f"   截图已保存: {SCREENSHOT_DIR / 'step13_account_info_verified.png'}")
+            await capture_step(page, recorder, steps, artifacts, "step13_account_info_verified")
             print()
             
             # 最终总结
@@ -669,22 +576,32 @@ async def test_complete_login_flow():
             print(f"最终 URL: {current_url}")
             print(f"用户名验证: {'✅' if username_found else '❌'}")
             print(f"Email 验证: {'✅' if email_found else '❌'}")
-            print(f"所有截图保存在: {SCREENSHOT_DIR.absolute()}")
+            print(f"所有截图保存在: {store.root.absolute()}（运行 ID: {store.run_id}）")
             print()
             
             if username_found and email_found:
                 print("🎉 所有验证通过！")
+                store.record_result(TEST_ID, "passed")
             else:
                 print("⚠️  部分验证失败，请检查截图")
+                store.record_result(TEST_ID, "failed")
             
         except Exception as e:
             print(f"❌ 测试过程中发生错误: {e}")
             import traceback
             traceback.print_exc()
-            await page.screenshot(path=SCREENSHOT_DIR / "error_screenshot.png", full_page=True)
+            steps.attach(artifacts.put("error_screenshot", await page.screenshot(full_page=True)))
+            steps.fail(e)
+            store.record_result(TEST_ID, "failed")
             raise
         finally:
+            steps.close()
+            if recorder is not None:
+                await recorder.stop()
+                print(f"步骤录制保存在: {recorder.output_dir.absolute()}")
             await browser.close()
+            store.finish()
+            get_event_log().close()
 
 
 if __name__ == "__main__":
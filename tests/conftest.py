@@ -1,15 +1,168 @@
 """pytest 配置和共享 fixtures"""
+import os
+from typing import Dict, Tuple
+
 import pytest
+import pytest_asyncio
+from config import TestConfig, reset_settings
+from src.artifacts import RUN_ID_ENV, get_artifact_store, new_run_id
+from src.credentials import CredentialPool
+from src.events import get_event_log
+from src.report import read_events
+from src.impact import get_impact_recorder
+from src import ordering
+from src.backends import BACKENDS, create_backend
 from src.mcp_client import BrowserMCPClient
+from src.smoke import smoke_suite
+from src.trends import TrendStore
+
+
+# 测试影响分析记录器，仅在指定 --record-impact 时记录
+_impact_recorder = get_impact_recorder()
+
+# 主进程收集的每个测试的结果：测试 ID -> (结果, 耗时)，运行结束时写入产物清单
+_test_outcomes: Dict[str, Tuple[str, float]] = {}
+
+
+def pytest_addoption(parser):
+    ordering.addoption(parser)
+    parser.addoption(
+        "--record-impact",
+        metavar="PATH",
+        default=None,
+        help="记录每个测试访问的 URL、选择器和文本，写入影响映射文件（见 src/impact.py）"
+    )
+    parser.addoption(
+        "--record-events",
+        action="store_true",
+        default=False,
+        help="把测试结果和流程步骤记录为事件，运行结束后导入趋势数据库（等同于 RECORD_EVENTS=1）"
+    )
+    parser.addoption(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=None,
+        help="browser fixture 使用的浏览器后端，默认为 BROWSER_BACKEND（见 src/backends/）"
+    )
+
+
+def backend_name(config) -> str:
+    """本次运行使用的浏览器后端名称"""
+    return config.getoption("--backend") or TestConfig.BROWSER_BACKEND
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(ordering.OrderingPlugin(config), "ordering")
+    # 主进程生成运行 ID，pytest-xdist worker 通过环境变量继承
+    if not hasattr(config, "workerinput"):
+        os.environ.setdefault(RUN_ID_ENV, new_run_id())
+        # 事件和趋势默认不写入，由 worker 通过环境变量继承
+        if config.getoption("--record-events"):
+            os.environ["RECORD_EVENTS"] = "1"
+            reset_settings()
+
+
+def pytest_runtest_logreport(report):
+    # 每个测试记录一个结果事件：执行阶段的结果，或准备阶段的失败/跳过
+    if report.when == "call" or (report.when == "setup" and not report.passed):
+        get_event_log().emit("test", test=report.nodeid, status=report.outcome, duration=round(report.duration, 4))
+    # 每个测试的结果：执行阶段的结果，准备或清理阶段失败时记为失败；
+    # pytest-xdist 的主进程也会收到 worker 的报告
+    outcome, duration = _test_outcomes.get(report.nodeid, ("passed", 0.0))
+    if report.when == "call" or not report.passed:
+        if outcome != "failed":
+            outcome = report.outcome
+    _test_outcomes[report.nodeid] = (outcome, duration + report.duration)
+
+
+def pytest_runtest_setup(item):
+    # 依赖本地 HTML 夹具的测试只在 fake 后端上运行
+    if item.get_closest_marker("fake_only") and backend_name(item.config) != "fake":
+        pytest.skip(f"只在 fake 后端上运行（当前: {backend_name(item.config)}）")
+    # mcp 后端通过快照定位元素，不支持 CSS 选择器
+    if item.get_closest_marker("css_selectors") and backend_name(item.config) == "mcp":
+        pytest.skip("使用 CSS 选择器，mcp 后端只支持 role/name、ref 和 text=")
+    if item.config.getoption("--record-impact"):
+        _impact_recorder.start_test(item.nodeid)
+
+
+def pytest_runtest_teardown(item):
+    _impact_recorder.stop_test()
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption("--record-impact")
+    if path and _impact_recorder.footprints:
+        _impact_recorder.save(path)
+    # 由主进程结束本次运行；没有测试写入产物时不创建清单
+    get_event_log().close()
+    if hasattr(session.config, "workerinput"):
+        return
+    # 有测试写入产物时，把所有测试（不只是使用 artifacts fixture 的测试）的结果写入清单，
+    # 运行状态据此判断
+    store = get_artifact_store()
+    if store.has_run():
+        for test, (outcome, duration) in _test_outcomes.items():
+            store.record_result(test, outcome, duration)
+        store.finish()
+    # 记录事件时，把本次运行的步骤耗时和指标导入趋势数据库
+    events_dir = store.root / "events" / store.run_id
+    if TestConfig.RECORD_EVENTS and events_dir.exists():
+        trends = TrendStore.from_config()
+        trends.ingest(read_events([str(events_dir)]))
+        trends.close()
 
 
 @pytest.fixture
-async def browser():
+async def browser(request):
     """提供浏览器客户端实例的 fixture"""
-    async with BrowserMCPClient() as client:
+    backend = create_backend(backend_name(request.config))
+    async with BrowserMCPClient(event_log=get_event_log(), backend=backend) as client:
+        if request.config.getoption("--record-impact"):
+            client.add_listener(_impact_recorder.on_tool_call)
         yield client
 
 
+@pytest.fixture
+def artifacts(request):
+    """按 运行 / 测试 / 步骤 保存截图等产物，测试结果在运行结束时统一记录"""
+    return get_artifact_store().for_test(request.node.nodeid)
+
+
+@pytest.fixture(scope="session")
+def credential_pool():
+    """测试账号池，所有 worker 通过锁文件共享"""
+    return CredentialPool.from_config()
+
+
+@pytest.fixture
+async def credential(credential_pool):
+    """在测试期间租用一个独立的测试账号"""
+    async with credential_pool.lease() as lease:
+        yield lease
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def smoke_run(pytestconfig):
+    """冒烟快速通道：整个会话只加载一次 BASE_URL，并在同一页面状态上并行运行全部冒烟检查"""
+    async with BrowserMCPClient(backend=create_backend(backend_name(pytestconfig))) as client:
+        return await smoke_suite.run_url(client, TestConfig.PROTAGO_BASE_URL, budget=TestConfig.SMOKE_BUDGET)
+
+
+@pytest.fixture
+def smoke_page(smoke_run):
+    """冒烟快速通道共享的页面状态"""
+    if smoke_run.state is None:
+        pytest.fail(next(iter(smoke_run.results.values())).error if smoke_run.results else "页面加载失败")
+    return smoke_run.state
+
+
+@pytest.fixture
+def protago_base_url():
+    """被测网站首页地址，在测试运行时读取配置，收集阶段不加载配置"""
+    return TestConfig.PROTAGO_BASE_URL
+
+
 @pytest.fixture
 def test_urls():
     """测试用的 URL 配置"""
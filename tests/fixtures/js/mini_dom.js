@@ -0,0 +1,93 @@
+// 在 Node.js 中运行页面脚本的最小 DOM：只实现 EXTRACT_MESSAGES 等脚本用到的接口，
+// 选择器只支持逗号分隔的标签名、.class、[attr] 和 [attr="value"]，MutationObserver 同步回调
+const Node = {ELEMENT_NODE: 1, TEXT_NODE: 3};
+const NodeFilter = {SHOW_TEXT: 4};
+const observers = [];
+const notify = (record) => {
+    for (const o of observers) o.callback([record]);
+};
+
+class MutationObserver {
+    constructor(callback) { this.callback = callback; }
+    observe() { observers.push(this); }
+    disconnect() { observers.splice(observers.indexOf(this), 1); }
+}
+
+class TextNode {
+    constructor(value) { this.nodeType = Node.TEXT_NODE; this.parentNode = null; this.value = value; }
+    get parentElement() { return this.parentNode; }
+    get nodeValue() { return this.value; }
+    set nodeValue(value) {
+        this.value = value;
+        notify({type: 'characterData', target: this, addedNodes: [], removedNodes: []});
+    }
+    get textContent() { return this.value; }
+}
+
+const matchesOne = (el, selector) => {
+    if (selector.startsWith('.')) return el.className.split(/\s+/).includes(selector.slice(1));
+    const attr = selector.match(/^\[([\w-]+)(?:="([^"]*)")?\]$/);
+    if (attr) {
+        const value = el.getAttribute(attr[1]);
+        return value !== null && (attr[2] === undefined || value === attr[2]);
+    }
+    return el.tagName.toLowerCase() === selector;
+};
+
+class Element {
+    constructor(tag, attrs, children) {
+        this.nodeType = Node.ELEMENT_NODE;
+        this.tagName = tag.toUpperCase();
+        this.attrs = attrs || {};
+        this.childNodes = [];
+        this.parentNode = null;
+        for (const child of children || []) this.appendChild(child, false);
+    }
+    get parentElement() { return this.parentNode; }
+    get className() { return this.attrs.class || ''; }
+    getAttribute(name) { return name in this.attrs ? this.attrs[name] : null; }
+    matches(selector) { return selector.split(',').some((s) => matchesOne(this, s.trim())); }
+    closest(selector) {
+        for (let el = this; el; el = el.parentNode) if (el.matches(selector)) return el;
+        return null;
+    }
+    contains(node) {
+        for (; node; node = node.parentNode) if (node === this) return true;
+        return false;
+    }
+    *descendants() {
+        for (const child of this.childNodes) {
+            yield child;
+            if (child.nodeType === Node.ELEMENT_NODE) yield* child.descendants();
+        }
+    }
+    querySelectorAll(selector) {
+        return Array.from(this.descendants()).filter((n) => n.nodeType === Node.ELEMENT_NODE && n.matches(selector));
+    }
+    querySelector(selector) { return this.querySelectorAll(selector)[0] || null; }
+    get textContent() {
+        return Array.from(this.descendants()).filter((n) => n.nodeType === Node.TEXT_NODE).map((n) => n.value).join('');
+    }
+    appendChild(child, observe = true) {
+        child.parentNode = this;
+        this.childNodes.push(child);
+        if (observe) notify({type: 'childList', target: this, addedNodes: [child], removedNodes: []});
+        return child;
+    }
+}
+
+const h = (tag, attrs, ...children) =>
+    new Element(tag, attrs, children.map((c) => typeof c === 'string' ? new TextNode(c) : c));
+
+const body = h('body', {});
+const document = {
+    body: body,
+    documentElement: body,
+    querySelectorAll: (selector) => body.querySelectorAll(selector),
+    querySelector: (selector) => body.querySelector(selector),
+    createTreeWalker: (root) => {
+        const nodes = Array.from(root.descendants()).filter((n) => n.nodeType === Node.TEXT_NODE);
+        return {nextNode: () => nodes.shift() || null};
+    },
+};
+const window = globalThis;
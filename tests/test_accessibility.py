@@ -0,0 +1,75 @@
+"""可访问性快照缓存测试用例
+
+验证快照解析、按角色/名称定位元素以及按 DOM 版本缓存快照。
+"""
+import pytest
+
+from src.accessibility import AccessibilitySnapshot
+
+
+MCP_SNAPSHOT = """
+- document [ref=e1]:
+  - banner [ref=e2]:
+    - link "Usher" [ref=e5]
+    - link "Contact" [ref=e8]
+  - heading "Example Domain" [level=1] [ref=e10]
+  - button "Sign Up / Log In" [ref=e12]
+"""
+
+
+class TestAccessibilitySnapshot:
+    """快照解析与查找测试"""
+
+    def test_parse_mcp_snapshot(self):
+        """测试：解析 MCP 快照文本"""
+        snapshot = AccessibilitySnapshot.parse(MCP_SNAPSHOT)
+
+        assert snapshot.find("link", "Usher").ref == "e5"
+        assert snapshot.find("heading", "Example Domain").ref == "e10"
+        assert snapshot.find("button", "sign up / log in").ref == "e12"
+
+    def test_find_partial_name(self):
+        """测试：名称包含匹配"""
+        snapshot = AccessibilitySnapshot.parse(MCP_SNAPSHOT)
+
+        assert snapshot.find("button", "Log In").ref == "e12"
+        assert snapshot.find("link", "Pricing") is None
+
+
+@pytest.mark.fake_only
+class TestClientSnapshotCache:
+    """客户端快照缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_cached_until_mutation(self, browser):
+        """测试：页面未变化时复用快照"""
+        await browser.navigate("https://example.com")
+
+        first = await browser.snapshot()
+        second = await browser.snapshot()
+        assert first is second
+
+        await browser.click("button#load-content")
+        third = await browser.snapshot()
+        assert third is not first
+        assert browser._snapshot_cache.stats() == {"hits": 1, "misses": 2}
+
+    @pytest.mark.asyncio
+    async def test_click_and_get_text_by_role(self, browser):
+        """测试：按角色和名称操作元素"""
+        await browser.navigate("https://example.com/login")
+        result = await browser.fill(text="user@example.com", role="textbox", name="email")
+        assert result.selector == "input#email"
+        await browser.fill("input#password", "secret")
+
+        await browser.click("button#login")
+        welcome = await browser.get_text(role="generic", name="Welcome")
+        assert "Welcome" in welcome
+
+    @pytest.mark.asyncio
+    async def test_unknown_role_raises(self, browser):
+        """测试：找不到元素时抛出异常"""
+        await browser.navigate("https://example.com")
+
+        with pytest.raises(LookupError):
+            await browser.click(role="button", name="does-not-exist")
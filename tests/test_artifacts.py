@@ -0,0 +1,84 @@
+"""产物存储测试用例"""
+import pytest
+
+from src.artifacts import ArtifactStore, main
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"), run_id="run-1")
+    yield store
+    store.close()
+
+
+class TestArtifactStore:
+    """ArtifactStore 测试"""
+
+    def test_lazy_creation(self, tmp_path):
+        """测试：没有写入产物时不创建目录"""
+        store = ArtifactStore(str(tmp_path / "artifacts"), run_id="run-1")
+        assert not store.manifest_path.exists()
+        assert store.run_dir == tmp_path / "artifacts" / "runs" / "run-1"
+        assert not (tmp_path / "artifacts").exists()
+
+    def test_content_addressed(self, store):
+        """测试：相同内容只存一份，清单中仍然各有一条记录"""
+        first = store.put("t::a", "step1", b"same")
+        second = store.put("t::b", "step1", b"same")
+        other = store.put("t::a", "step2", b"other")
+
+        assert first.sha256 == second.sha256
+        assert store.path(first) == store.path(second)
+        assert store.path(first).read_bytes() == b"same"
+        assert store.path(other) != store.path(first)
+        blobs = [p for p in (store.root / "blobs").rglob("*") if p.is_file()]
+        assert len(blobs) == 2
+        assert [a.step for a in store.artifacts(run_id="run-1", test="t::a")] == ["step1", "step2"]
+        assert first.size == 4
+
+    def test_put_json(self, store):
+        artifact = store.for_test("t::a").put_json("response", {"text": "回复"})
+        assert artifact.kind == "json" and artifact.ext == ".json"
+        assert "回复" in store.path(artifact).read_text(encoding="utf-8")
+
+    def test_find_step_in_last_failing_run(self, tmp_path):
+        """测试：按步骤查找最近一次失败运行的产物"""
+        root = str(tmp_path / "artifacts")
+        failed = ArtifactStore(root, run_id="run-1")
+        failed.put("t::a", "step3", b"failed-frame")
+        failed.record_result("t::a", "failed")
+        failed.finish()
+
+        passed = ArtifactStore(root, run_id="run-2")
+        passed.put("t::a", "step3", b"passed-frame")
+        passed.record_result("t::a", "passed")
+        passed.finish()
+
+        assert [r.status for r in passed.runs()] == ["passed", "failed"]
+        assert [r.run_id for r in passed.runs("failed", test="t::a")] == ["run-1"]
+        assert passed.path(passed.find_step("step3", status="failed")).read_bytes() == b"failed-frame"
+        assert passed.path(passed.find_step("step3", test="t::a")).read_bytes() == b"passed-frame"
+        assert passed.find_step("step9") is None
+
+    def test_run_id_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ARTIFACT_RUN_ID", "shared-run")
+        assert ArtifactStore(str(tmp_path)).run_id == "shared-run"
+
+    def test_cli_show(self, store, capsys):
+        artifact = store.put("t::a", "step3", b"data")
+        store.record_result("t::a", "failed")
+        store.finish()
+
+        assert main(["--root", str(store.root), "show", "step3", "--failed"]) == 0
+        assert capsys.readouterr().out.strip() == str(store.path(artifact))
+        assert main(["--root", str(store.root), "show", "step9"]) == 1
+
+    def test_has_run_does_not_create_manifest(self, tmp_path):
+        """测试：检查当前运行是否登记时不创建清单；其他进程登记的运行也能识别"""
+        root = str(tmp_path / "artifacts")
+        assert not ArtifactStore(root, run_id="run-1").has_run()
+        assert not (tmp_path / "artifacts").exists()
+
+        ArtifactStore(root, run_id="run-1").put("t::a", "step", b"x")
+        assert ArtifactStore(root, run_id="run-1").has_run()
+        assert not ArtifactStore(root, run_id="run-2").has_run()
@@ -0,0 +1,264 @@
+"""浏览器后端测试用例
+
+MCP 和 Playwright 后端使用记录调用的假会话和假页面，验证工具调用、结果解析和异常转换。
+"""
+import base64
+import json
+import shutil
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from config import load_settings
+from src.backends import BACKENDS, FakeBackend, MCPBackend, PlaywrightBackend, create_backend
+from src.backends.base import evaluation_expression
+from src.errors import BrowserMCPError, ToolTimeoutError
+from src.mcp_client import BrowserMCPClient
+from src.resilience import CircuitBreaker
+
+
+LOGIN_SNAPSHOT = """- Page URL: https://host/login
+- Page Title: Login
+- Page Snapshot
+```yaml
+- textbox "Email" [ref=e3]
+- button "Log In" [ref=e5]
+```"""
+
+DASHBOARD_SNAPSHOT = """- Page URL: https://host/dashboard
+- Page Title: Dashboard
+- Page Snapshot
+```yaml
+- generic "Welcome back" [ref=e2]
+```"""
+
+
+def text_result(text, error=False):
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], isError=error)
+
+
+class FakeMCPSession:
+    """记录工具调用的假 MCP 会话：登录页点击按钮后跳转到仪表盘"""
+
+    def __init__(self):
+        self.calls = []
+        self.page = LOGIN_SNAPSHOT
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        if name == "browser_click" and arguments["ref"] == "e5":
+            self.page = DASHBOARD_SNAPSHOT
+        if name == "browser_screenshot":
+            return SimpleNamespace(content=[SimpleNamespace(type="image", data=base64.b64encode(b"png").decode())])
+        if name == "browser_evaluate" and "ref" in arguments:
+            # 按 ref 读取元素文本，结果以 Markdown 分节返回
+            return text_result(f'### Result\n{json.dumps("Welcome back, user")}\n\n### Ran Playwright code\n...')
+        if name == "browser_evaluate":
+            return text_result('{"answer": 42}')
+        if name == "browser_type" and arguments["text"] == "boom":
+            return text_result("element is detached", error=True)
+        return text_result(self.page)
+
+
+class PlaywrightTimeout(Exception):
+    pass
+
+
+# Playwright 的超时异常类名为 TimeoutError
+PlaywrightTimeout.__name__ = "TimeoutError"
+
+
+class FakePlaywrightPage:
+    """记录调用的假 Playwright 页面"""
+
+    def __init__(self):
+        self.url = "about:blank"
+        self.calls = []
+
+    async def goto(self, url, wait_until):
+        self.calls.append(("goto", url, wait_until))
+        self.url = url
+
+    async def title(self):
+        return "Fixture"
+
+    async def click(self, selector, timeout):
+        self.calls.append(("click", selector, timeout))
+        if selector == "#missing":
+            raise PlaywrightTimeout("Timeout 100ms exceeded.\n=== logs ===")
+
+    async def fill(self, selector, value, timeout):
+        self.calls.append(("fill", selector, timeout))
+        if selector == "#missing":
+            raise PlaywrightTimeout(f"Timeout {timeout}ms exceeded.\n=== logs ===")
+
+    async def inner_text(self, selector, timeout):
+        self.calls.append(("inner_text", selector, timeout))
+        if selector == "#missing":
+            raise PlaywrightTimeout(f"Timeout {timeout}ms exceeded.\n=== logs ===")
+        return "hello"
+
+    async def wait_for_selector(self, selector, timeout, state):
+        raise PlaywrightTimeout(f"Timeout {timeout}ms exceeded.\n=== logs ===")
+
+    async def content(self):
+        return '<title>Fixture</title><button id="go">Go</button><p hidden>secret</p>'
+
+
+class TestCreateBackend:
+    """后端选择测试"""
+
+    def test_by_name_and_setting(self, monkeypatch):
+        """测试：按名称或 BROWSER_BACKEND 创建后端"""
+        assert isinstance(create_backend("mcp"), MCPBackend)
+        monkeypatch.setattr("config.get_settings", lambda: load_settings(env={"BROWSER_BACKEND": "playwright"}))
+        assert isinstance(create_backend(), PlaywrightBackend)
+        assert sorted(BACKENDS) == ["fake", "mcp", "playwright"]
+
+    def test_unknown_backend(self):
+        """测试：未知的后端名称在创建和读取配置时都会报错"""
+        with pytest.raises(ValueError):
+            create_backend("selenium")
+        with pytest.raises(ValueError):
+            load_settings(env={"BROWSER_BACKEND": "selenium"})
+
+
+class TestMCPBackend:
+    """MCP 后端测试"""
+
+    @pytest.mark.asyncio
+    async def test_flow_through_tools(self):
+        """测试：导航、按 text= 和 ref 操作元素，URL 和标题从工具结果中读取"""
+        session = FakeMCPSession()
+        backend = MCPBackend(session=session)
+        assert await backend.navigate("https://host/login") == ("https://host/login", "Login")
+        await backend.fill("ref=e3", "a@b.c", timeout=1000)
+        await backend.click("text=log in", timeout=1000)
+        assert await backend.url_and_title() == ("https://host/dashboard", "Dashboard")
+        # 元素文本在页面中读取，而不是快照中的可访问名称
+        assert await backend.text("text=Welcome", timeout=1000) == "Welcome back, user"
+
+        # 导航和交互的返回结果中已经包含快照，不再单独获取
+        assert [name for name, _ in session.calls] == [
+            "browser_navigate", "browser_type", "browser_click", "browser_evaluate",
+        ]
+        assert session.calls[1][1] == {"element": "Email", "ref": "e3", "text": "a@b.c", "submit": False}
+        assert session.calls[2][1] == {"element": "Log In", "ref": "e5"}
+        assert session.calls[3][1]["ref"] == "e2"
+
+    @pytest.mark.asyncio
+    async def test_unsupported_and_failures(self, tmp_path):
+        """测试：CSS 选择器、工具错误、等待超时、截图和脚本执行"""
+        backend = MCPBackend(session=FakeMCPSession(), poll_interval=0.001)
+        await backend.navigate("https://host/login")
+        with pytest.raises(ValueError):
+            await backend.click("button#login", timeout=1000)
+        with pytest.raises(BrowserMCPError):
+            await backend.fill("e3", "boom", timeout=1000)
+        with pytest.raises(LookupError):
+            await backend.text("e99", timeout=1000)
+        with pytest.raises(ToolTimeoutError):
+            await backend.wait_for("text=Never", timeout=20, visible=True)
+        with pytest.raises(NotImplementedError):
+            await backend.attribute("e3", "type", timeout=1000)
+        # 页面一直没有跳转
+        with pytest.raises(ToolTimeoutError):
+            await backend.wait_for_navigation(timeout=20)
+
+        path = tmp_path / "shot.png"
+        assert await backend.screenshot(str(path)) == b"png"
+        assert path.read_bytes() == b"png"
+        assert await backend.evaluate("{answer: 6 * 7}") == {"answer": 42}
+
+    @pytest.mark.asyncio
+    async def test_client_resolves_role_to_ref(self):
+        """测试：客户端按 role/name 定位时使用 MCP 快照中的 ref"""
+        session = FakeMCPSession()
+        async with BrowserMCPClient(backend=MCPBackend(session=session)) as client:
+            await client.navigate("https://host/login")
+            result = await client.click(role="button", name="Log In")
+            assert result.selector == "e5"
+            assert await client.get_title() == "Dashboard"
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="需要 Node.js 执行脚本")
+class TestEvaluationExpression:
+    """evaluate 脚本转换测试"""
+
+    @pytest.mark.parametrize("script, expected", [
+        ("6 * 7", 42),
+        ("() => 6 * 7", 42),
+        ("function () { return 42; }", 42),
+        ("async () => 42", 42),
+        ("({answer: 42});", {"answer": 42}),
+    ])
+    def test_expressions_and_functions(self, script, expected):
+        """测试：表达式直接求值，函数字符串被调用，与 Playwright page.evaluate 一致"""
+        source = f"Promise.resolve({evaluation_expression(script)}).then(v => console.log(JSON.stringify(v)))"
+        output = subprocess.run(["node", "-e", source], capture_output=True, text=True, check=True).stdout
+        assert json.loads(output) == expected
+
+
+class TestPlaywrightBackend:
+    """Playwright 后端测试"""
+
+    @pytest.mark.asyncio
+    async def test_existing_page(self):
+        """测试：使用已有页面时不启动浏览器，定位元素超时转换为 LookupError，等待超时转换为 ToolTimeoutError"""
+        page = FakePlaywrightPage()
+        async with BrowserMCPClient(backend=PlaywrightBackend(page=page)) as client:
+            # 假页面不支持 CDP，URL 和标题经由后端读取
+            assert client.cdp is None
+            result = await client.navigate("https://host/")
+            assert result.title == "Fixture"
+            await client.click("text=Go", wait_timeout=100)
+            with pytest.raises(LookupError, match="#missing（Timeout 100ms exceeded.）$"):
+                await client.click("#missing", wait_timeout=100)
+            with pytest.raises(ToolTimeoutError, match="Timeout 100ms exceeded.$"):
+                await client.wait_for_selector("#missing", timeout=100)
+            assert await client.get_text("p") == "hello"
+
+            snapshot = await client.snapshot()
+            assert snapshot.find("button", "Go").ref == "button#go"
+            assert snapshot.find("generic", "secret") is None
+
+        assert page.calls[0] == ("goto", "https://host/", "domcontentloaded")
+        assert ("click", "text=Go", 100) in page.calls
+        # 没有超时参数的操作在客户端截止时间之前结束定位
+        assert ("inner_text", "p", 9000) in page.calls
+
+    @pytest.mark.asyncio
+    async def test_missing_element_is_not_retried(self):
+        """测试：找不到元素的读取和填写抛出 LookupError，不重试也不计入熔断器"""
+        page = FakePlaywrightPage()
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = BrowserMCPClient(backend=PlaywrightBackend(page=page), default_timeout=2000, circuit_breaker=breaker)
+        async with client:
+            with pytest.raises(LookupError, match="#missing"):
+                await client.get_text("#missing")
+            with pytest.raises(LookupError, match="#missing"):
+                await client.fill("#missing", "text")
+            assert breaker.state == CircuitBreaker.CLOSED
+
+        assert page.calls == [("inner_text", "#missing", 1000), ("fill", "#missing", 1000)]
+
+
+class TestSameTestOnEveryBackend:
+    """同一段流程代码在不同后端上运行"""
+
+    async def login(self, client):
+        await client.navigate("https://example.com/login")
+        await client.fill(text="user@example.com", role="textbox", name="Email")
+        await client.click(role="button", name="Log In")
+        await client.wait_for_navigation(timeout=1000)
+        return await client.get_url()
+
+    @pytest.mark.asyncio
+    async def test_fake_and_mcp(self):
+        """测试：fake 后端加载夹具，mcp 后端调用工具，按 role/name 定位的流程代码相同"""
+        async with BrowserMCPClient(backend=FakeBackend()) as client:
+            assert (await self.login(client)).endswith("/dashboard")
+        session = FakeMCPSession()
+        async with BrowserMCPClient(backend=MCPBackend(session=session, poll_interval=0.001)) as client:
+            assert (await self.login(client)).endswith("/dashboard")
@@ -9,11 +9,6 @@
 每个链接点击后验证页面跳转，然后返回首页继续测试下一个链接。
 """
 import pytest
-import sys
-import os
-
-# 添加项目根目录到路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.mcp_client import BrowserMCPClient
 from src.test_utils import (
@@ -23,46 +18,38 @@ from src.test_utils import (
     take_screenshot_on_failure
 )
 
-try:
-    from config import TestConfig
-    BASE_URL = TestConfig.PROTAGO_BASE_URL
-except ImportError:
-    BASE_URL = "https://xyz-beta.protago-dev.com"
-
 
 class TestBannerLinks:
     """Banner 导航链接测试用例"""
     
     @pytest.mark.asyncio
     @pytest.mark.e2e
-    async def test_navigate_to_homepage(self, browser):
+    async def test_navigate_to_homepage(self, browser, protago_base_url):
         """测试：导航到首页
         
         验证能够成功访问 Protago 网站首页。
         """
-        result = await browser.navigate(BASE_URL)
-        assert result.get("success"), "导航到首页失败"
+        await browser.navigate(protago_base_url)
         
         url = await browser.get_url()
-        assert BASE_URL in url or url == BASE_URL, f"URL 不正确: {url}"
+        assert protago_base_url in url or url == protago_base_url, f"URL 不正确: {url}"
         
         title = await browser.get_title()
         assert "NetMind" in title or "XYZ" in title, f"页面标题不正确: {title}"
     
     @pytest.mark.asyncio
     @pytest.mark.e2e
-    async def test_click_usher_link(self, browser):
+    async def test_click_usher_link(self, browser, protago_base_url):
         """测试：点击 Usher 链接
         
         验证点击 Usher 链接后能正确跳转到对应页面。
         """
         # 先导航到首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 点击 Usher 链接
-        result = await browser.click("Usher link", selector="text=Usher")
-        assert result.get("success"), "点击 Usher 链接失败"
+        await browser.click("text=Usher")
         
         # 等待页面加载
         await browser.wait_for_navigation(timeout=5000)
@@ -72,23 +59,22 @@ class TestBannerLinks:
         assert "agentSociety" in url or "chat" in url, f"Usher 链接未正确跳转: {url}"
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
     
     @pytest.mark.asyncio
     @pytest.mark.e2e
-    async def test_click_society_link(self, browser):
+    async def test_click_society_link(self, browser, protago_base_url):
         """测试：点击 Society 链接
         
         验证点击 Society 链接后能正确跳转到对应页面。
         """
         # 先导航到首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 点击 Society 链接
-        result = await browser.click("Society link", selector="text=Society")
-        assert result.get("success"), "点击 Society 链接失败"
+        await browser.click("text=Society")
         
         # 等待页面加载
         await browser.wait_for_navigation(timeout=5000)
@@ -98,21 +84,20 @@ class TestBannerLinks:
         assert "society" in url or "agentSociety" in url, f"Society 链接未正确跳转: {url}"
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
     
     @pytest.mark.asyncio
     @pytest.mark.e2e
-    async def test_navigate_to_pricing_anchor(self, browser):
+    async def test_navigate_to_pricing_anchor(self, browser, protago_base_url):
         """测试：导航到 Pricing 锚点
         
         验证导航到 #pricing 锚点后，页面能正确滚动到 Pricing 区块。
         注意：Pricing 是锚点链接，不是独立页面。
         """
         # 导航到 Pricing 锚点
-        pricing_url = f"{BASE_URL}/#pricing"
-        result = await browser.navigate(pricing_url)
-        assert result.get("success"), "导航到 Pricing 锚点失败"
+        pricing_url = f"{protago_base_url}/#pricing"
+        await browser.navigate(pricing_url)
         
         # 等待页面滚动
         await browser.wait_for_navigation(timeout=3000)
@@ -131,23 +116,22 @@ class TestBannerLinks:
             pass  # 如果找不到，继续执行
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
     
     @pytest.mark.asyncio
     @pytest.mark.e2e
-    async def test_click_contact_link(self, browser):
+    async def test_click_contact_link(self, browser, protago_base_url):
         """测试：点击 Contact 链接
         
         验证点击 Contact 链接后能正确跳转到联系页面。
         """
         # 先导航到首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 点击 Contact 链接
-        result = await browser.click("Contact link", selector="text=Contact")
-        assert result.get("success"), "点击 Contact 链接失败"
+        await browser.click("text=Contact")
         
         # 等待页面加载
         await browser.wait_for_navigation(timeout=5000)
@@ -164,67 +148,63 @@ class TestBannerLinks:
             pass  # 如果找不到，继续执行
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
     
     @pytest.mark.asyncio
     @pytest.mark.e2e
     @pytest.mark.smoke
-    async def test_all_banner_links_sequence(self, browser):
+    async def test_all_banner_links_sequence(self, browser, protago_base_url):
         """测试：依次点击所有 Banner 链接
         
         按照顺序点击所有四个 banner 链接，每个链接点击后返回首页再点击下一个。
         这是端到端测试，验证完整的用户导航流程。
         """
         # 1. 导航到首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 2. 点击 Usher 链接
-        result = await browser.click("Usher link", selector="text=Usher")
-        assert result.get("success"), "点击 Usher 链接失败"
+        await browser.click("text=Usher")
         await browser.wait_for_navigation(timeout=5000)
         url = await browser.get_url()
         assert "agentSociety" in url or "chat" in url, f"Usher 链接未正确跳转: {url}"
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 3. 点击 Society 链接
-        result = await browser.click("Society link", selector="text=Society")
-        assert result.get("success"), "点击 Society 链接失败"
+        await browser.click("text=Society")
         await browser.wait_for_navigation(timeout=5000)
         url = await browser.get_url()
         assert "society" in url or "agentSociety" in url, f"Society 链接未正确跳转: {url}"
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 4. 导航到 Pricing 锚点（因为无法直接点击 div，使用导航方式）
-        pricing_url = f"{BASE_URL}/#pricing"
-        result = await browser.navigate(pricing_url)
-        assert result.get("success"), "导航到 Pricing 锚点失败"
+        pricing_url = f"{protago_base_url}/#pricing"
+        await browser.navigate(pricing_url)
         await browser.wait_for_navigation(timeout=3000)
         url = await browser.get_url()
         assert "#pricing" in url, f"URL 应包含 #pricing 锚点: {url}"
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 5. 点击 Contact 链接
-        result = await browser.click("Contact link", selector="text=Contact")
-        assert result.get("success"), "点击 Contact 链接失败"
+        await browser.click("text=Contact")
         await browser.wait_for_navigation(timeout=5000)
         url = await browser.get_url()
         assert "contact" in url, f"Contact 链接未正确跳转: {url}"
         
         # 返回首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         await browser.wait_for_navigation(timeout=3000)
         
         # 最终验证：回到首页
         final_url = await browser.get_url()
-        assert BASE_URL in final_url or final_url == BASE_URL, f"最终未回到首页: {final_url}"
+        assert protago_base_url in final_url or final_url == protago_base_url, f"最终未回到首页: {final_url}"
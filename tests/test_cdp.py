@@ -0,0 +1,124 @@
+"""CDP 直连通道测试用例"""
+import base64
+
+import pytest
+
+from src.backends import FakeBackend
+from src.cdp import CDPChannel
+from src.errors import CDPError
+from src.mcp_client import BrowserMCPClient
+
+
+class FakeSession:
+    """记录命令并返回预设结果的假 CDP 会话"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, method, params):
+        self.sent.append((method, params))
+        if method == "Runtime.evaluate":
+            if params["expression"] == "boom()":
+                return {"exceptionDetails": {"text": "Uncaught", "exception": {"description": "ReferenceError: boom"}}}
+            if params["expression"] == "[location.href, document.title]":
+                return {"result": {"value": ["https://host/a", "Title"]}}
+            return {"result": {"value": 42}}
+        if method == "Page.getLayoutMetrics":
+            return {"cssContentSize": {"width": 800, "height": 3000}}
+        if method == "Page.captureScreenshot":
+            return {"data": base64.b64encode(b"img").decode()}
+        return {}
+
+
+class FakeContext:
+    def __init__(self):
+        self.sessions = 0
+
+    async def new_cdp_session(self, page):
+        self.sessions += 1
+        return FakeSession()
+
+
+class FakePage:
+    def __init__(self):
+        self.context = FakeContext()
+
+
+class TestCDPChannel:
+    """CDPChannel 测试"""
+
+    @pytest.mark.asyncio
+    async def test_attach_reuses_session(self):
+        page = FakePage()
+        first = await CDPChannel.attach(page)
+        second = await CDPChannel.attach(page)
+        assert first is second
+        assert page.context.sessions == 1
+
+    @pytest.mark.asyncio
+    async def test_attach_unsupported(self):
+        """测试：不支持 CDP 的浏览器返回 None"""
+        class NoCDPContext:
+            async def new_cdp_session(self, page):
+                raise RuntimeError("CDP session is only available in Chromium")
+
+        page = FakePage()
+        page.context = NoCDPContext()
+        assert await CDPChannel.attach(page) is None
+
+    @pytest.mark.asyncio
+    async def test_evaluate_and_errors(self):
+        channel = CDPChannel(FakeSession())
+        assert await channel.evaluate("6 * 7") == 42
+        assert await channel.url_and_title() == ("https://host/a", "Title")
+        with pytest.raises(CDPError, match="ReferenceError"):
+            await channel.evaluate("boom()")
+
+    @pytest.mark.asyncio
+    async def test_full_page_screenshot(self, tmp_path):
+        """测试：整页截图使用布局尺寸作为 clip，并写入文件"""
+        session = FakeSession()
+        channel = CDPChannel(session)
+        path = tmp_path / "shots" / "a.jpg"
+
+        data = await channel.screenshot(str(path), format="jpeg", quality=60, full_page=True)
+
+        assert data == b"img" and path.read_bytes() == b"img"
+        method, params = session.sent[-1]
+        assert method == "Page.captureScreenshot"
+        assert params["quality"] == 60 and params["captureBeyondViewport"]
+        assert params["clip"] == {"scale": 1, "x": 0, "y": 0, "width": 800, "height": 3000}
+
+    @pytest.mark.asyncio
+    async def test_press_batch(self):
+        session = FakeSession()
+        channel = CDPChannel(session)
+        await channel.press("a", "Enter")
+
+        events = [(p["type"], p["key"]) for m, p in session.sent]
+        assert events == [("keyDown", "a"), ("keyUp", "a"), ("keyDown", "Enter"), ("keyUp", "Enter")]
+        assert session.sent[2][1]["text"] == "\r"
+        with pytest.raises(ValueError):
+            await channel.press("NoSuchKey")
+
+
+class TestClientCDP:
+    """BrowserMCPClient 的 CDP 通道测试"""
+
+    @pytest.mark.asyncio
+    async def test_hot_operations_use_cdp(self):
+        session = FakeSession()
+        async with BrowserMCPClient(cdp=CDPChannel(session), backend=FakeBackend()) as client:
+            assert await client.get_url_and_title() == ("https://host/a", "Title")
+            assert await client.get_title() == "Title"
+            assert await client.evaluate("6 * 7") == 42
+            assert await client.screenshot() == base64.b64encode(b"img").decode()
+        assert [m for m, _ in session.sent] == [
+            "Runtime.evaluate", "Runtime.evaluate", "Runtime.evaluate", "Page.captureScreenshot",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_without_cdp(self):
+        async with BrowserMCPClient(backend=FakeBackend()) as client:
+            await client.navigate("https://example.com/login")
+            assert await client.get_url_and_title() == ("https://example.com/login", "Login Page")
@@ -0,0 +1,113 @@
+"""流式回复完成检测测试用例
+
+使用可控时钟和预设探测结果验证信号组合逻辑。
+"""
+import pytest
+
+from src.completion import CompletionDetector
+
+
+class FakeRequest:
+    def __init__(self, resource_type="fetch", method="POST"):
+        self.resource_type = resource_type
+        self.method = method
+
+
+class FakePage:
+    """记录事件监听器的假页面"""
+
+    def __init__(self):
+        self.listeners = {}
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    def emit(self, event, request):
+        for handler in list(self.listeners.get(event, [])):
+            handler(request)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRegistry:
+    """按顺序返回预设探测结果，每次探测时钟前进 0.5 秒"""
+
+    def __init__(self, clock, probes):
+        self.clock = clock
+        self.probes = list(probes)
+
+    async def call(self, page, name, opts):
+        self.clock.now += 0.5
+        return self.probes.pop(0) if len(self.probes) > 1 else self.probes[0]
+
+
+def probe(hash_value, buttons=False):
+    return {"hash": hash_value, "length": len(hash_value), "count": 2, "buttons": buttons}
+
+
+class TestCompletionDetector:
+    """CompletionDetector 测试"""
+
+    def _detector(self, page, probes, **kwargs):
+        clock = FakeClock()
+        return CompletionDetector(page, interval=0, registry=FakeRegistry(clock, probes), clock=clock, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_network_and_buttons_complete_immediately(self):
+        """测试：请求结束且按钮出现时无需等待文本稳定"""
+        page = FakePage()
+        detector = self._detector(page, [probe("a"), probe("ab", buttons=True)])
+        detector.start()
+        request = FakeRequest()
+        page.emit("request", request)
+        page.emit("request", FakeRequest(resource_type="image", method="GET"))
+        page.emit("requestfinished", request)
+
+        result = await detector.wait(timeout=10000)
+
+        assert result.complete
+        assert result.signals == ["network", "buttons"]
+        assert result.elapsed == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_pending_request_needs_stable_text(self):
+        """测试：请求未结束时，按钮加上文本稳定才判定完成"""
+        page = FakePage()
+        detector = self._detector(page, [probe("a"), probe("ab", buttons=True)], stable_window=2000)
+        detector.start()
+        page.emit("request", FakeRequest())
+
+        result = await detector.wait(timeout=10000)
+
+        assert result.complete
+        assert result.signals == ["buttons", "stable"]
+        assert result.elapsed == pytest.approx(3.0)
+
+    @pytest.mark.asyncio
+    async def test_timeout_while_text_changes(self):
+        """测试：文本持续变化时超时"""
+        page = FakePage()
+        probes = [probe(str(i)) for i in range(20)]
+        detector = self._detector(page, probes)
+
+        result = await detector.wait(timeout=3000)
+
+        assert not result.complete
+        detector.stop()
+        assert all(not handlers for handlers in page.listeners.values())
+
+    def test_quiet_window_without_other_signals(self):
+        """测试：没有其他信号时文本长时间稳定也判定完成"""
+        detector = CompletionDetector(FakePage(), stable_window=1000, quiet_window=5000)
+        assert detector.update(probe("x"), 0.0) is None
+        assert detector.update(probe("x"), 2.0) is None
+        assert detector.update(probe("x"), 5.0) == ["stable"]
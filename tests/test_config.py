@@ -0,0 +1,67 @@
+"""测试配置加载测试用例"""
+import pytest
+
+import config
+from config import TestConfig, get_settings, load_settings, reset_settings
+
+
+class TestLoadSettings:
+    """load_settings 测试"""
+
+    def test_defaults_and_types(self):
+        settings = load_settings(env={})
+        assert settings.default_timeout == 10000
+        assert settings.browser_profile == "headless-fast"
+
+        settings = load_settings(env={"DEFAULT_TIMEOUT": "2500", "PROTAGO_BASE_URL": "https://host/"})
+        assert settings.default_timeout == 2500
+        assert settings.protago_base_url == "https://host"
+
+    @pytest.mark.parametrize("env", [
+        {"DEFAULT_TIMEOUT": "0"},
+        {"NAVIGATION_TIMEOUT": "soon"},
+        {"PROTAGO_BASE_URL": "xyz-beta.protago-dev.com"},
+        {"BROWSER_PROFILE": "headless-slow"},
+    ])
+    def test_invalid_values(self, env):
+        """测试：超时、URL 和启动配置在加载时校验"""
+        with pytest.raises(ValueError):
+            load_settings(env=env)
+
+    def test_worker_override(self):
+        """测试：worker 专属的变量只对该 worker 生效"""
+        env = {
+            "PROTAGO_TEST_EMAIL": "shared@example.com",
+            "PROTAGO_TEST_EMAIL__GW1": "gw1@example.com",
+        }
+        assert load_settings(env=env).test_email == "shared@example.com"
+        assert load_settings(env=env, worker="gw1").test_email == "gw1@example.com"
+        assert load_settings(env={**env, "PYTEST_XDIST_WORKER": "gw1"}).test_email == "gw1@example.com"
+        assert load_settings(env={**env, "PYTEST_XDIST_WORKER": "gw0"}).test_email == "shared@example.com"
+
+
+class TestLazySettings:
+    """缓存和兼容访问测试"""
+
+    def test_cached_and_legacy_access(self, monkeypatch):
+        monkeypatch.setattr(config, "load_settings", lambda: config.Settings(DEFAULT_TIMEOUT=1234))
+        reset_settings()
+        try:
+            assert get_settings() is get_settings()
+            assert TestConfig.DEFAULT_TIMEOUT == 1234
+            assert TestConfig.get_browser_profile()["keep_open"] == 0
+            with pytest.raises(AttributeError):
+                TestConfig.UNKNOWN
+        finally:
+            reset_settings()
+
+    def test_browser_profile_is_a_copy(self):
+        """测试：修改返回的启动配置不影响模块级的启动参数和其他调用方"""
+        profile = TestConfig.get_browser_profile("headless-fast")
+        profile["launch"]["args"].append("--remote-debugging-port=9222")
+        profile["context"]["viewport"]["width"] = 800
+
+        assert "--remote-debugging-port=9222" not in config.LEAN_BROWSER_ARGS
+        fresh = TestConfig.get_browser_profile("headless-shell")
+        assert fresh["launch"]["args"] == config.LEAN_BROWSER_ARGS
+        assert TestConfig.get_browser_profile("headless-fast")["context"]["viewport"]["width"] == 1280
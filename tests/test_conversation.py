@@ -0,0 +1,67 @@
+"""结构化对话提取测试用例
+
+使用返回预设增量记录的假注册表验证 Python 端的合并逻辑。
+"""
+import pytest
+
+from src.conversation import ConversationExtractor
+
+
+class FakeRegistry:
+    """按顺序返回预设载荷并记录调用参数"""
+
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.calls = []
+
+    async def call(self, page, name, opts):
+        self.calls.append(dict(opts))
+        return self.payloads.pop(0)
+
+
+def record(index, role, text, seq, timestamp=None):
+    return {"index": index, "role": role, "text": text, "timestamp": timestamp, "seq": seq}
+
+
+class TestConversationExtractor:
+    """ConversationExtractor 测试"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_merge(self):
+        """测试：只合并变化的消息"""
+        registry = FakeRegistry([
+            {"epoch": 1, "count": 1, "seq": 1, "changed": [record(0, "assistant", "I am Claudia", 1)]},
+            {"epoch": 1, "count": 3, "seq": 3, "changed": [
+                record(1, "user", "列出knowledge-base目錄下的檔案", 2, "10:01 AM"),
+                record(2, "assistant", "Working on it", 3),
+            ]},
+            {"epoch": 1, "count": 3, "seq": 4, "changed": [record(2, "assistant", "hello.md", 4)]},
+        ])
+        conversation = ConversationExtractor(page=None, registry=registry)
+
+        await conversation.extract()
+        await conversation.extract()
+        messages = await conversation.extract()
+
+        assert [m.role for m in messages] == ["assistant", "user", "assistant"]
+        assert messages[1].timestamp == "10:01 AM"
+        assert conversation.reply_to("knowledge-base") == "hello.md"
+        assert [c["since"] for c in registry.calls] == [0, 1, 3]
+
+    @pytest.mark.asyncio
+    async def test_epoch_change_resets(self):
+        """测试：容器结构变化后以全量记录替换"""
+        registry = FakeRegistry([
+            {"epoch": 1, "count": 2, "seq": 2, "changed": [
+                record(0, "user", "q", 1), record(1, "assistant", "a", 2),
+            ]},
+            {"epoch": 2, "count": 1, "seq": 3, "changed": [record(0, "assistant", "fresh", 3)]},
+        ])
+        conversation = ConversationExtractor(page=None, registry=registry)
+
+        await conversation.extract()
+        messages = await conversation.extract()
+
+        assert len(messages) == 1
+        assert conversation.last().text == "fresh"
+        assert conversation.reply_to("missing") is None
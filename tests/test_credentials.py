@@ -0,0 +1,117 @@
+"""测试账号池测试用例"""
+import multiprocessing
+
+import pytest
+
+import config
+from src.credentials import Credential, CredentialPool, parse_credentials
+
+
+def _pool(tmp_path, count=2):
+    credentials = [Credential(f"user{i}@example.com", f"pw{i}") for i in range(count)]
+    return CredentialPool(
+        credentials,
+        lock_dir=str(tmp_path / "locks"),
+        state_dir=str(tmp_path / "state"),
+        poll_interval=0.01,
+    )
+
+
+def _hold_lease(pool, ready, done):
+    lease = pool.acquire(timeout=1)
+    ready.put(lease.email)
+    done.get()
+    lease.release()
+
+
+class TestParseCredentials:
+    """账号解析测试"""
+
+    def test_formats(self):
+        assert parse_credentials("a@x.com:p:1, b@x.com:p2") == [
+            Credential("a@x.com", "p:1"),
+            Credential("b@x.com", "p2"),
+        ]
+        assert parse_credentials('[{"email": "c@x.com", "password": "p"}]') == [Credential("c@x.com", "p")]
+        assert parse_credentials("  ") == []
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_credentials("no-password")
+
+
+class TestCredentialPool:
+    """CredentialPool 测试"""
+
+    def test_leases_are_exclusive(self, tmp_path):
+        """测试：同一账号不会同时被租出，释放后可再次租用"""
+        pool = _pool(tmp_path)
+        first = pool.acquire(timeout=0)
+        second = pool.acquire(timeout=0)
+
+        assert {first.email, second.email} == {"user0@example.com", "user1@example.com"}
+        assert pool.try_acquire() is None
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+        first.release()
+        third = pool.acquire(timeout=0)
+        assert third.email == first.email
+        second.release()
+        third.release()
+
+    def test_cross_process(self, tmp_path):
+        """测试：另一个进程持有的账号不会被租出"""
+        pool = _pool(tmp_path)
+        ctx = multiprocessing.get_context("fork")
+        ready, done = ctx.Queue(), ctx.Queue()
+        worker = ctx.Process(target=_hold_lease, args=(pool, ready, done))
+        worker.start()
+        try:
+            held = ready.get(timeout=5)
+            lease = pool.acquire(timeout=0)
+            assert lease.email != held
+            assert pool.try_acquire() is None
+            lease.release()
+        finally:
+            done.put(True)
+            worker.join(5)
+
+    @pytest.mark.asyncio
+    async def test_async_lease_and_storage_state(self, tmp_path):
+        """测试：每个账号使用独立的 storage state 文件"""
+        pool = _pool(tmp_path, count=1)
+
+        class FakeContext:
+            async def storage_state(self, path):
+                with open(path, "w") as f:
+                    f.write("{}")
+
+        async with pool.lease(timeout=0) as lease:
+            assert lease.storage_state is None
+            saved = await lease.save_storage_state(FakeContext())
+            assert saved.endswith("user0_example.com.json")
+            assert lease.storage_state == saved
+        assert not lease.active
+
+        async with pool.lease(timeout=0) as lease:
+            assert lease.storage_state == saved
+            lease.invalidate_storage_state()
+            assert lease.storage_state is None
+
+    def test_empty_pool(self):
+        with pytest.raises(ValueError):
+            CredentialPool([])
+
+    def test_from_config_fallback(self, monkeypatch, tmp_path):
+        """测试：没有配置账号池和 PROTAGO_TEST_EMAIL 时使用调用方提供的默认账号"""
+        fallback = Credential("default@example.com", "pw")
+        dirs = {"lock_dir": str(tmp_path / "locks"), "state_dir": str(tmp_path / "state")}
+
+        monkeypatch.setattr(config, "get_settings", lambda: config.load_settings(env={}))
+        assert CredentialPool.from_config(fallback, **dirs).credentials == [fallback]
+
+        env = {"PROTAGO_TEST_EMAIL": "env@example.com", "PROTAGO_TEST_PASSWORD": "secret"}
+        monkeypatch.setattr(config, "get_settings", lambda: config.load_settings(env=env))
+        pool = CredentialPool.from_config(fallback, **dirs)
+        assert pool.credentials == [Credential("env@example.com", "secret")]
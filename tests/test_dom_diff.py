@@ -0,0 +1,83 @@
+"""DOM 增量变更追踪测试用例
+
+使用返回预设差异的假页面验证 Python 端的解析和等待逻辑。
+"""
+import pytest
+
+from src.dom_diff import DomDiff, DomDiffTracker
+
+
+class FakePage:
+    """按顺序返回预设差异的假页面"""
+
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.calls = []
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append(arg)
+        if arg["action"] == "checkpoint" or not self.payloads:
+            return {"fresh": False, "added": [], "removed": [], "textChanged": []}
+        return self.payloads.pop(0)
+
+
+class TestDomDiff:
+    """DomDiff 解析测试"""
+
+    def test_from_payload(self):
+        """测试：解析页面返回的差异"""
+        diff = DomDiff.from_payload({
+            "added": [{"tag": "DIV", "path": "div.message", "text": "hello.md"}],
+            "removed": [{"tag": "SPAN", "path": "span", "text": "Working on it..."}],
+            "textChanged": [{"tag": "P", "path": "p", "text": "new", "oldText": "old"}],
+            "matched": 1,
+        })
+
+        assert not diff.is_empty
+        assert diff.matched == 1
+        assert diff.added_chars == len("hello.md")
+        assert diff.appeared("hello.md")
+        assert diff.appeared("new")
+        assert diff.disappeared("Working on it")
+        assert diff.disappeared("old")
+
+    def test_empty_payload(self):
+        """测试：空差异"""
+        diff = DomDiff.from_payload(None)
+        assert diff.is_empty
+        assert diff.new_text == ""
+
+
+class TestDomDiffTracker:
+    """DomDiffTracker 测试"""
+
+    @pytest.mark.asyncio
+    async def test_options_passed_to_page(self):
+        """测试：追踪参数传入页面脚本"""
+        page = FakePage([])
+        tracker = DomDiffTracker(page, match="[role='article']", max_nodes=5)
+        await tracker.checkpoint()
+
+        assert page.calls[0]["action"] == "checkpoint"
+        assert page.calls[0]["match"] == "[role='article']"
+        assert page.calls[0]["maxNodes"] == 5
+
+    @pytest.mark.asyncio
+    async def test_wait_for_text(self):
+        """测试：等待文本出现在增量中"""
+        page = FakePage([
+            {"added": [{"tag": "DIV", "path": "div", "text": "Working on it"}]},
+            {"textChanged": [{"tag": "DIV", "path": "div", "text": "hello.md", "oldText": "Working on it"}]},
+        ])
+        tracker = DomDiffTracker(page)
+
+        diff = await tracker.wait_for_text("hello.md", timeout=1000, interval=1)
+
+        assert diff is not None
+        assert diff.disappeared("Working on it")
+
+    @pytest.mark.asyncio
+    async def test_wait_for_text_timeout(self):
+        """测试：超时返回 None"""
+        tracker = DomDiffTracker(FakePage([]))
+        assert await tracker.wait_for_text("never", timeout=10, interval=1) is None
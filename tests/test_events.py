@@ -0,0 +1,124 @@
+"""结构化事件日志测试用例"""
+import json
+
+import pytest
+
+from src.artifacts import ArtifactStore
+from src.backends import FakeBackend
+from src.events import EventLog
+from src.mcp_client import BrowserMCPClient
+from src.screencast import StepMarker
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestEventLog:
+    """EventLog 测试"""
+
+    def test_lazy_file_creation(self, tmp_path):
+        """测试：没有事件时不创建文件和后台线程"""
+        log = EventLog(str(tmp_path / "events" / "w.jsonl"))
+        log.close()
+        assert not (tmp_path / "events").exists()
+
+    def test_get_event_log_off_by_default(self, tmp_path, monkeypatch):
+        """测试：没有设置 RECORD_EVENTS 时事件日志不写入产物目录"""
+        from config import load_settings
+        from src import artifacts, events
+
+        for env, recorded in (({}, False), ({"RECORD_EVENTS": "1"}, True)):
+            env = {"ARTIFACT_DIR": str(tmp_path / "out"), **env}
+            monkeypatch.setattr("config.get_settings", lambda: load_settings(env=env))
+            artifacts.get_artifact_store.cache_clear()
+            events.get_event_log.cache_clear()
+            log = events.get_event_log()
+            log.emit("tick")
+            log.close()
+            assert (tmp_path / "out" / "events").exists() is recorded
+        artifacts.get_artifact_store.cache_clear()
+        events.get_event_log.cache_clear()
+
+    def test_buffered_write(self, tmp_path):
+        """测试：事件由后台线程写入，close 后全部落盘并保持顺序"""
+        path = tmp_path / "events" / "w.jsonl"
+        log = EventLog(str(path), run_id="run-1", flush_interval=10)
+        for i in range(100):
+            log.emit("tick", i=i)
+        log.close()
+
+        events = read_lines(path)
+        assert [e["i"] for e in events] == list(range(100))
+        assert all(e["run_id"] == "run-1" and e["type"] == "tick" for e in events)
+
+    def test_full_queue_drops(self, tmp_path):
+        """测试：队列满时丢弃事件而不是阻塞"""
+        log = EventLog(str(tmp_path / "w.jsonl"), max_queue=1)
+        log._writer = object()  # 阻止启动后台线程，模拟写入跟不上
+        log.emit("a")
+        log.emit("b")
+        assert log.dropped == 1
+
+    def test_step_status(self, tmp_path):
+        path = tmp_path / "w.jsonl"
+        log = EventLog(str(path))
+        artifact = ArtifactStore(str(tmp_path / "artifacts"), run_id="r").put("t::a", "shot", b"png")
+
+        with log.step("load", test="t::a") as step:
+            step.attach(artifact)
+        with log.step("input", test="t::a") as step:
+            step.warn("输入不完整")
+        with pytest.raises(ValueError):
+            with log.step("submit", test="t::a"):
+                raise ValueError("按钮不存在")
+        log.close()
+
+        load, input_step, submit = read_lines(path)
+        assert load["status"] == "passed" and load["artifacts"][0]["sha256"] == artifact.sha256
+        assert input_step["status"] == "warning" and input_step["warnings"] == ["输入不完整"]
+        assert submit["status"] == "failed" and submit["error"] == "ValueError: 按钮不存在"
+        assert submit["duration"] >= 0
+
+    def test_sequence(self, tmp_path):
+        """测试：开始下一步时结束上一步，fail 以失败结束当前步骤"""
+        path = tmp_path / "w.jsonl"
+        log = EventLog(str(path))
+        steps = log.sequence("t::a")
+        steps.start("navigate")
+        steps.attach_recording(StepMarker("navigate", 1.5, 12), tmp_path / "recording")
+        steps.start("submit")
+        steps.fail(RuntimeError("超时"))
+        steps.close()
+        log.close()
+
+        events = read_lines(path)
+        assert [(e["step"], e["status"]) for e in events] == [("navigate", "passed"), ("submit", "failed")]
+        assert events[0]["artifacts"] == [
+            {"recording": str(tmp_path / "recording"), "marker": "navigate", "t": 1.5, "frame": 12}
+        ]
+
+
+class TestClientEvents:
+    """BrowserMCPClient 工具调用事件测试"""
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_recorded(self, tmp_path):
+        """测试：记录工具名称、状态和耗时，不记录输入的文本"""
+        path = tmp_path / "w.jsonl"
+        log = EventLog(str(path))
+        async with BrowserMCPClient(event_log=log, backend=FakeBackend()) as client:
+            await client.navigate("https://example.com/login")
+            await client.fill("#password", "secret")
+            with pytest.raises(ValueError):
+                await client.fill(text="secret")
+        log.close()
+
+        events = read_lines(path)
+        assert [(e["tool"], e["status"]) for e in events] == [
+            ("navigate", "passed"), ("fill", "passed"), ("fill", "failed"),
+        ]
+        assert events[0]["url"] == "https://example.com/login"
+        assert events[1]["selector"] == "#password"
+        assert "secret" not in path.read_text(encoding="utf-8")
+        assert events[2]["error"].startswith("ValueError")
@@ -4,6 +4,7 @@
 这些测试用例可以作为模板供其他 QA 学习使用。
 """
 import pytest
+from src.errors import ToolTimeoutError
 from src.mcp_client import BrowserMCPClient, browser_client
 from src.test_utils import (
     wait_for_element_text,
@@ -13,6 +14,9 @@ from src.test_utils import (
     take_screenshot_on_failure
 )
 
+# fake 后端加载 tests/fixtures/pages/example.com 中的示例页面；
+# 依赖夹具中表单和按钮的测试标记为 fake_only，其余测试也可以在真实的 example.com 上运行
+
 
 class TestBasicNavigation:
     """基础导航测试用例"""
@@ -27,8 +31,7 @@ class TestBasicNavigation:
         result = await browser.navigate("https://example.com")
         
         # 验证导航成功
-        assert result["success"] is True
-        assert "example.com" in result["url"]
+        assert "example.com" in result.url
         
         # 验证当前 URL
         current_url = await browser.get_url()
@@ -44,6 +47,7 @@ class TestBasicNavigation:
         assert len(title) > 0
 
 
+@pytest.mark.fake_only
 class TestUserInteraction:
     """用户交互测试用例"""
     
@@ -62,8 +66,8 @@ class TestUserInteraction:
         result = await browser.click("button#submit")
         
         # 验证点击成功
-        assert result["success"] is True
-        assert result["action"] == "click"
+        assert result.action == "click"
+        assert result.selector == "button#submit"
     
     @pytest.mark.asyncio
     async def test_fill_input_field(self, browser):
@@ -77,8 +81,8 @@ class TestUserInteraction:
         result = await browser.fill("input#username", "test_user")
         
         # 验证填写成功
-        assert result["success"] is True
-        assert result["text"] == "test_user"
+        assert result.action == "fill"
+        assert result.selector == "input#username"
     
     @pytest.mark.asyncio
     async def test_fill_form(self, browser):
@@ -100,7 +104,7 @@ class TestUserInteraction:
         # 验证所有字段都填写成功
         assert len(results) == len(form_fields)
         for selector, result in results.items():
-            assert result["success"] is True
+            assert result.selector == selector
 
 
 class TestElementVerification:
@@ -114,17 +118,18 @@ class TestElementVerification:
         """
         await browser.navigate("https://example.com")
         
-        # 等待元素出现
-        await browser.wait_for_selector("h1", timeout=5000)
+        # 等待元素出现（text= 选择器在所有后端上都可用）
+        await browser.wait_for_selector("text=Example Domain", timeout=5000)
         
         # 获取文本
-        text = await browser.get_text("h1")
+        text = await browser.get_text(role="heading", name="Example Domain")
         
         # 验证文本不为空
         assert text is not None
         assert len(text) > 0
     
     @pytest.mark.asyncio
+    @pytest.mark.fake_only
     async def test_wait_for_element_text(self, browser):
         """测试：等待元素文本变为期望值
         
@@ -146,6 +151,7 @@ class TestElementVerification:
         assert is_match is True
     
     @pytest.mark.asyncio
+    @pytest.mark.fake_only
     async def test_verify_page_url(self, browser):
         """测试：验证页面 URL
         
@@ -158,6 +164,7 @@ class TestElementVerification:
         assert is_correct is True
 
 
+@pytest.mark.fake_only
 class TestCompleteUserFlow:
     """完整用户流程测试用例"""
     
@@ -220,15 +227,11 @@ class TestErrorHandling:
         await browser.navigate("https://example.com")
         
         # 尝试等待一个不存在的元素（应该超时）
-        try:
-            await browser.wait_for_selector("div#non-existent", timeout=2000)
-            # 如果元素找到了，这个测试应该失败
-            assert False, "元素不应该存在"
-        except Exception:
-            # 预期的异常，测试通过
-            assert True
+        with pytest.raises(ToolTimeoutError):
+            await browser.wait_for_selector("text=Non-existent element", timeout=2000)
     
     @pytest.mark.asyncio
+    @pytest.mark.fake_only
     async def test_screenshot_on_failure(self, browser):
         """测试：失败时截取截图
         
@@ -239,8 +242,7 @@ class TestErrorHandling:
         try:
             # 执行可能失败的操作
             await browser.click("button#non-existent")
-            assert False, "操作应该失败"
-        except Exception as e:
+        except LookupError as e:
             # 截取截图用于调试
             screenshot_path = await take_screenshot_on_failure(
                 browser,
@@ -248,6 +250,8 @@ class TestErrorHandling:
                 str(e)
             )
             assert screenshot_path is not None
+        else:
+            pytest.fail("点击不存在的元素应该失败")
 
 
 class TestAdvancedFeatures:
@@ -270,7 +274,7 @@ class TestAdvancedFeatures:
             })
         """)
         
-        assert page_info is not None
+        assert "example.com" in page_info["url"]
     
     @pytest.mark.asyncio
     async def test_screenshot_capture(self, browser):
@@ -306,7 +310,7 @@ class TestSmokeTests:
     async def test_homepage_loads(self, browser):
         """冒烟测试：主页能够正常加载"""
         result = await browser.navigate("https://example.com")
-        assert result["success"] is True
+        assert result.title == "Example Domain"
         
         title = await browser.get_title()
         assert title is not None
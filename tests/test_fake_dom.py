@@ -0,0 +1,263 @@
+"""内存页面模拟测试用例
+
+验证 HTML 解析、选择器引擎、夹具声明的事件处理和虚拟时间，以及基于它的模拟客户端。
+"""
+import time
+
+import pytest
+
+from src.backends import FakeBackend
+from src.errors import ToolTimeoutError
+from src.fake_dom import (
+    FakePage,
+    FakeSite,
+    SelectorError,
+    accessibility_snapshot,
+    compile_selector,
+    parse_html,
+)
+from src.mcp_client import BrowserMCPClient
+
+
+PAGE = """
+<html>
+<head><title>Fixture</title><style>p { color: red }</style></head>
+<body>
+  <nav><a href="/a">First</a> <a href="/b#top" class="nav current">Second &amp; more</a></nav>
+  <ul id="items">
+    <li>one<li>two<li class="last">three
+  </ul>
+  <form id="signup" action="/done">
+    <label for="email">E-mail</label>
+    <input id="email" type="email" required>
+    <input name="nickname" placeholder="Nick name">
+    <p class="error" role="alert" hidden></p>
+    <button type="submit">Sign up</button>
+  </form>
+  <div style="display: none"><span id="ghost">boo</span></div>
+  <button id="reveal" type="button" data-show="#later" data-hide="#reveal" data-delay="250">Reveal</button>
+  <div id="later" hidden>Later <b>bold</b></div>
+</body>
+</html>
+"""
+
+
+def select(selector, document=None):
+    return compile_selector(selector).select(document or parse_html(PAGE))
+
+
+class TestSelectors:
+    """选择器引擎测试"""
+
+    def test_basic_and_combinators(self):
+        """测试：类型、id、类、属性选择器和组合器"""
+        document = parse_html(PAGE)
+        assert [e.own_text for e in select("#items > li", document)] == ["one", "two", "three"]
+        assert [e.own_text for e in select("li:nth-child(odd)", document)] == ["one", "three"]
+        assert [e.own_text for e in select("li + li.last", document)] == ["three"]
+        assert [e.own_text for e in select("li:first-child ~ li", document)] == ["two", "three"]
+        assert select("nav a.nav.current", document)[0].get("href") == "/b#top"
+        assert len(select("a[href^='/']", document)) == 2
+        assert len(select("input[placeholder*='NICK' i]", document)) == 1
+        assert select("input[placeholder*='NICK']", document) == []
+        assert select("body > li", document) == []
+
+    def test_list_in_document_order(self):
+        """测试：选择器列表按文档顺序返回，重复匹配只出现一次"""
+        matches = select("button, #email, input[type='email'], a")
+        assert [e.tag for e in matches] == ["a", "a", "input", "button", "button"]
+
+    def test_pseudo_classes(self):
+        """测试：:not、:has、:contains、:has-text、:invalid、:visible"""
+        document = parse_html(PAGE)
+        assert [e.id for e in select("form :not(label):not(p):not(button)", document)] == ["email", ""]
+        assert [e.id for e in select("form:has(#email)", document)] == ["signup"]
+        assert len(select("button:contains('Sign')", document)) == 1
+        assert select("button:contains('sign')", document) == []
+        assert len(select("button:has-text('sign up')", document)) == 1
+        assert [e.id for e in select("input:invalid", document)] == ["email"]
+        assert select("span:visible", document) == []
+        assert [e.id for e in select("span:hidden", document)] == ["ghost"]
+
+    def test_text_selector(self):
+        """测试：text= 匹配包含文本的最内层元素，带引号时精确匹配"""
+        document = parse_html(PAGE)
+        assert [e.get("href") for e in select("text=second", document)] == ["/b#top"]
+        assert select('text="Second"', document) == []
+        assert [e.tag for e in select('text="Second & more"', document)] == ["a"]
+
+    @pytest.mark.parametrize("selector", ["", "div >", "[href", "a:unknown", "li:nth-child(x)", "a:not(", "#"])
+    def test_invalid_selector(self, selector):
+        """测试：无效或不支持的选择器抛出 SelectorError"""
+        with pytest.raises(SelectorError):
+            compile_selector(selector)
+
+
+class TestDocument:
+    """DOM 解析测试"""
+
+    def test_text_and_visibility(self):
+        """测试：隐式结束标签、实体、可见文本和隐藏元素"""
+        document = parse_html(PAGE)
+        assert document.title == "Fixture"
+        assert select("a", document)[1].inner_text == "Second & more"
+        assert select("#ghost", document)[0].inner_text == ""
+        assert select("#ghost", document)[0].text_content == "boo"
+        assert "color" not in select("body", document)[0].inner_text
+
+    def test_accessibility_snapshot(self):
+        """测试：快照角色和名称来自 DOM，ref 可以重新定位到元素"""
+        document = parse_html(PAGE)
+        snapshot = accessibility_snapshot(document)
+        assert snapshot.find("textbox", "e-mail").ref == "input#email"
+        nickname = snapshot.find("textbox", "nick name")
+        assert select(nickname.ref, document)[0].get("name") == "nickname"
+        assert snapshot.find("button", "sign up") is not None
+        assert snapshot.find("link", "Second & more") is not None
+        # 隐藏的元素不在快照中
+        assert snapshot.find("generic", "boo") is None
+        assert snapshot.find("generic", "Later") is None
+
+
+class TestFakePage:
+    """页面交互和虚拟时间测试"""
+
+    @pytest.fixture
+    def site(self):
+        site = FakeSite(accounts={"user@example.com": "secret"})
+        site.add_page("https://site.test/", PAGE)
+        site.add_page("https://site.test/done", "<title>Done</title><h1>Thanks</h1>")
+        site.add_page("https://site.test/login", """
+            <title>Login</title>
+            <form action="/done" data-login data-delay="400" data-error-message="Wrong password">
+              <input type="email" required><input type="password" required>
+              <div role="alert" hidden></div><button>Log in</button>
+            </form>""")
+        return site
+
+    def test_directory_routes(self, tmp_path):
+        """测试：按 <host>/<path>.html 和 <path>/index.html 查找夹具，找不到时返回 404 页面"""
+        (tmp_path / "host.test" / "docs").mkdir(parents=True)
+        (tmp_path / "host.test" / "index.html").write_text("<title>Home</title>")
+        (tmp_path / "host.test" / "docs" / "index.html").write_text("<title>Docs</title>")
+        (tmp_path / "host.test" / "about.html").write_text("<title>About</title>")
+        (tmp_path / "secret.html").write_text("<title>Secret</title>")
+        page = FakePage(FakeSite.from_directory(str(tmp_path)))
+
+        assert page.goto("https://host.test") == 200 and page.title == "Home"
+        assert page.goto("/docs/?q=1") == 200 and page.title == "Docs"
+        assert page.goto("../about") == 200 and page.title == "About"
+        assert page.goto("https://host.test/../secret") == 404
+        assert page.goto("https://other.test/") == 404 and page.title == "404 Not Found"
+
+    def test_each_navigation_gets_fresh_document(self, site):
+        """测试：重新导航后页面恢复夹具初始状态，只有锚点变化时保留当前文档"""
+        page = FakePage(site)
+        page.goto("https://site.test/")
+        page.fill("input[name='nickname']", "neo")
+        page.goto("https://site.test/#items")
+        assert page.query("input[name='nickname']").value == "neo"
+        page.goto("https://site.test/")
+        assert page.query("input[name='nickname']").value == ""
+        assert page.navigations == 2
+
+    def test_delayed_actions_use_virtual_time(self, site):
+        """测试：data-delay 的动作在虚拟时间推进后执行，等待不会真正休眠"""
+        page = FakePage(site)
+        page.goto("https://site.test/")
+        page.click("#reveal")
+        assert not page.query("#later").visible
+
+        start = time.monotonic()
+        element = page.wait_for("#later", timeout=1000)
+        assert time.monotonic() - start < 0.1
+        assert page.now == 250
+        assert element.inner_text == "Later bold"
+        assert not page.query("#reveal").visible
+        with pytest.raises(LookupError):
+            page.click("#reveal")
+
+        with pytest.raises(ToolTimeoutError):
+            page.wait_for("#missing", timeout=3000)
+        assert page.now == 3250
+
+    def test_form_validation(self, site):
+        """测试：提交未通过原生校验的表单时标记字段并显示提示，不导航"""
+        page = FakePage(site)
+        page.goto("https://site.test/")
+        page.click("text=Sign up")
+        assert page.url == "https://site.test/"
+        assert page.query("#email").get("aria-invalid") == "true"
+        assert page.text("[role='alert']") == "Please fill out this field."
+
+        page.fill("#email", "not-an-email")
+        page.click("button[type='submit']")
+        assert page.query_all("input:invalid")
+
+        page.fill("#email", "a@b.c")
+        page.click("button[type='submit']")
+        assert page.url == "https://site.test/done"
+        assert page.title == "Done"
+
+    def test_login_form(self, site):
+        """测试：data-login 表单按站点账号校验，延迟后显示错误或导航"""
+        page = FakePage(site)
+        page.goto("https://site.test/login")
+        page.fill("input[type='email']", "user@example.com")
+        page.fill("input[type='password']", "wrong")
+        page.click("button")
+        assert page.wait_for("[role='alert']").inner_text == "Wrong password"
+        assert page.now == 400
+
+        page.fill("input[type='password']", "secret")
+        page.click("button")
+        assert page.url.endswith("/login")
+        assert page.wait_for_navigation(timeout=1000)
+        assert page.url == "https://site.test/done"
+
+    def test_fill_requires_form_control(self, site):
+        """测试：不可见或不可填写的元素不能填写"""
+        page = FakePage(site)
+        page.goto("https://site.test/")
+        with pytest.raises(LookupError):
+            page.fill("h1, #items", "x")
+        with pytest.raises(LookupError):
+            page.fill("#ghost", "x")
+
+
+class TestClientOnFakeDom:
+    """模拟客户端测试"""
+
+    @pytest.mark.asyncio
+    async def test_selector_mismatch_is_reported(self):
+        """测试：选择器写错时模拟客户端报错，而不是返回预设结果"""
+        async with BrowserMCPClient(backend=FakeBackend()) as client:
+            await client.navigate("https://example.com/login")
+            with pytest.raises(LookupError):
+                await client.click("button#log-in")
+            with pytest.raises(ToolTimeoutError):
+                await client.wait_for_selector("div#welcome-message", timeout=1000)
+            assert await client.get_attribute("input#email", "type") == "email"
+
+    @pytest.mark.asyncio
+    async def test_snapshot_follows_delayed_changes(self):
+        """测试：定时动作改变 DOM 后快照缓存失效"""
+        async with BrowserMCPClient(backend=FakeBackend()) as client:
+            await client.navigate("https://example.com")
+            await client.click("button#search-submit")
+            assert (await client.snapshot()).find("generic", "Search Results") is None
+            await client.wait_for_selector("div#search-results")
+            assert (await client.snapshot()).find("generic", "Search Results") is not None
+
+    @pytest.mark.asyncio
+    async def test_many_flows_are_fast(self):
+        """测试：不启动浏览器，一千次完整登录流程在数秒内完成"""
+        site = FakeSite.from_directory("tests/fixtures/pages")
+        start = time.monotonic()
+        for _ in range(1000):
+            async with BrowserMCPClient(backend=FakeBackend(site)) as client:
+                await client.navigate("https://example.com/login")
+                await client.fill("input#email", "user@example.com")
+                await client.click("button#login")
+                assert await client.get_text("div#welcome-message") == "Welcome, User!"
+        assert time.monotonic() - start < 10
@@ -0,0 +1,110 @@
+"""测试影响分析测试用例"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.impact import ChangeSet, ImpactRecorder, TestFootprint, is_affected, load_impact_map, main, select_tests
+from src.backends import FakeBackend
+from src.mcp_client import BrowserMCPClient
+
+
+def _footprint(urls=(), selectors=(), texts=()):
+    return TestFootprint(set(urls), set(selectors), set(texts))
+
+
+IMPACT_MAP = {
+    "tests/test_banner.py::test_pricing": _footprint(
+        ["https://host/#pricing"], ["div.pricing-card", "text=Pricing"], ["Pricing"]
+    ),
+    "tests/test_banner.py::test_society": _footprint(["https://host/agentSociety/list"], ["text=Society"], ["Society"]),
+    "tests/test_login.py::test_login": _footprint(["https://host/login"], ["input#email", "button.submit"]),
+}
+
+
+class TestRecorder:
+    """ImpactRecorder 测试"""
+
+    @pytest.mark.asyncio
+    async def test_records_client_calls_per_test(self, tmp_path):
+        """测试：通过客户端监听器按测试记录 URL、选择器和文本"""
+        recorder = ImpactRecorder()
+        async with BrowserMCPClient(backend=FakeBackend()) as client:
+            client.add_listener(recorder.on_tool_call)
+            recorder.start_test("t1")
+            await client.navigate("https://example.com/login")
+            await client.fill("input#email", "a@b.c")
+            await client.click("text=Log In")
+            recorder.start_test("t2")
+            recorder.stop_test()
+            await client.navigate("https://example.com/ignored")
+
+        fp = recorder.footprints["t1"]
+        assert fp.urls == {"https://example.com/login"}
+        assert fp.selectors == {"input#email", "text=Log In"}
+        assert fp.texts == {"Log In"}
+
+        path = tmp_path / "impact.json"
+        path.write_text(json.dumps({"t2": {"urls": ["https://old"]}, "t3": {"urls": ["https://keep"]}}))
+        recorder.save(str(path))
+        saved = load_impact_map(str(path))
+        assert set(saved) == {"t1", "t3"}
+
+    def test_attach_page_records_main_frame(self):
+        """测试：Playwright 页面只在记录测试期间记录主框架导航"""
+        handlers = []
+        page = SimpleNamespace(on=lambda event, handler: handlers.append((event, handler)))
+        frame = lambda url, parent=None: SimpleNamespace(url=url, parent_frame=parent)
+        recorder = ImpactRecorder()
+        recorder.attach_page(page)
+        [(event, on_navigated)] = handlers
+        assert event == "framenavigated"
+
+        on_navigated(frame("https://host/before"))
+        recorder.start_test("t1")
+        on_navigated(frame("https://host/share/1"))
+        on_navigated(frame("https://ads/iframe", parent=frame("https://host/share/1")))
+        assert recorder.footprints["t1"].urls == {"https://host/share/1"}
+
+
+class TestSelection:
+    """select_tests 测试"""
+
+    def test_routes(self):
+        """测试：路由支持精确、子路径、锚点和通配符匹配"""
+        assert select_tests(IMPACT_MAP, ChangeSet(routes={"/agentSociety"})) == ["tests/test_banner.py::test_society"]
+        assert select_tests(IMPACT_MAP, ChangeSet(routes={"/#pricing"})) == ["tests/test_banner.py::test_pricing"]
+        assert select_tests(IMPACT_MAP, ChangeSet(routes={"log*"})) == ["tests/test_login.py::test_login"]
+        assert select_tests(IMPACT_MAP, ChangeSet(routes={"/pricing"})) == []
+
+    def test_dom_diff(self):
+        """测试：DOM 差异中的节点路径和文本映射到使用它们的测试"""
+        changes = ChangeSet.from_dom_diff({
+            "added": [{"tag": "DIV", "path": "div.pricing-card.pro", "text": "$20"}],
+            "textChanged": [{"tag": "A", "path": "a.nav", "text": "Agent Society", "oldText": "Society"}],
+        })
+        assert select_tests(IMPACT_MAP, changes) == [
+            "tests/test_banner.py::test_pricing",
+            "tests/test_banner.py::test_society",
+        ]
+        assert not is_affected(IMPACT_MAP["tests/test_login.py::test_login"], changes)
+
+    def test_unknown_tests_always_selected(self):
+        """测试：映射中没有记录的测试总是被选中，已删除的测试不再输出"""
+        all_tests = ["tests/test_login.py::test_login", "tests/test_new.py::test_flow"]
+        changes = ChangeSet(routes={"/pricing"})
+        assert select_tests(IMPACT_MAP, changes, all_tests) == ["tests/test_new.py::test_flow"]
+        changes = ChangeSet(routes={"/agentSociety"})
+        assert select_tests(IMPACT_MAP, changes, all_tests) == ["tests/test_new.py::test_flow"]
+
+    def test_cli(self, tmp_path, capsys):
+        path = tmp_path / "impact.json"
+        path.write_text(json.dumps({k: v.to_dict() for k, v in IMPACT_MAP.items()}))
+        tests = tmp_path / "tests.txt"
+        tests.write_text("\n".join(IMPACT_MAP))
+        assert main(["--map", str(path), "--tests", str(tests), "--selector", "button.submit"]) == 0
+        assert capsys.readouterr().out.split() == ["tests/test_login.py::test_login"]
+
+        # 没有需要运行的测试时不输出测试 ID，以返回值表示
+        assert main(["--map", str(path), "--tests", str(tests), "--route", "/pricing"]) == 1
+        assert capsys.readouterr().out == ""
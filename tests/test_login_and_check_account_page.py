@@ -11,28 +11,22 @@
 """
 import pytest
 import asyncio
-from playwright.async_api import async_playwright
-from pathlib import Path
-import sys
-import os
 
-# 添加项目根目录到路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TestConfig
+from src.credentials import Credential, CredentialPool
+from src.events import get_event_log
+from src.impact import get_impact_recorder
+from src.page_scripts import page_scripts
 
-try:
-    from config import TestConfig
-    BASE_URL = TestConfig.PROTAGO_BASE_URL
-    # 使用实际的测试账号
-    TEST_EMAIL = os.getenv("PROTAGO_TEST_EMAIL", "xyzdev01@cqigames.com")
-    TEST_PASSWORD = os.getenv("PROTAGO_TEST_PASSWORD", "Abc123123?")
-except ImportError:
-    BASE_URL = "https://xyz-beta.protago-dev.com"
-    TEST_EMAIL = "xyzdev01@cqigames.com"
-    TEST_PASSWORD = "Abc123123?"
 
-# 创建截图目录
-SCREENSHOT_DIR = Path("screenshots")
-SCREENSHOT_DIR.mkdir(exist_ok=True)
+# 没有配置账号池和 PROTAGO_TEST_EMAIL 时使用的 Protago 测试账号
+DEFAULT_ACCOUNT = Credential("xyzdev01@cqigames.com", "Abc123123?")
+
+
+@pytest.fixture(scope="session")
+def credential_pool():
+    """Protago 测试账号池，未配置账号时使用 DEFAULT_ACCOUNT"""
+    return CredentialPool.from_config(fallback=DEFAULT_ACCOUNT)
 
 
 class TestLoginAndCheckAccountPage:
@@ -40,57 +34,48 @@ class TestLoginAndCheckAccountPage:
     
     @pytest.mark.asyncio
     @pytest.mark.e2e
-    async def test_login_and_verify_account_page(self):
+    async def test_login_and_verify_account_page(self, artifacts, credential, protago_base_url):
         """测试：登录并验证 Account 页面
         
         完整流程：
         1. 导航到首页
         2. 点击登录按钮并打开弹窗
         3. 输入 email 和 password
-        4. 登录成功
-        5. 导航到 Account 页面
+        4. 登录成功，缓存账号的 storage state
+        5. 用缓存的登录状态新建上下文，导航到 Account 页面
         6. 验证用户信息
         """
+        # 只有真正运行浏览器测试时才导入 Playwright，收集阶段不加载
+        async_playwright = pytest.importorskip("playwright.async_api").async_playwright
+        browser_profile = TestConfig.get_browser_profile()
+        # 账号页面显示的用户名为 email 的本地部分
+        username = credential.email.split("@")[0]
+        # 每一步的状态、耗时和截图记录为步骤事件（--record-events 时写入文件）
+        steps = get_event_log().sequence(artifacts.test)
+        
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+            browser = await p.chromium.launch(**browser_profile["launch"])
+            context = await browser.new_context(**browser_profile["context"])
+            page = await context.new_page()
+            # pytest --record-impact 时记录页面导航
+            get_impact_recorder().attach_page(page)
             
             try:
                 # 步骤 1: 导航到首页
                 print("\n步骤 1: 导航到首页")
-                await page.goto(BASE_URL, wait_until="domcontentloaded")
+                steps.start("homepage")
+                await page.goto(protago_base_url, wait_until="domcontentloaded")
                 await page.wait_for_timeout(3000)
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step1_homepage.png", full_page=True)
+                steps.attach(artifacts.put("step1_homepage", await page.screenshot(full_page=True)))
                 current_url = page.url
-                assert BASE_URL in current_url, f"应该导航到 {BASE_URL}，实际: {current_url}"
+                assert protago_base_url in current_url, f"应该导航到 {protago_base_url}，实际: {current_url}"
                 print(f"✅ 首页加载完成: {current_url}")
                 
                 # 步骤 2: 点击 Sign Up/Log In 按钮
                 print("\n步骤 2: 点击 Sign Up/Log In 按钮")
+                steps.start("open_login")
                 # 先查找按钮
-                button_found = await page.evaluate("""
-                    () => {
-                        const allElements = document.querySelectorAll('*');
-                        for (let el of allElements) {
-                            const text = (el.textContent || el.innerText || '').trim();
-                            if (text === 'Sign Up / Log In' || 
-                                (text.includes('Sign Up') && text.includes('Log In') && text.length < 30)) {
-                                let isLeaf = true;
-                                for (let child of el.children) {
-                                    const childText = (child.textContent || child.innerText || '').trim();
-                                    if (childText === text || (childText.includes('Sign Up') && childText.includes('Log In'))) {
-                                        isLeaf = false;
-                                        break;
-                                    }
-                                }
-                                if (isLeaf && el.tagName !== 'HTML' && el.tagName !== 'BODY') {
-                                    return {found: true, tagName: el.tagName, className: el.className};
-                                }
-                            }
-                        }
-                        return {found: false};
-                    }
-                """)
+                button_found = await page_scripts.call(page, "findLoginButton", False)
                 
                 assert button_found.get('found'), "应该找到登录按钮"
                 
@@ -101,88 +86,41 @@ class TestLoginAndCheckAccountPage:
                     await login_button.click()
                 except:
                     # 如果文本定位失败，使用 JavaScript 点击
-                    await page.evaluate("""
-                        () => {
-                            const allElements = document.querySelectorAll('*');
-                            for (let el of allElements) {
-                                const text = (el.textContent || el.innerText || '').trim();
-                                if (text === 'Sign Up / Log In' || 
-                                    (text.includes('Sign Up') && text.includes('Log In') && text.length < 30)) {
-                                    let isLeaf = true;
-                                    for (let child of el.children) {
-                                        const childText = (child.textContent || child.innerText || '').trim();
-                                        if (childText === text || (childText.includes('Sign Up') && childText.includes('Log In'))) {
-                                            isLeaf = false;
-                                            break;
-                                        }
-                                    }
-                                    if (isLeaf && el.tagName !== 'HTML' && el.tagName !== 'BODY') {
-                                        el.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                        setTimeout(() => {
-                                            el.click();
-                                        }, 500);
-                                        return true;
-                                    }
-                                }
-                            }
-                            return false;
-                        }
-                    """)
+                    await page_scripts.call(page, "findLoginButton", True)
                 
                 await page.wait_for_timeout(2000)
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step2_after_click.png", full_page=True)
+                steps.attach(artifacts.put("step2_after_click", await page.screenshot(full_page=True)))
                 print(f"✅ 登录按钮点击成功")
                 
                 # 步骤 3: 等待弹窗出现
                 print("\n步骤 3: 等待弹窗出现")
+                steps.start("modal")
                 await page.wait_for_selector('[role="dialog"]', timeout=5000)
                 await page.wait_for_timeout(1000)
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step3_modal_appeared.png", full_page=True)
+                steps.attach(artifacts.put("step3_modal_appeared", await page.screenshot(full_page=True)))
                 print("✅ 弹窗已出现")
                 
                 # 步骤 4: 输入 email
                 print("\n步骤 4: 输入 email")
+                steps.start("email")
                 email_input = page.locator('input[type="email"], input[placeholder*="email" i], input').first
                 await email_input.wait_for(state='visible', timeout=5000)
-                await email_input.fill(TEST_EMAIL)
+                await email_input.fill(credential.email)
                 await page.wait_for_timeout(500)
                 
                 input_value = await email_input.input_value()
-                assert input_value == TEST_EMAIL, f"Email 输入应该为 {TEST_EMAIL}，实际: {input_value}"
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step4_email_entered.png", full_page=True)
-                print(f"✅ Email 输入成功: {TEST_EMAIL}")
+                assert input_value == credential.email, f"Email 输入应该为 {credential.email}，实际: {input_value}"
+                steps.attach(artifacts.put("step4_email_entered", await page.screenshot(full_page=True)))
+                print(f"✅ Email 输入成功: {credential.email}")
                 
                 # 步骤 5: 点击下一步按钮
                 print("\n步骤 5: 点击下一步按钮")
-                next_button_result = await page.evaluate("""
-                    () => {
-                        const emailInput = document.querySelector('input[type="email"], input[placeholder*="email" i], input');
-                        if (!emailInput) return {found: false};
-                        
-                        const parent = emailInput.parentElement;
-                        const buttons = parent.querySelectorAll('button, [role="button"], svg, [class*="arrow" i]');
-                        
-                        for (let btn of buttons) {
-                            const style = window.getComputedStyle(btn);
-                            if (style.display !== 'none' && style.visibility !== 'hidden') {
-                                const rect = btn.getBoundingClientRect();
-                                const inputRect = emailInput.getBoundingClientRect();
-                                if (rect.left > inputRect.right - 50 && rect.top < inputRect.bottom && rect.bottom > inputRect.top) {
-                                    btn.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                                    setTimeout(() => {
-                                        btn.click();
-                                    }, 500);
-                                    return {found: true, tagName: btn.tagName};
-                                }
-                            }
-                        }
-                        return {found: false};
-                    }
-                """)
+                steps.start("next")
+                next_button_result = await page_scripts.call(page, "clickNextButton")
                 
                 if next_button_result.get('found'):
                     await page.wait_for_timeout(4000)
-                    await page.screenshot(path=SCREENSHOT_DIR / "test_login_step5_after_next.png", full_page=True)
+                    steps.attach(artifacts.put("step5_after_next", await page.screenshot(full_page=True)))
                     print("✅ 点击下一步按钮成功")
                 else:
                     await email_input.press('Enter')
@@ -191,18 +129,20 @@ class TestLoginAndCheckAccountPage:
                 
                 # 步骤 6: 输入 password
                 print("\n步骤 6: 输入 password")
+                steps.start("password")
                 password_input = page.locator('input[type="password"]').first
                 await password_input.wait_for(state='visible', timeout=5000)
-                await password_input.fill(TEST_PASSWORD)
+                await password_input.fill(credential.password)
                 await page.wait_for_timeout(500)
                 
                 input_length = len(await password_input.input_value())
                 assert input_length > 0, "Password 应该已输入"
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step6_password_entered.png", full_page=True)
+                steps.attach(artifacts.put("step6_password_entered", await page.screenshot(full_page=True)))
                 print(f"✅ Password 输入成功（长度: {input_length}）")
                 
                 # 步骤 7: 点击登录按钮
                 print("\n步骤 7: 点击登录按钮")
+                steps.start("login")
                 sign_in_button = None
                 sign_in_found = False
                 
@@ -339,46 +279,53 @@ class TestLoginAndCheckAccountPage:
                     raise AssertionError("应该找到登录按钮")
                 
                 await page.wait_for_timeout(5000)
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step7_after_login.png", full_page=True)
+                steps.attach(artifacts.put("step7_after_login", await page.screenshot(full_page=True)))
                 
                 # 步骤 8: 验证登录状态
                 print("\n步骤 8: 验证登录状态")
+                steps.start("verify_login")
                 await page.wait_for_timeout(3000)
                 page_text = await page.inner_text('body')
-                has_user_info = "xyz" in page_text.lower() or "xyzdev01" in page_text.lower()
+                has_user_info = username.lower() in page_text.lower()
                 sign_in_button_still_visible = await page.locator('text=Sign Up / Log In').count() > 0
                 
                 assert has_user_info or not sign_in_button_still_visible, "应该显示登录状态"
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step8_login_verified.png", full_page=True)
+                steps.attach(artifacts.put("step8_login_verified", await page.screenshot(full_page=True)))
+                await credential.save_storage_state(context)
                 print("✅ 登录状态验证通过")
                 
-                # 步骤 9: 导航到 Account 页面
+                # 步骤 9: 用缓存的登录状态新建上下文，导航到 Account 页面（同时验证缓存的会话可用）
                 print("\n步骤 9: 导航到 Account 页面")
-                account_url = f"{BASE_URL}/agentSociety/setting/account"
+                steps.start("account_page")
+                context = await browser.new_context(storage_state=credential.storage_state, **browser_profile["context"])
+                page = await context.new_page()
+                get_impact_recorder().attach_page(page)
+                account_url = f"{protago_base_url}/agentSociety/setting/account"
                 await page.goto(account_url, wait_until="domcontentloaded")
                 await page.wait_for_timeout(3000)
                 
                 current_url = page.url
                 assert account_url in current_url, f"应该导航到 {account_url}，实际: {current_url}"
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step9_account_page.png", full_page=True)
+                steps.attach(artifacts.put("step9_account_page", await page.screenshot(full_page=True)))
                 print(f"✅ 成功导航到 Account 页面: {current_url}")
                 
                 # 步骤 10: 验证用户信息
                 print("\n步骤 10: 验证用户信息")
+                steps.start("verify_account")
                 await page.wait_for_timeout(2000)
                 await page.evaluate("window.scrollTo(0, 0)")
                 await page.wait_for_timeout(1000)
                 
                 page_text = await page.inner_text('body')
-                username_found = "xyzdev01" in page_text
-                email_found = TEST_EMAIL in page_text
+                username_found = username in page_text
+                email_found = credential.email in page_text
                 
-                assert username_found, f"应该找到用户名 xyzdev01"
-                assert email_found, f"应该找到 email {TEST_EMAIL}"
+                assert username_found, f"应该找到用户名 {username}"
+                assert email_found, f"应该找到 email {credential.email}"
                 
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_step10_account_info_verified.png", full_page=True)
-                print(f"✅ 用户名验证通过: xyzdev01")
-                print(f"✅ Email 验证通过: {TEST_EMAIL}")
+                steps.attach(artifacts.put("step10_account_info_verified", await page.screenshot(full_page=True)))
+                print(f"✅ 用户名验证通过: {username}")
+                print(f"✅ Email 验证通过: {credential.email}")
                 
                 print("\n" + "=" * 60)
                 print("测试完成：Login and check Account page")
@@ -388,8 +335,12 @@ class TestLoginAndCheckAccountPage:
                 print(f"Email 验证: ✅")
                 
             except Exception as e:
-                await page.screenshot(path=SCREENSHOT_DIR / "test_login_error.png", full_page=True)
+                # 缓存的会话可能已失效，下次租用该账号时重新登录
+                credential.invalidate_storage_state()
+                steps.attach(artifacts.put("error", await page.screenshot(full_page=True)))
+                steps.fail(e)
                 print(f"\n❌ 测试失败: {e}")
                 raise
             finally:
+                steps.close()
                 await browser.close()
@@ -0,0 +1,143 @@
+"""对话网络流采集测试用例"""
+import pytest
+
+from src.network_tap import NetworkTap, SSEParser, extract_token
+
+
+class FakeWebSocket:
+    def __init__(self, url):
+        self.url = url
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+
+class FakePage:
+    def __init__(self):
+        self.bindings = {}
+        self.init_scripts = []
+        self.listeners = {}
+
+    async def expose_binding(self, name, callback):
+        # 与 Playwright 一致：同名 binding 只能注册一次
+        if name in self.bindings:
+            raise RuntimeError(f'Function "{name}" has been already registered')
+        self.bindings[name] = callback
+
+    async def add_init_script(self, script=None):
+        self.init_scripts.append(script)
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    def emit(self, event, value):
+        for handler in list(self.listeners.get(event, [])):
+            handler(value)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSSEParser:
+    """SSEParser 测试"""
+
+    def test_events_split_across_chunks(self):
+        """测试：事件在任意位置截断时仍能完整解析"""
+        parser = SSEParser()
+        assert parser.feed('event: delta\ndata: {"text": "he') == []
+        events = parser.feed('llo"}\n\n: ping\n\ndata: a\ndata: b\r\n\r\n')
+        assert events == [("delta", '{"text": "hello"}'), (None, "a\nb")]
+
+
+class TestExtractToken:
+    """extract_token 测试"""
+
+    def test_common_payloads(self):
+        assert extract_token('{"choices": [{"delta": {"content": "hi"}}]}') == "hi"
+        assert extract_token('{"type": "content_block_delta", "delta": {"text": "檔"}}') == "檔"
+        assert extract_token('{"token": "x"}') == "x"
+        assert extract_token("plain") == "plain"
+        assert extract_token('{"type": "ping"}') is None
+        assert extract_token("[DONE]") is None
+
+
+class TestNetworkTap:
+    """NetworkTap 测试"""
+
+    @pytest.mark.asyncio
+    async def test_sse_binding_reassembles_reply(self):
+        """测试：经 binding 回传的 SSE 数据块重组为带时间戳的 token"""
+        page = FakePage()
+        clock = FakeClock()
+        tap = NetworkTap(page, clock=clock)
+        await tap.start()
+        assert '"__bmcpTap"' in page.init_scripts[0]
+
+        send = page.bindings["__bmcpTap"]
+        clock.now = 0.5
+        send(None, {"kind": "sse", "url": "/api/chat", "data": 'data: {"content": "hello"}\n\nda'})
+        clock.now = 0.75
+        send(None, {"kind": "sse", "url": "/api/chat", "data": 'ta: {"content": ".md"}\n\ndata: [DONE]\n\n'})
+
+        assert tap.reply == "hello.md"
+        assert tap.first_token_latency == pytest.approx(0.5)
+        assert tap.token_intervals == [pytest.approx(0.25)]
+        assert tap.ended
+        assert await tap.wait_for_end(timeout=10)
+
+    @pytest.mark.asyncio
+    async def test_websocket_frames(self):
+        """测试：只订阅匹配地址的 WebSocket"""
+        page = FakePage()
+        tap = NetworkTap(page, url_pattern="chat")
+        await tap.start()
+
+        other = FakeWebSocket("wss://host/metrics")
+        page.emit("websocket", other)
+        assert other.handlers == {}
+
+        ws = FakeWebSocket("wss://host/chat")
+        page.emit("websocket", ws)
+        ws.handlers["framereceived"](b'{"text": "a"}')
+        ws.handlers["framereceived"]('{"text": "b"}')
+        assert tap.reply == "ab"
+
+        tap.reset()
+        assert tap.reply == ""
+        assert not await tap.wait_for_end(timeout=10)
+        ws.handlers["close"]()
+        assert tap.ended
+
+    @pytest.mark.asyncio
+    async def test_reused_page(self):
+        """测试：同一页面上先后启动的采集器只安装一次 binding，stop() 后不再接收数据"""
+        page = FakePage()
+        first = NetworkTap(page)
+        await first.start()
+        send = page.bindings["__bmcpTap"]
+        send(None, {"kind": "event", "url": "/API/Chat", "data": "one"})
+        first.stop()
+        assert page.listeners["websocket"] == []
+
+        second = NetworkTap(page)
+        await second.start()
+        assert len(page.init_scripts) == 1
+        send(None, {"kind": "event", "url": "/api/chat", "data": "two"})
+        send(None, {"kind": "event", "url": "/metrics", "data": "ignored"})
+        ws = FakeWebSocket("wss://host/CHAT")
+        page.emit("websocket", ws)
+        ws.handlers["framereceived"]("three")
+
+        # url_pattern 不区分大小写；页面脚本不过滤地址，只在 Python 侧匹配
+        assert first.reply == "one"
+        assert second.reply == "twothree"
+        assert "RegExp" not in page.init_scripts[0]
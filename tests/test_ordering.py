@@ -0,0 +1,101 @@
+"""测试排序插件测试用例"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.ordering import OrderingPlugin, assign_shards, estimate_durations, order_tests
+
+
+HISTORY = {
+    "slow": {"duration": 150.0, "failed": False},
+    "quick": {"duration": 0.1, "failed": False},
+    "broken_slow": {"duration": 20.0, "failed": True},
+    "broken_quick": {"duration": 0.5, "failed": True},
+}
+
+
+class FakeConfig:
+    def __init__(self, **options):
+        self.options = options
+
+    def getoption(self, name):
+        return self.options[name]
+
+
+def _report(nodeid, duration, outcome="passed"):
+    return SimpleNamespace(
+        nodeid=nodeid,
+        duration=duration,
+        failed=outcome == "failed",
+        skipped=outcome == "skipped",
+    )
+
+
+class TestOrdering:
+    """排序和分片测试"""
+
+    def test_failed_first_then_longest(self):
+        """测试：上次失败的短测试最先，其余按耗时从长到短，新测试按中位数估计"""
+        ordered = order_tests(["quick", "new", "slow", "broken_slow", "broken_quick"], HISTORY)
+        assert ordered == ["broken_quick", "broken_slow", "slow", "new", "quick"]
+        assert estimate_durations(["new", "quick", "slow"], HISTORY)["new"] == pytest.approx(75.05)
+
+    def test_lpt_shards(self):
+        """测试：LPT 分片使各分片总耗时接近"""
+        durations = {"a": 8, "b": 7, "c": 6, "d": 5, "e": 4}
+        shards = assign_shards(list("abcde"), durations, 2)
+        loads = sorted(sum(durations[t] for t in shard) for shard in shards)
+        assert loads == [13, 17]
+        assert sorted(t for shard in shards for t in shard) == list("abcde")
+
+
+class TestOrderingPlugin:
+    """OrderingPlugin 测试"""
+
+    def _plugin(self, path, shard=None, order="history"):
+        return OrderingPlugin(FakeConfig(**{"--history-file": str(path), "--shard": shard, "--order": order}))
+
+    def test_records_history(self, tmp_path):
+        """测试：汇总每个测试各阶段耗时，平滑更新历史，跳过的测试不记录"""
+        path = tmp_path / "history.json"
+        path.write_text(json.dumps({"a": {"duration": 4.0, "failed": True}}))
+        plugin = self._plugin(path)
+        for report in (_report("a", 0.5), _report("a", 1.5), _report("b", 2.0, "failed"), _report("c", 0, "skipped")):
+            plugin.pytest_runtest_logreport(report)
+        plugin.pytest_sessionfinish(None)
+
+        history = json.loads(path.read_text())
+        assert history["a"]["duration"] == pytest.approx(3.0)
+        assert history["a"]["failed"] is False
+        assert history["b"]["failed"] is True
+        assert "c" not in history
+
+    def test_file_order_keeps_history(self, tmp_path):
+        """测试：默认的文件顺序不写历史文件"""
+        path = tmp_path / "history.json"
+        plugin = self._plugin(path, order="file")
+        plugin.pytest_runtest_logreport(_report("a", 0.5))
+        plugin.pytest_sessionfinish(None)
+        assert not path.exists()
+
+    def test_reorders_and_shards_items(self, tmp_path):
+        path = tmp_path / "history.json"
+        path.write_text(json.dumps(HISTORY))
+        deselected = []
+        config = SimpleNamespace(
+            getoption=lambda name: "history",
+            hook=SimpleNamespace(pytest_deselected=lambda items: deselected.extend(items)),
+        )
+        items = [SimpleNamespace(nodeid=n) for n in ("quick", "slow", "broken_quick")]
+
+        self._plugin(path).pytest_collection_modifyitems(None, config, items)
+        assert [i.nodeid for i in items] == ["broken_quick", "slow", "quick"]
+
+        self._plugin(path, shard="1/2").pytest_collection_modifyitems(None, config, items)
+        assert [i.nodeid for i in items] == ["slow"]
+        assert [i.nodeid for i in deselected] == ["broken_quick", "quick"]
+
+    def test_invalid_shard(self, tmp_path):
+        with pytest.raises(pytest.UsageError):
+            self._plugin(tmp_path / "h.json", shard="3/2")
@@ -0,0 +1,106 @@
+"""页面脚本注册表测试用例"""
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.page_scripts import EXTRACT_MESSAGES, ScriptRegistry, page_scripts
+
+MINI_DOM = Path(__file__).parent / "fixtures" / "js" / "mini_dom.js"
+
+
+class FakePage:
+    """记录脚本安装和调用的假页面"""
+
+    def __init__(self, missing_once=False):
+        self.init_scripts = []
+        self.evaluated = []
+        self.missing_once = missing_once
+
+    async def add_init_script(self, script=None):
+        self.init_scripts.append(script)
+
+    async def evaluate(self, script, arg=None):
+        self.evaluated.append((script, arg))
+        if arg is None:
+            return None
+        if self.missing_once:
+            self.missing_once = False
+            return {"__bmcpMissing": True}
+        return {"called": arg[1], "args": arg[2]}
+
+
+class TestScriptRegistry:
+    """ScriptRegistry 测试"""
+
+    @pytest.mark.asyncio
+    async def test_install_once_and_call_by_name(self):
+        """测试：只安装一次，参数以 evaluate 参数传入"""
+        registry = ScriptRegistry()
+        registry.register("echo", "(value) => value")
+        page = FakePage()
+
+        await registry.call(page, "echo", "it's 'quoted'")
+        result = await registry.call(page, "echo", 2)
+
+        assert len(page.init_scripts) == 1
+        assert result == {"called": "echo", "args": [2]}
+        # 参数不会被拼接进脚本文本
+        assert all("quoted" not in script for script, _ in page.evaluated)
+
+    @pytest.mark.asyncio
+    async def test_reinstall_when_missing(self):
+        """测试：当前文档缺少辅助函数时补装后重试"""
+        registry = ScriptRegistry()
+        registry.register("echo", "(value) => value")
+        page = FakePage(missing_once=True)
+
+        result = await registry.call(page, "echo", 1)
+
+        assert result == {"called": "echo", "args": [1]}
+        bundles = [script for script, arg in page.evaluated if arg is None]
+        assert len(bundles) == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_script(self):
+        """测试：调用未注册的脚本"""
+        with pytest.raises(KeyError):
+            await ScriptRegistry().call(FakePage(), "nope")
+
+    def test_default_registry(self):
+        """测试：默认注册表包含流程使用的辅助函数"""
+        for name in ("findLoginButton", "findEmailInput", "clickNextButton", "extractMessages", "domDiff"):
+            assert name in page_scripts.names
+            assert f'lib["{name}"]' in page_scripts.bundle()
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="需要 Node.js 运行页面脚本")
+class TestExtractMessagesScript:
+    """在 Node.js 的最小 DOM 中运行 EXTRACT_MESSAGES"""
+
+    def run(self, steps: str):
+        source = "\n".join([
+            MINI_DOM.read_text(encoding="utf-8"),
+            f"const extract = {EXTRACT_MESSAGES};",
+            steps,
+        ])
+        output = subprocess.run(["node", "-e", source], capture_output=True, text=True, check=True).stdout
+        return [json.loads(line) for line in output.splitlines()]
+
+    def test_nested_container_marks_outer_record_dirty(self):
+        """测试：嵌套容器内的流式文本变化会重建最外层容器的记录"""
+        first, second = self.run("""
+            const text = h('span', {}, 'Hel').childNodes[0];
+            body.appendChild(h('div', {'data-role': 'user'}, 'question'));
+            body.appendChild(h('div', {'data-role': 'assistant'}, h('div', {class: 'message'}, text.parentNode)));
+            const opts = {containers: "[data-role], .message", since: 0, epoch: 0};
+            const r1 = extract(opts);
+            console.log(JSON.stringify(r1));
+            text.nodeValue = 'Hello.md';
+            console.log(JSON.stringify(extract({...opts, since: r1.seq, epoch: r1.epoch})));
+        """)
+        assert first["count"] == 2
+        assert [r["text"] for r in first["changed"]] == ["question", "Hel"]
+        assert [(r["index"], r["role"], r["text"]) for r in second["changed"]] == [(1, "assistant", "Hello.md")]
@@ -9,11 +9,6 @@
 - 选择器可能需要根据实际页面结构调整
 """
 import pytest
-import sys
-import os
-
-# 添加项目根目录到路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.mcp_client import BrowserMCPClient
 from src.test_utils import (
@@ -24,32 +19,21 @@ from src.test_utils import (
     take_screenshot_on_failure
 )
 
-try:
-    from config import TestConfig
-    BASE_URL = TestConfig.PROTAGO_BASE_URL
-    TEST_EMAIL = TestConfig.TEST_EMAIL
-    TEST_PASSWORD = TestConfig.TEST_PASSWORD
-except ImportError:
-    # 如果配置文件不存在，使用默认值
-    BASE_URL = "https://xyz-beta.protago-dev.com"
-    TEST_EMAIL = os.getenv("PROTAGO_TEST_EMAIL", "test@example.com")
-    TEST_PASSWORD = os.getenv("PROTAGO_TEST_PASSWORD", "test_password")
-
 
 class TestProtagoLogin:
     """Protago 网站登录测试用例"""
     
     @pytest.mark.asyncio
-    async def test_navigate_to_login_page(self, browser):
+    async def test_navigate_to_login_page(self, browser, protago_base_url):
         """测试：导航到登录页面
         
         验证能够成功访问 Protago 网站首页。
         """
         # 导航到网站首页
-        result = await browser.navigate(BASE_URL)
+        result = await browser.navigate(protago_base_url)
         
         # 验证导航成功
-        assert result["success"] is True
+        assert "protago-dev.com" in result.url
         
         # 验证当前 URL
         current_url = await browser.get_url()
@@ -61,13 +45,14 @@ class TestProtagoLogin:
         print(f"页面标题: {title}")
     
     @pytest.mark.asyncio
-    async def test_login_page_elements_visible(self, browser):
+    @pytest.mark.css_selectors
+    async def test_login_page_elements_visible(self, browser, protago_base_url):
         """测试：验证登录页面元素可见
         
         验证登录页面上的关键元素（用户名输入框、密码输入框、登录按钮）是否可见。
         """
         # 导航到登录页面
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         
         # 等待登录表单元素出现
         # 注意：实际的选择器需要根据页面实际情况调整
@@ -82,7 +67,8 @@ class TestProtagoLogin:
         ("test@example.com", "test_password"),
         ("admin@protago.com", "admin123"),
     ])
-    async def test_login_with_credentials(self, browser, username, password):
+    @pytest.mark.css_selectors
+    async def test_login_with_credentials(self, browser, username, password, protago_base_url):
         """测试：使用不同凭证登录
         
         参数化测试，使用不同的用户名和密码组合测试登录功能。
@@ -92,7 +78,7 @@ class TestProtagoLogin:
             password: 密码
         """
         # 导航到登录页面
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         
         # 等待登录表单加载
         await browser.wait_for_selector("input[type='email'], input[name='email']", timeout=10000)
@@ -133,13 +119,14 @@ class TestProtagoLogin:
             raise
     
     @pytest.mark.asyncio
-    async def test_login_flow_complete(self, browser):
+    @pytest.mark.css_selectors
+    async def test_login_flow_complete(self, browser, credential, protago_base_url):
         """测试：完整的登录流程
         
         端到端测试，验证从访问首页到完成登录的完整流程。
         """
         # 步骤 1: 导航到网站首页
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         current_url = await browser.get_url()
         assert "protago-dev.com" in current_url
         
@@ -153,9 +140,9 @@ class TestProtagoLogin:
         await browser.wait_for_selector(password_input, timeout=10000)
         
         # 步骤 3: 填写登录信息
-        # 使用配置文件中的测试账号
-        await browser.fill(email_input, TEST_EMAIL)
-        await browser.fill(password_input, TEST_PASSWORD)
+        # 使用从账号池租用的测试账号，并行运行时各测试互不影响
+        await browser.fill(email_input, credential.email)
+        await browser.fill(password_input, credential.password)
         
         # 步骤 4: 截取登录前的截图（可选，用于调试）
         await browser.screenshot("screenshots/before_login.png")
@@ -181,13 +168,14 @@ class TestProtagoLogin:
         await browser.screenshot("screenshots/after_login.png")
     
     @pytest.mark.asyncio
-    async def test_login_with_invalid_credentials(self, browser):
+    @pytest.mark.css_selectors
+    async def test_login_with_invalid_credentials(self, browser, protago_base_url):
         """测试：使用无效凭证登录
         
         验证使用错误的用户名或密码时，系统能正确显示错误消息。
         """
         # 导航到登录页面
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         
         # 等待登录表单加载
         await browser.wait_for_selector("input[type='email'], input[name='email']", timeout=10000)
@@ -218,13 +206,14 @@ class TestProtagoLogin:
         print(f"错误消息: {error_text}")
     
     @pytest.mark.asyncio
-    async def test_login_form_validation(self, browser):
+    @pytest.mark.css_selectors
+    async def test_login_form_validation(self, browser, protago_base_url):
         """测试：登录表单验证
         
         验证表单验证功能，例如空字段提交时的验证。
         """
         # 导航到登录页面
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         
         # 等待登录表单加载
         await browser.wait_for_selector("input[type='email'], input[name='email']", timeout=10000)
@@ -248,13 +237,14 @@ class TestProtagoLogin:
         print(f"验证消息: {validation_message}")
     
     @pytest.mark.asyncio
-    async def test_login_page_accessibility(self, browser):
+    @pytest.mark.css_selectors
+    async def test_login_page_accessibility(self, browser, protago_base_url):
         """测试：登录页面可访问性
         
         验证登录页面的基本可访问性，如页面标题、关键元素等。
         """
         # 导航到登录页面
-        await browser.navigate(BASE_URL)
+        await browser.navigate(protago_base_url)
         
         # 验证页面标题存在
         title = await browser.get_title()
@@ -281,15 +271,15 @@ class TestProtagoLoginE2E:
     
     @pytest.mark.asyncio
     @pytest.mark.smoke
-    async def test_smoke_login_page_loads(self, browser):
-        """冒烟测试：登录页面能够正常加载"""
-        result = await browser.navigate(BASE_URL)
-        assert result["success"] is True
+    async def test_smoke_login_page_loads(self, smoke_page):
+        """冒烟测试：登录页面能够正常加载
         
-        title = await browser.get_title()
+        使用冒烟快速通道共享的页面状态，不再单独导航。
+        """
+        title = smoke_page.title
         assert title is not None
         
-        current_url = await browser.get_url()
+        current_url = smoke_page.url
         assert "protago" in current_url.lower()
         
         print(f"✅ 登录页面加载成功")
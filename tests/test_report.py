@@ -0,0 +1,72 @@
+"""测试报告生成测试用例"""
+import json
+
+from src.report import ReportBuilder, build_report, main, render_markdown
+
+
+def write_events(path, events):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events), encoding="utf-8")
+
+
+EVENTS = [
+    {"run_id": "r1", "type": "step", "test": "t::a", "step": "load", "status": "passed", "duration": 1.0},
+    {"run_id": "r1", "type": "step", "test": "t::a", "step": "submit", "status": "failed", "duration": 3.0,
+     "error": "TimeoutError: 超时", "artifacts": [{"id": 1, "step": "shot", "sha256": "abc", "path": "a/b.png"}]},
+    {"run_id": "r1", "type": "tool_call", "tool": "click", "status": "failed", "duration": 0.5},
+    {"run_id": "r2", "type": "step", "test": "t::a", "step": "load", "status": "warning", "duration": 2.0},
+    {"run_id": "r2", "type": "test", "test": "t::b", "status": "skipped", "duration": 0.0},
+    {"run_id": "r2", "type": "tool_call", "tool": "click", "status": "passed", "duration": 0.1},
+]
+
+
+class TestReportBuilder:
+    """ReportBuilder 测试"""
+
+    def test_summary(self):
+        builder = ReportBuilder()
+        for event in EVENTS:
+            builder.add(event)
+        summary = builder.summary()
+
+        assert summary["runs"] == 2 and summary["failed_runs"] == 1
+        assert summary["tests"] == {"total": 3, "failed": 1, "skipped": 1}
+        assert summary["warnings"] == 1
+        assert summary["steps"]["t::a :: load"] == {"count": 2, "failed": 0, "mean": 1.5, "max": 2.0}
+        assert summary["tools"]["click"]["count"] == 2 and summary["tools"]["click"]["failed"] == 1
+        assert summary["failures"][0]["step"] == "submit"
+
+    def test_test_event_overrides_steps(self):
+        """测试：pytest 结果事件优先于步骤推断的结果"""
+        builder = ReportBuilder()
+        builder.add({"run_id": "r", "type": "step", "test": "t::a", "step": "s", "status": "failed"})
+        builder.add({"run_id": "r", "type": "test", "test": "t::a", "status": "passed"})
+        assert builder.summary()["tests"]["failed"] == 0
+
+
+class TestBuildReport:
+    """从文件生成报告测试"""
+
+    def test_read_directory_and_skip_bad_lines(self, tmp_path):
+        write_events(tmp_path / "events" / "r1" / "gw0.jsonl", EVENTS[:3])
+        write_events(tmp_path / "events" / "r2" / "gw1.jsonl", EVENTS[3:])
+        with open(tmp_path / "events" / "r2" / "gw1.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"run_id": "r2", "type": "st')  # 写入中断的行
+
+        summary = build_report([str(tmp_path / "events")])
+        assert summary["events"] == len(EVENTS)
+
+    def test_markdown(self):
+        builder = ReportBuilder()
+        for event in EVENTS:
+            builder.add(event)
+        text = render_markdown(builder.summary())
+        assert "| t::a :: submit | 1 | 1 | 3.00 | 3.00 |" in text
+        assert "TimeoutError: 超时" in text and "a/b.png" in text
+
+    def test_cli_json(self, tmp_path, capsys):
+        write_events(tmp_path / "e.jsonl", EVENTS)
+        assert main([str(tmp_path / "e.jsonl"), "--format", "json"]) == 0
+        assert json.loads(capsys.readouterr().out)["runs"] == 2
+        assert main([str(tmp_path / "e.jsonl"), "-o", str(tmp_path / "report.md")]) == 0
+        assert (tmp_path / "report.md").read_text(encoding="utf-8").startswith("# 测试报告")
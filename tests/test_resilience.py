@@ -0,0 +1,150 @@
+"""调用截止时间、重试与熔断测试用例"""
+import asyncio
+
+import pytest
+
+from src.backends import FakeBackend
+from src.errors import CircuitOpenError, ToolTimeoutError
+from src.mcp_client import BrowserMCPClient
+from src.resilience import CircuitBreaker, RetryPolicy
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """熔断器状态机测试"""
+
+    def test_opens_after_threshold(self):
+        """测试：连续失败达到阈值后打开"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=1000, clock=FakeClock())
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call("get_url")
+
+    def test_half_open_trial(self):
+        """测试：超时后放行一次试探调用"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1000, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 1.5
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call("get_url")
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call("get_url")
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestRetryPolicy:
+    """重试策略测试"""
+
+    def test_delay_bounded(self):
+        """测试：退避时间不超过上限"""
+        policy = RetryPolicy(base_delay=100, max_delay=300)
+        for attempt in range(1, 10):
+            assert 0 <= policy.delay(attempt) <= 0.3
+
+
+class TestClientCall:
+    """客户端工具调用保护测试"""
+
+    def _client(self, failure_threshold=5):
+        return BrowserMCPClient(
+            retry_policy=RetryPolicy(attempts=3, base_delay=1, max_delay=1),
+            circuit_breaker=CircuitBreaker(failure_threshold=failure_threshold)
+        )
+
+    @pytest.mark.asyncio
+    async def test_deadline(self):
+        """测试：超过截止时间抛出 ToolTimeoutError"""
+        client = self._client()
+
+        with pytest.raises(ToolTimeoutError):
+            await client._call("evaluate", lambda: asyncio.sleep(1), timeout=10)
+
+    @pytest.mark.asyncio
+    async def test_idempotent_retry(self):
+        """测试：幂等读操作失败后重试"""
+        client = self._client()
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError("reset")
+            return "ok"
+
+        assert await client._call("get_url", flaky, timeout=1000, idempotent=True) == "ok"
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_breaker_fails_fast(self):
+        """测试：熔断后后续调用立即失败"""
+        client = self._client(failure_threshold=2)
+
+        async def broken():
+            raise ConnectionError("server down")
+
+        with pytest.raises(ConnectionError):
+            await client._call("click", broken, timeout=1000)
+        with pytest.raises(ConnectionError):
+            await client._call("click", broken, timeout=1000)
+        with pytest.raises(CircuitOpenError):
+            await client.get_url()
+
+    @pytest.mark.asyncio
+    async def test_element_timeouts_do_not_open_breaker(self):
+        """测试：等待不存在的元素超时不计入熔断器，不影响其他客户端"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        client = BrowserMCPClient(circuit_breaker=breaker, backend=FakeBackend())
+        await client.navigate("https://example.com")
+        for _ in range(3):
+            with pytest.raises(ToolTimeoutError):
+                await client.wait_for_selector("div#nope", timeout=100)
+            with pytest.raises(LookupError):
+                await client.click("div#nope")
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert await client.get_title() == "Example Domain"
+
+    @pytest.mark.asyncio
+    async def test_role_lookup_passes_breaker_once(self):
+        """测试：半开状态下按 role/name 点击只经过一次熔断器，成功后关闭"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1000, clock=clock)
+        client = BrowserMCPClient(circuit_breaker=breaker, backend=FakeBackend())
+        await client.navigate("https://example.com/login")
+        breaker.record_failure()
+        clock.now = 1.5
+
+        await client.click(role="button", name="Log In")
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_page_errors_end_half_open_trial(self):
+        """测试：半开状态下试探调用因页面原因失败时，不重新打开熔断器，下一次调用可以继续试探"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1000, clock=clock)
+        client = BrowserMCPClient(circuit_breaker=breaker, backend=FakeBackend())
+        await client.navigate("https://example.com")
+        breaker.record_failure()
+        clock.now = 1.5
+
+        with pytest.raises(LookupError):
+            await client.click("div#nope")
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        await client.get_url()
+        assert breaker.state == CircuitBreaker.CLOSED
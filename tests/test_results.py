@@ -0,0 +1,39 @@
+"""客户端操作结果测试用例"""
+import dataclasses
+
+import pytest
+
+from src.backends import FakeBackend
+from src.mcp_client import BrowserMCPClient
+from src.results import ActionResult, NavigationResult, WaitResult, action_result
+
+
+class TestResults:
+    """结果对象测试"""
+
+    def test_immutable_without_dict(self):
+        """测试：结果不可修改，也没有实例字典"""
+        result = action_result("click", "button#login")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.selector = "a"
+        assert not hasattr(result, "__dict__")
+        assert result == ActionResult("click", "button#login")
+
+    @pytest.mark.asyncio
+    async def test_repeated_calls_share_results(self):
+        """测试：同一元素上的重复操作返回同一个结果对象，失败时抛出异常"""
+        async with BrowserMCPClient(backend=FakeBackend()) as client:
+            first = await client.navigate("https://example.com/login")
+            assert isinstance(first, NavigationResult)
+            assert first.title == "Login Page"
+            assert await client.navigate("https://example.com/login") is first
+
+            fills = [await client.fill("input#email", f"user{i}@example.com") for i in range(3)]
+            assert all(r is fills[0] for r in fills)
+            waited = await client.wait_for_selector("button#login", timeout=100)
+            assert isinstance(waited, WaitResult) and waited.selector == "button#login"
+
+            with pytest.raises(LookupError):
+                await client.click("button#missing")
+            with pytest.raises(ValueError):
+                await client.fill("input#email")
@@ -0,0 +1,88 @@
+"""多流程并发调度器测试用例"""
+import asyncio
+
+import pytest
+
+from src.scheduler import FlowScheduler
+
+
+class TestFlowScheduler:
+    """FlowScheduler 测试"""
+
+    @pytest.mark.asyncio
+    async def test_caps_active_pages(self):
+        """测试：同时活跃的任务数不超过上限"""
+        scheduler = FlowScheduler(max_active=2)
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            peak = max(peak, scheduler.stats().active)
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(scheduler.run("flow", work) for _ in range(6)))
+
+        stats = scheduler.stats()
+        assert peak == 2
+        assert stats.active == 0
+        assert stats.completed == 6
+        assert stats.max_queued == 4
+
+    @pytest.mark.asyncio
+    async def test_round_robin_between_flows(self):
+        """测试：排队任务在流程之间轮转分配"""
+        scheduler = FlowScheduler(max_active=1)
+        order = []
+        await scheduler.acquire("blocker")
+
+        async def work(flow, i):
+            async with scheduler.slot(flow):
+                order.append(f"{flow}{i}")
+
+        tasks = [asyncio.create_task(work("a", i)) for i in range(3)]
+        tasks += [asyncio.create_task(work("b", i)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert scheduler.stats().queued == 5
+
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["a0", "b0", "a1", "b1", "a2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """测试：取消排队任务后队列深度恢复"""
+        scheduler = FlowScheduler(max_active=1)
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert scheduler.stats().queued == 0
+        scheduler.release()
+        assert scheduler.stats().active == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_after_hand_off(self):
+        """测试：槽位已移交但任务被取消时，槽位转交给下一个任务且不计为完成"""
+        scheduler = FlowScheduler(max_active=1)
+        await scheduler.acquire()
+        first = asyncio.create_task(scheduler.acquire())
+        second = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+
+        # 移交给 first 后、first 恢复执行前取消
+        scheduler.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await second
+
+        stats = scheduler.stats()
+        assert stats.completed == 1
+        assert stats.active == 1 and stats.queued == 0
+        scheduler.release()
+        assert scheduler.stats().active == 0
@@ -0,0 +1,103 @@
+"""CDP 屏幕录制测试用例"""
+import base64
+
+import pytest
+
+from src.cdp import CDPChannel
+from src.screencast import ScreencastArchive, ScreencastRecorder
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeScreencastSession:
+    """记录命令、可以手动推送屏幕帧的假 CDP 会话"""
+
+    def __init__(self):
+        self.sent = []
+        self.listeners = {}
+
+    def on(self, event, handler):
+        self.listeners[event] = handler
+
+    def remove_listener(self, event, handler):
+        self.listeners.pop(event, None)
+
+    async def send(self, method, params):
+        self.sent.append((method, params))
+        return {}
+
+    def push_frame(self, session_id, data):
+        self.listeners["Page.screencastFrame"]({
+            "sessionId": session_id,
+            "data": base64.b64encode(data).decode(),
+        })
+
+
+class TestScreencastRecorder:
+    """ScreencastRecorder 测试"""
+
+    @pytest.mark.asyncio
+    async def test_record_frames_and_steps(self, tmp_path):
+        """测试：帧按帧率限制写入归档，步骤标记写入索引，每一帧都被确认"""
+        session = FakeScreencastSession()
+        clock = FakeClock()
+        recorder = ScreencastRecorder(CDPChannel(session), str(tmp_path / "rec"), fps=2, clock=clock)
+
+        assert await recorder.start()
+        assert session.sent[0][0] == "Page.startScreencast"
+        assert session.sent[0][1]["format"] == "jpeg"
+
+        session.push_frame(1, b"frame-a")
+        recorder.mark("step1")
+        clock.now += 0.1
+        session.push_frame(2, b"too-soon")
+        clock.now += 0.5
+        session.push_frame(3, b"frame-b")
+        clock.now += 1.0
+        recorder.mark("step2")
+        await recorder.stop()
+
+        assert recorder.frames == 2 and recorder.dropped == 1
+        acks = [p["sessionId"] for m, p in session.sent if m == "Page.screencastFrameAck"]
+        assert sorted(acks) == [1, 2, 3]
+        assert "Page.stopScreencast" in [m for m, _ in session.sent]
+        assert "Page.screencastFrame" not in session.listeners
+
+        archive = ScreencastArchive(str(tmp_path / "rec"))
+        assert [s.name for s in archive.steps] == ["step1", "step2"]
+        assert [archive.read_frame(f) for f in archive.frames] == [b"frame-a", b"frame-b"]
+        assert archive.frame_at("step1").seq == 1
+        assert [f.seq for f in archive.frames_between("step1", "step2")] == [1, 2]
+        assert [f.seq for f in archive.frames_between("step1")] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_start_without_events(self, tmp_path):
+        """测试：会话不支持事件时无法录制"""
+        class NoEventsSession:
+            async def send(self, method, params):
+                return {}
+
+        recorder = ScreencastRecorder(CDPChannel(NoEventsSession()), str(tmp_path))
+        assert not await recorder.start()
+
+    def test_mark_before_start(self, tmp_path):
+        recorder = ScreencastRecorder(CDPChannel(FakeScreencastSession()), str(tmp_path))
+        with pytest.raises(RuntimeError):
+            recorder.mark("step1")
+        with pytest.raises(ValueError):
+            ScreencastRecorder(CDPChannel(FakeScreencastSession()), str(tmp_path), fps=0)
+
+
+class TestScreencastArchive:
+    """ScreencastArchive 测试"""
+
+    def test_unknown_step(self, tmp_path):
+        (tmp_path / "index.jsonl").write_text("", encoding="utf-8")
+        with pytest.raises(KeyError):
+            ScreencastArchive(str(tmp_path)).step("missing")
@@ -0,0 +1,124 @@
+"""冒烟快速通道测试用例"""
+import asyncio
+import time
+
+import pytest
+
+from src.accessibility import AccessibilitySnapshot
+from src.smoke import PageState, SmokeSuite
+
+
+class FakeClient:
+    """记录导航次数的假客户端"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.navigations = 0
+
+    async def navigate(self, url):
+        self.navigations += 1
+        await asyncio.sleep(self.delay)
+        self.url = url
+        return {"success": True}
+
+    async def get_url(self):
+        return self.url
+
+    async def get_title(self):
+        return "Home"
+
+    async def snapshot(self):
+        return AccessibilitySnapshot.parse('- heading "Welcome" [ref=e1]')
+
+
+def _state():
+    return PageState("https://host", "Home", AccessibilitySnapshot.parse('- button "Go" [ref=e1]'))
+
+
+class TestSmokeSuite:
+    """SmokeSuite 测试"""
+
+    @pytest.mark.asyncio
+    async def test_checks_share_one_page_load(self):
+        """测试：页面只加载一次，每个检查单独报告"""
+        suite = SmokeSuite(budget=5)
+        seen = []
+
+        @suite.check()
+        def title(state):
+            seen.append(state)
+            assert state.title == "Home"
+
+        @suite.check("heading")
+        async def heading(state):
+            seen.append(state)
+            assert state.snapshot.find("heading", "Welcome")
+
+        @suite.check("broken")
+        def broken(state):
+            assert state.title == "Other", "标题不匹配"
+
+        client = FakeClient()
+        run = await suite.run_url(client, "https://host")
+
+        assert client.navigations == 1
+        assert seen[0] is seen[1] is run.state
+        assert run.results["title"].passed and run.results["heading"].passed
+        assert run.results["broken"].error.startswith("AssertionError: 标题不匹配")
+        assert not run.passed
+
+    @pytest.mark.asyncio
+    async def test_checks_run_in_parallel_within_budget(self):
+        """测试：检查并行运行，超出预算的检查记为失败"""
+        suite = SmokeSuite(budget=0.3)
+
+        for i in range(5):
+            @suite.check(f"quick{i}")
+            async def quick(state):
+                await asyncio.sleep(0.1)
+
+        @suite.check("hangs")
+        async def hangs(state):
+            await asyncio.sleep(10)
+
+        results = await suite.run(_state(), budget=0.25)
+
+        assert all(results[f"quick{i}"].passed for i in range(5))
+        assert not results["hangs"].passed
+        # 报告的是本次运行的剩余预算，而不是总预算
+        assert "剩余 0.25 秒" in results["hangs"].error
+
+    @pytest.mark.asyncio
+    async def test_sync_checks_do_not_block_loop(self):
+        """测试：同步检查在线程中并行运行，阻塞的同步检查不影响其他检查"""
+        suite = SmokeSuite(budget=1)
+
+        for i in range(3):
+            @suite.check(f"slow{i}")
+            def slow(state):
+                time.sleep(0.2)
+
+        start = time.monotonic()
+        results = await suite.run(_state(), budget=0.5)
+
+        assert all(result.passed for result in results.values())
+        assert time.monotonic() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_page_load_counts_against_budget(self):
+        """测试：页面加载超出预算时所有检查失败"""
+        suite = SmokeSuite(budget=10)
+        suite.check("any")(lambda state: None)
+
+        run = await suite.run_url(FakeClient(delay=1), "https://host", budget=0.05)
+
+        assert run.state is None
+        assert "页面加载超出冒烟时间预算 0.05 秒" in run.results["any"].error
+        # 本次运行的预算不修改套件的默认预算
+        assert suite.budget == 10
+
+    def test_duplicate_name(self):
+        suite = SmokeSuite()
+        suite.check("a")(lambda state: None)
+        with pytest.raises(ValueError):
+            suite.check("a")(lambda state: None)
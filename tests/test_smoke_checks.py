@@ -0,0 +1,35 @@
+"""首页冒烟检查
+
+所有检查针对冒烟快速通道共享的同一份页面状态运行（见 conftest.smoke_run），
+页面只加载一次，检查并行执行，每个检查作为单独的测试报告结果。
+
+运行方式：
+    pytest -m smoke
+    SMOKE_BUDGET=5 pytest -m smoke
+"""
+import pytest
+
+from src.smoke import smoke_suite
+
+
+@smoke_suite.check("首页可以加载")
+def homepage_loads(state):
+    assert "protago" in state.url.lower(), f"首页 URL 不正确: {state.url}"
+
+
+@smoke_suite.check("页面标题存在")
+def title_present(state):
+    assert state.title, "页面标题为空"
+
+
+@smoke_suite.check("可访问性快照非空")
+def snapshot_not_empty(state):
+    assert state.snapshot.nodes, "页面快照中没有任何节点"
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("name", smoke_suite.names)
+def test_smoke_check(name, smoke_run):
+    """冒烟检查：逐项报告共享页面状态上的检查结果"""
+    result = smoke_run.results[name]
+    assert result.passed, result.error
@@ -0,0 +1,96 @@
+"""浸泡测试运行器测试用例
+
+使用假的浏览器对象验证上下文回收和逐迭代记录。
+"""
+import json
+
+import pytest
+
+from src.artifacts import get_artifact_store
+from src.soak import SoakRunner, SoakSample, summarize
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+    async def evaluate(self, script):
+        self.context.heap += 1000
+        return {"jsHeap": self.context.heap, "domNodes": 10}
+
+
+class FakeContext:
+    def __init__(self):
+        self.heap = 0
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, **options):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+
+class TestSoakRunner:
+    """SoakRunner 测试"""
+
+    @pytest.mark.asyncio
+    async def test_recycles_every_n_iterations(self, tmp_path):
+        """测试：每 N 次迭代回收上下文并逐行记录"""
+        browser = FakeBrowser()
+        calls = []
+
+        async def flow(page):
+            calls.append(page)
+            if len(calls) == 2:
+                raise RuntimeError("boom")
+
+        output = tmp_path / "soak.jsonl"
+        runner = SoakRunner(browser, flow, iterations=5, recycle_every=2, output=str(output))
+        summary = await runner.run()
+
+        assert summary["iterations"] == 5
+        assert summary["failures"] == 1
+        assert summary["recycles"] == 2
+        assert len(browser.contexts) == 3
+        assert all(c.closed for c in browser.contexts)
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [r["generation"] for r in records] == [1, 1, 2, 2, 3]
+        assert records[1]["error"] == "RuntimeError: boom"
+
+    def test_default_output_in_artifact_run(self):
+        """测试：未指定输出文件时写入当前产物运行目录，而不是 screenshots/"""
+        runner = SoakRunner(FakeBrowser(), None, iterations=1)
+        assert runner.output == get_artifact_store().run_dir / "soak.jsonl"
+
+    def test_requires_bound(self):
+        """测试：必须指定迭代次数或时长，回收间隔必须为正数"""
+        with pytest.raises(ValueError):
+            SoakRunner(FakeBrowser(), None)
+        with pytest.raises(ValueError):
+            SoakRunner(FakeBrowser(), None, iterations=5, recycle_every=0)
+
+
+class TestSummarize:
+    """汇总计算测试"""
+
+    def test_heap_slope_per_generation(self):
+        """测试：JS 堆斜率按上下文代次计算，不受回收重置影响"""
+        samples = [
+            SoakSample(i, 1 + i // 3, 0.0, 10.0, True, None, 100, 200, 1000 * (i % 3), 5)
+            for i in range(6)
+        ]
+        summary = summarize(samples)
+
+        assert summary["js_heap_slope"] == pytest.approx(1000)
+        assert summary["harness_rss_slope"] == pytest.approx(0)
@@ -0,0 +1,104 @@
+"""历史指标趋势测试用例"""
+import pytest
+
+from src.events import EventLog
+from src.report import read_events
+from src.trends import TrendStore, collect_page_timings, main, percentile, step_metric
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TrendStore(str(tmp_path / "trends.sqlite"))
+    yield store
+    store.close()
+
+
+def fill(store, metric, values, deploy_of=lambda i: None):
+    for i, value in enumerate(values):
+        store.add_run(f"run{i}", started=1000.0 + i, deploy=deploy_of(i))
+        store.record(f"run{i}", metric, value, ts=1000.0 + i)
+
+
+class TestPercentile:
+    """百分位计算测试"""
+
+    def test_interpolation(self):
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([5], 95) == 5
+        assert percentile([3, 1, 2], 100) == 3
+        with pytest.raises(ValueError):
+            percentile([], 50)
+
+
+class TestTrendStore:
+    """TrendStore 测试"""
+
+    def test_ingest_events(self, store):
+        """测试：导入 step 和 metric 事件，失败步骤和其他事件被忽略，重复导入去重"""
+        events = [
+            {"ts": 1.0, "run_id": "r1", "type": "run", "deploy": "v1"},
+            {"ts": 2.0, "run_id": "r1", "type": "step", "test": "tests/a.py::test_flow", "step": "submit",
+             "status": "passed", "duration": 1.5},
+            {"ts": 3.0, "run_id": "r1", "type": "step", "test": "tests/a.py::test_flow", "step": "wait",
+             "status": "failed", "duration": 300.0},
+            {"ts": 4.0, "run_id": "r1", "type": "metric", "name": "share_link.response_time", "value": 42.0},
+            {"ts": 5.0, "run_id": "r1", "type": "tool_call", "tool": "click", "duration": 0.1},
+        ]
+        assert store.ingest(events) == 2
+        assert store.ingest(events) == 0
+        assert store.metrics() == ["share_link.response_time", "test_flow/submit"]
+        assert store.series("share_link.response_time", deploy="v1") == [(4.0, 42.0)]
+
+    def test_trend_flags_regression(self, store):
+        """测试：最近样本的中位数明显高于基线时标记回归"""
+        fill(store, "page.homepage.load", [100, 105, 98, 102, 101, 99, 103, 160, 170, 165])
+        row = store.trend("page.homepage.load", window=10, recent=3)
+        assert row.samples == 10 and row.regression
+        assert row.recent == 165 and row.baseline == 101
+
+    def test_trend_ignores_single_spike(self, store):
+        fill(store, "m", [100, 105, 98, 102, 101, 99, 103, 100, 300, 101])
+        assert not store.trend("m", window=10, recent=3).regression
+
+    def test_trend_needs_baseline(self, store):
+        fill(store, "m", [100, 300, 300])
+        row = store.trend("m", recent=2)
+        assert row.baseline is None and not row.regression
+        assert store.trend("missing") is None
+
+    def test_by_deploy(self, store):
+        fill(store, "m", [1, 2, 3, 10, 11, 12], deploy_of=lambda i: "v1" if i < 3 else "v2")
+        assert store.by_deploy("m") == [("v2", 3, 11, 11.8), ("v1", 3, 2, 2.8)]
+
+    def test_cli_check(self, store, capsys):
+        fill(store, "m", [100, 101, 99, 100, 102, 98, 100, 200, 210, 205])
+        assert main(["--db", str(store.path), "report"]) == 0
+        assert "⚠️ 回归" in capsys.readouterr().out
+        assert main(["--db", str(store.path), "check", "--recent", "3"]) == 1
+        assert main(["--db", str(store.path), "check", "--metric", "other"]) == 0
+
+
+class FakeRegistry:
+    async def call(self, page, name):
+        assert name == "pageTimings"
+        return {"ttfb": 120, "load": 900, "fcp": None, "transfer_size": 2048}
+
+
+class TestPageTimings:
+    """浏览器性能指标测试"""
+
+    @pytest.mark.asyncio
+    async def test_collect_page_timings(self, tmp_path, store):
+        log = EventLog(str(tmp_path / "events.jsonl"), run_id="r1")
+        await collect_page_timings(object(), "page.homepage", registry=FakeRegistry(), log=log)
+        log.close()
+
+        store.ingest(read_events([str(tmp_path / "events.jsonl")]))
+        assert store.metrics("page.homepage.*") == [
+            "page.homepage.load", "page.homepage.transfer_size", "page.homepage.ttfb",
+        ]
+
+
+def test_step_metric():
+    assert step_metric("tests/test_share_link_full.py::test_share_link_full", "submit") == "test_share_link_full/submit"
+    assert step_metric(None, "load") == "-/load"
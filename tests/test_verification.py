@@ -0,0 +1,87 @@
+"""响应关键词验证测试用例"""
+from src.verification import (
+    KeywordMatcher,
+    StreamingVerifier,
+    VerificationRule,
+    normalize_text,
+    verify_text,
+)
+
+
+RULE = VerificationRule.from_dict({
+    "required_keywords": ["knowledge-base", "檔案", "hello.md"],
+    "expected_file": "hello.md",
+    "min_length": 20,
+    "exclude_keywords": ["错误", "error", "无法", "失败"],
+})
+
+
+class TestKeywordMatcher:
+    """KeywordMatcher 测试"""
+
+    def test_normalization(self):
+        """测试：繁简、全角和大小写统一"""
+        assert normalize_text("ＫＮＯＷＬＥＤＧＥ 檔案") == "knowledge 档案"
+
+    def test_overlapping_keywords(self):
+        """测试：同一位置命中长关键词时，被包含的短关键词也计入"""
+        matcher = KeywordMatcher(["hello", "hello.md", "md"])
+        assert matcher.find("see HELLO.md") == {"hello", "hello.md", "md"}
+        assert matcher.find("nothing here") == frozenset()
+
+
+class TestVerifyText:
+    """完整文本验证测试"""
+
+    def test_pass_with_simplified_text(self):
+        """测试：简体响应满足繁体关键词"""
+        result = verify_text("knowledge-base 目录下的档案如下：hello.md", RULE)
+        assert result.passed
+        assert result.errors == []
+        assert "✅ 包含预期文件: hello.md" in result.checks
+
+    def test_fail_reports_all_errors(self):
+        """测试：失败时列出缺少和命中的关键词"""
+        result = verify_text("无法访问 knowledge-base", RULE)
+        assert not result.passed
+        assert "缺少关键词: hello.md" in result.errors
+        assert "包含错误关键词: 无法" in result.errors
+        assert result.to_dict()["passed"] is False
+
+
+class TestStreamingVerifier:
+    """流式验证测试"""
+
+    def test_fail_as_soon_as_excluded_keyword_arrives(self):
+        """测试：跨块出现的错误关键词立即判定失败"""
+        verifier = StreamingVerifier(RULE)
+        assert verifier.feed("knowledge-base: some err") is None
+        assert verifier.feed("or occurred, more text") is False
+        assert verifier.feed("hello.md") is False
+        assert verifier.finish().decided_at == len("knowledge-base: some error occurred, more text")
+
+    def test_pass_early_without_exclude_keywords(self):
+        """测试：没有错误关键词的规则在条件满足时立即判定通过"""
+        rule = VerificationRule(required_keywords=("hello.md",), min_length=5)
+        verifier = StreamingVerifier(rule)
+        assert verifier.feed("files: hel") is None
+        assert verifier.feed("lo.md") is True
+        assert verifier.finish().passed
+
+    def test_pass_decided_at_finish(self):
+        """测试：有错误关键词的规则只能在结束时判定通过"""
+        verifier = StreamingVerifier(RULE)
+        assert verifier.feed("knowledge-base 的檔案: hello.md") is None
+        assert verifier.finish().passed
+
+    def test_update_feeds_only_new_suffix(self):
+        """测试：update 只处理回复新增的后缀，回复被改写时重新验证"""
+        verifier = StreamingVerifier(RULE)
+        assert verifier.update("Working on it, err") is None
+        # 占位文本被替换为正文：之前的片段不再参与匹配
+        assert verifier.update("knowledge-base 的檔案") is None
+        assert verifier.update("knowledge-base 的檔案: hello.md") is None
+        assert verifier.update("knowledge-base 的檔案: hello.md") is None
+        assert verifier.length == len("knowledge-base 的檔案: hello.md")
+        assert verifier.update("knowledge-base 的檔案: hello.md 讀取 error") is False
+        assert not verifier.finish().passed